@@ -0,0 +1,67 @@
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+from color_space import parse_hex, to_hex, srgb_to_oklab, oklab_to_srgb
+
+# Corners of the 6x6x6 colour cube, indexed red + 2 * green + 4 * blue like
+# the ANSI colours; black and white are the theme's background and foreground
+CORNER_KEYS = ('background', 'color1', 'color2', 'color3', 'color4', 'color5', 'color6', 'foreground')
+_FALLBACKS = {'background': 'color0', 'foreground': 'color7'}
+
+
+def _weights() -> np.ndarray:
+    """(240, 8) corner weights for colours 16-255"""
+    levels = np.arange(6) / 5
+    r, g, b = np.meshgrid(levels, levels, levels, indexing='ij')
+    r, g, b = r.ravel(), g.ravel(), b.ravel()
+    cube = np.stack([
+        (r if corner & 1 else 1 - r) * (g if corner & 2 else 1 - g) * (b if corner & 4 else 1 - b)
+        for corner in range(8)
+    ], axis=1)
+
+    # Grey ramp 232-255: strictly between background and foreground
+    t = np.arange(1, 25) / 25
+    greys = np.zeros((24, 8))
+    greys[:, 0], greys[:, 7] = 1 - t, t
+    return np.concatenate([cube, greys])
+
+
+_WEIGHTS = _weights()
+
+
+def synthesize(corners: np.ndarray) -> np.ndarray:
+    """Colours 16-255 from (..., 8, 3) OKLab cube corners, as (..., 240, 3) OKLab.
+
+    The cube is trilinear interpolation between the corners and the greys
+    a ramp from background to foreground, all in one matrix product, so
+    steps look even and every colour stays in the theme's palette.
+    """
+    return _WEIGHTS @ corners
+
+
+def corner_colors(colors: Dict[str, str], prefix: str = '') -> Tuple[str, ...]:
+    """The eight cube corner colours of a theme, '' where missing"""
+    corners = []
+    for key in CORNER_KEYS:
+        value = colors.get(prefix + key) or colors.get(prefix + _FALLBACKS.get(key, key), '')
+        corners.append(value[:7])
+    return tuple(corners)
+
+
+@lru_cache(maxsize=256)
+def _extended(corners: Tuple[str, ...]) -> Tuple[str, ...]:
+    rgb, valid = parse_hex(corners)
+    if not valid.all():
+        return ()
+    return tuple(to_hex(oklab_to_srgb(synthesize(srgb_to_oklab(rgb)))))
+
+
+def extended_colors(colors: Dict[str, str], prefix: str = '') -> Dict[str, str]:
+    """``color16`` ... ``color255`` for a theme's base colours.
+
+    Results are cached by the corner colours, so a theme's palette is only
+    recomputed when one of them changes. Empty if a corner isn't a colour.
+    """
+    return {f"color{16 + i}": value for i, value in enumerate(_extended(corner_colors(colors, prefix)))}
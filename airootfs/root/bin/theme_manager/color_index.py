@@ -0,0 +1,350 @@
+from fnmatch import fnmatch
+import heapq
+import threading
+from typing import Dict, List, Any, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from color_space import parse_hex, srgb_to_oklab
+
+# Points per KD-tree leaf; leaves are scanned with one vectorised distance
+_LEAF_SIZE = 128
+# Rebuild once this share of the tree is pending additions or deletions
+_REBUILD_RATIO = 0.25
+_MIN_REBUILD = 256
+
+
+class ColorMatch(NamedTuple):
+    theme: str
+    # Theme keys using the matched colour
+    keys: Tuple[str, ...]
+    color: str
+    # OKLab distance (about 0.02 is a just-noticeable difference)
+    distance: float
+
+
+class KDTree:
+    """Static KD-tree over (N, 3) points.
+
+    Nodes are stored in flat arrays: bounding boxes for pruning, children
+    for inner nodes and [start, end) ranges into the permuted points for
+    leaves.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = _LEAF_SIZE):
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(points))
+        self.points = points
+        self.lower: List[np.ndarray] = []
+        self.upper: List[np.ndarray] = []
+        self.children: List[Tuple[int, int]] = []
+        self.ranges: List[Tuple[int, int]] = []
+        if len(points):
+            self._build(0, len(points))
+        self.points = points[self.order]
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self.children)
+        subset = self.points[self.order[start:end]]
+        self.lower.append(subset.min(axis=0))
+        self.upper.append(subset.max(axis=0))
+        self.children.append((-1, -1))
+        self.ranges.append((start, end))
+        if end - start <= self.leaf_size:
+            return node
+
+        # Split the widest dimension at its median
+        axis = int((self.upper[node] - self.lower[node]).argmax())
+        middle = (end - start) // 2
+        part = np.argpartition(subset[:, axis], middle)
+        self.order[start:end] = self.order[start:end][part]
+        left = self._build(start, start + middle)
+        right = self._build(start + middle, end)
+        self.children[node] = (left, right)
+        return node
+
+    def query(self, point: np.ndarray, k: int, max_distance: float = np.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """Distances and original indices of up to ``k`` nearest points"""
+        if not self.children or k <= 0:
+            return np.zeros(0), np.zeros(0, dtype=int)
+        best_d = np.zeros(0)
+        best_i = np.zeros(0, dtype=int)
+        bound = max_distance
+        heap = [(0.0, 0)]
+        while heap:
+            box_distance, node = heapq.heappop(heap)
+            if box_distance > bound:
+                break
+            left, right = self.children[node]
+            if left < 0:
+                start, end = self.ranges[node]
+                d = np.sqrt(((self.points[start:end] - point) ** 2).sum(axis=1))
+                keep = d <= bound
+                best_d = np.concatenate([best_d, d[keep]])
+                best_i = np.concatenate([best_i, self.order[start:end][keep]])
+                if len(best_d) > k:
+                    top = np.argpartition(best_d, k - 1)[:k]
+                    best_d, best_i = best_d[top], best_i[top]
+                if len(best_d) == k:
+                    bound = min(bound, best_d.max())
+                continue
+            for child in (left, right):
+                gap = np.maximum(self.lower[child] - point, 0) + np.maximum(point - self.upper[child], 0)
+                heapq.heappush(heap, (float(np.sqrt((gap ** 2).sum())), child))
+        order = np.argsort(best_d)
+        return best_d[order], best_i[order]
+
+    def query_radius(self, points: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Every point within ``radius`` of each of the (Q, 3) ``points``.
+
+        Returns (query, distance, index) arrays with one entry per pair.
+        All query points walk the tree together, so each node costs one
+        vectorised box test however many of them reach it.
+        """
+        found_q = [np.zeros(0, dtype=int)]
+        found_d = [np.zeros(0)]
+        found_i = [np.zeros(0, dtype=int)]
+        stack = [(0, np.arange(len(points)))] if self.children else []
+        while stack:
+            node, active = stack.pop()
+            near = points[active]
+            gap = np.maximum(self.lower[node] - near, 0) + np.maximum(near - self.upper[node], 0)
+            active = active[(gap ** 2).sum(axis=1) <= radius ** 2]
+            if not len(active):
+                continue
+            left, right = self.children[node]
+            if left >= 0:
+                stack.extend([(left, active), (right, active)])
+                continue
+            start, end = self.ranges[node]
+            d = np.sqrt(((self.points[None, start:end] - points[active, None]) ** 2).sum(axis=2))
+            query, leaf = np.nonzero(d <= radius)
+            found_q.append(active[query])
+            found_d.append(d[query, leaf])
+            found_i.append(self.order[start + leaf])
+        return np.concatenate(found_q), np.concatenate(found_d), np.concatenate(found_i)
+
+
+class ColorIndex:
+    """Nearest-colour index over every theme's colours in OKLab.
+
+    Each distinct colour of a theme is one point. Saves and deletes are
+    applied incrementally: new points go to a small buffer that is scanned
+    linearly, deleted ones are masked out, and the KD-tree is rebuilt only
+    once those make up a quarter of it.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._store_themes: Optional[List[Dict[str, Any]]] = None
+        self._colors: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.RLock()
+        self._reset([])
+
+    def update(self, theme: Dict[str, Any]):
+        """Index a saved theme, replacing its previous colours"""
+        with self._lock:
+            self._update(theme)
+            self._maybe_rebuild()
+
+    def remove(self, name: str):
+        """Drop a deleted theme's colours"""
+        with self._lock:
+            self._remove(name)
+            self._colors.pop(name, None)
+            self._maybe_rebuild()
+
+    def sync(self):
+        """Catch up with the store, touching only themes that changed"""
+        if self.store is None:
+            return
+        with self._lock:
+            themes = self.store.themes()
+            if themes == self._store_themes:
+                return
+            names = {theme['name'] for theme in themes}
+            removed = [name for name in self._colors if name not in names]
+            changed = [theme for theme in themes if self._colors.get(theme['name']) != theme['colors']]
+            if len(removed) + len(changed) >= _MIN_REBUILD:
+                # Bulk import or first load: one build beats many small updates
+                self._colors = {theme['name']: dict(theme['colors']) for theme in themes}
+                self._rebuild()
+            else:
+                for name in removed:
+                    self._remove(name)
+                    self._colors.pop(name, None)
+                for theme in changed:
+                    self._update(theme)
+                self._maybe_rebuild()
+            self._store_themes = themes
+
+    def nearest(self, color: str, count: int = 10, key_patterns: Sequence[str] = (),
+                max_distance: float = np.inf) -> List[ColorMatch]:
+        """Themes with a colour closest to ``color``, one match per theme.
+
+        ``key_patterns`` (fnmatch, e.g. 'niri_active-color' or 'kitty_color*')
+        limits which theme keys count.
+        """
+        rgb, valid = parse_hex([color])
+        if not valid[0]:
+            raise ValueError(f"Not a hex colour: {color}")
+        point = srgb_to_oklab(rgb[0])
+        self.sync()
+
+        with self._lock:
+            # Widen the search until enough distinct themes match the filters
+            meta = self._meta()
+            k = count * 4
+            while True:
+                distances, rows = self._query(point, k, max_distance)
+                matches: Dict[str, ColorMatch] = {}
+                for distance, row in zip(distances.tolist(), rows.tolist()):
+                    name, keys, hex_color = meta[row]
+                    if key_patterns:
+                        keys = tuple(key for key in keys if any(fnmatch(key, p) for p in key_patterns))
+                    if keys and name not in matches:
+                        matches[name] = ColorMatch(name, keys, hex_color, distance)
+                if len(matches) >= count or len(rows) < k:
+                    return list(matches.values())[:count]
+                k *= 4
+
+    def similar(self, theme: Dict[str, Any], count: int = 10, radius: float = 0.1) -> List[Tuple[str, float]]:
+        """Themes whose colours lie closest to this theme's.
+
+        Scores are the mean distance from each of the theme's colours to
+        the other theme's nearest one, capped at ``radius``; only points
+        within ``radius`` are visited, and every one of them counts.
+        """
+        points = self._points_of(theme['colors'])
+        self.sync()
+        if not len(points):
+            return []
+
+        with self._lock:
+            meta = self._meta()
+            names, theme_of = np.unique(np.array([name for name, _, _ in meta], dtype=str), return_inverse=True)
+            queries, distances, rows = self._query_radius(points, radius)
+
+        # Colours with no match within the radius count as the full radius
+        nearest = np.full((len(points), len(names)), radius)
+        np.minimum.at(nearest, (queries, theme_of[rows]), distances)
+        matched = np.bincount(theme_of[rows], minlength=len(names)) > 0
+        totals = nearest.mean(axis=0)
+        scores = sorted((total, name) for name, total, hit in zip(names.tolist(), totals.tolist(), matched)
+                        if hit and name != theme['name'])
+        return [(name, score) for score, name in scores[:count]]
+
+    def similar_brute_force(self, theme: Dict[str, Any], count: int = 10,
+                            radius: float = 0.1) -> List[Tuple[str, float]]:
+        """similar() by measuring every point, to check the tree's results"""
+        points = self._points_of(theme['colors'])
+        self.sync()
+        if not len(points):
+            return []
+
+        with self._lock:
+            names = [name for name, _, _ in self._meta()]
+            everything = np.empty((len(self._tree_meta), 3))
+            everything[self._tree.order] = self._tree.points
+            everything = np.concatenate([everything, np.array([p for _, p in self._pending]).reshape(-1, 3)])
+            live = np.concatenate([~self._deleted, np.ones(len(self._pending), dtype=bool)])
+        labels, ids = np.unique(np.array(names, dtype=str)[live], return_inverse=True)
+        everything = everything[live]
+
+        totals = np.zeros(len(labels))
+        for point in points:
+            distances = np.sqrt(((everything - point) ** 2).sum(axis=1))
+            nearest = np.full(len(labels), radius)
+            np.minimum.at(nearest, ids, distances)
+            totals += nearest
+
+        scores = sorted((total / len(points), name) for name, total in zip(labels.tolist(), totals.tolist())
+                        if name != theme['name'])
+        return [(name, score) for score, name in scores[:count]]
+
+    def _query(self, point: np.ndarray, k: int, max_distance: float) -> Tuple[np.ndarray, np.ndarray]:
+        distances, rows = self._tree.query(point, k + int(self._deleted.sum()), max_distance)
+        live = ~self._deleted[rows]
+        distances, rows = distances[live], rows[live]
+
+        if self._pending:
+            start = len(self._tree_meta)
+            pending = np.array([p for _, p in self._pending])
+            d = np.sqrt(((pending - point) ** 2).sum(axis=1))
+            alive = d <= max_distance
+            distances = np.concatenate([distances, d[alive]])
+            rows = np.concatenate([rows, start + np.nonzero(alive)[0]])
+
+        order = np.argsort(distances)[:k]
+        return distances[order], rows[order]
+
+    def _query_radius(self, points: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        queries, distances, rows = self._tree.query_radius(points, radius)
+        live = ~self._deleted[rows]
+        queries, distances, rows = queries[live], distances[live], rows[live]
+
+        if self._pending:
+            start = len(self._tree_meta)
+            pending = np.array([p for _, p in self._pending])
+            d = np.sqrt(((pending[None] - points[:, None]) ** 2).sum(axis=2))
+            query, row = np.nonzero(d <= radius)
+            queries = np.concatenate([queries, query])
+            distances = np.concatenate([distances, d[query, row]])
+            rows = np.concatenate([rows, start + row])
+        return queries, distances, rows
+
+    def _meta(self) -> List[Tuple[str, Tuple[str, ...], str]]:
+        """(theme, keys, colour) per row: tree points, then pending ones"""
+        return self._tree_meta + [meta for meta, _ in self._pending]
+
+    def _update(self, theme: Dict[str, Any]):
+        self._remove(theme['name'])
+        self._colors[theme['name']] = dict(theme['colors'])
+        self._pending.extend(self._theme_points(theme['name'], theme['colors']))
+
+    def _remove(self, name: str):
+        for row in self._rows.pop(name, []):
+            self._deleted[row] = True
+        self._pending = [(meta, p) for meta, p in self._pending if meta[0] != name]
+
+    def _theme_points(self, name: str, colors: Dict[str, str]) -> List[Tuple[Tuple[str, Tuple[str, ...], str], np.ndarray]]:
+        return self._points([(name, colors)])
+
+    def _points(self, themes: List[Tuple[str, Dict[str, str]]]) -> List[Tuple[Tuple[str, Tuple[str, ...], str], np.ndarray]]:
+        """One (meta, OKLab point) row per distinct colour of each theme,
+        with every colour of every theme converted in one batch.
+        """
+        meta = []
+        for name, colors in themes:
+            by_color: Dict[str, List[str]] = {}
+            for key, value in colors.items():
+                if isinstance(value, str) and value.startswith('#'):
+                    by_color.setdefault(value[:7].lower(), []).append(key)
+            meta.extend((name, tuple(keys), hex_color) for hex_color, keys in by_color.items())
+        if not meta:
+            return []
+        rgb, valid = parse_hex([hex_color for _, _, hex_color in meta])
+        lab = srgb_to_oklab(rgb)
+        return [(row, point) for row, point, ok in zip(meta, lab, valid) if ok]
+
+    def _points_of(self, colors: Dict[str, str]) -> np.ndarray:
+        rows = self._theme_points('', colors)
+        return np.array([p for _, p in rows]).reshape(-1, 3)
+
+    def _maybe_rebuild(self):
+        size = max(len(self._tree_meta), 1)
+        stale = len(self._pending) + int(self._deleted.sum())
+        if stale >= max(_MIN_REBUILD, size * _REBUILD_RATIO):
+            self._rebuild()
+
+    def _rebuild(self):
+        self._reset(self._points(list(self._colors.items())))
+
+    def _reset(self, rows):
+        self._tree_meta = [meta for meta, _ in rows]
+        self._tree = KDTree(np.array([p for _, p in rows]).reshape(-1, 3))
+        self._deleted = np.zeros(len(rows), dtype=bool)
+        self._pending: List[Tuple[Tuple[str, Tuple[str, ...], str], np.ndarray]] = []
+        self._rows: Dict[str, List[int]] = {}
+        for row, meta in enumerate(self._tree_meta):
+            self._rows.setdefault(meta[0], []).append(row)
@@ -0,0 +1,110 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+# Batch colour conversions between sRGB, OKLab and OKLCH. Every function
+# works on arrays shaped (..., 3), so a whole theme (or library) converts
+# in one call.
+
+_LMS_FROM_LINEAR = np.array([
+    [0.4122214708, 0.5363325363, 0.0514459929],
+    [0.2119034982, 0.6806995451, 0.1073969566],
+    [0.0883024619, 0.2817188376, 0.6299787005],
+])
+_LAB_FROM_LMS = np.array([
+    [0.2104542553, 0.7936177850, -0.0040720468],
+    [1.9779984951, -2.4285922050, 0.4505937099],
+    [0.0259040371, 0.7827717662, -0.8086757660],
+])
+_LMS_FROM_LAB = np.linalg.inv(_LAB_FROM_LMS)
+_LINEAR_FROM_LMS = np.linalg.inv(_LMS_FROM_LINEAR)
+
+# Hex digit value of each ASCII code, -1 for everything else (index 128: non-ASCII)
+_NIBBLES = np.full(129, -1, dtype=np.int16)
+for _digit in '0123456789abcdefABCDEF':
+    _NIBBLES[ord(_digit)] = int(_digit, 16)
+
+
+def parse_hex(colors: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """'#rrggbb' / '#rrggbbaa' strings -> (rgb in 0..1, valid mask).
+
+    Alpha is ignored; invalid entries get NaN rows.
+    """
+    # Fixed-width UTF-32 codes, one row per string, decoded with a lookup table
+    text = [c if isinstance(c, str) and len(c) in (7, 9) else '' for c in colors]
+    codes = np.array(text, dtype='U9').view(np.uint32).reshape(len(text), 9)
+    nibbles = _NIBBLES[np.minimum(codes, 128)]
+    digits = nibbles[:, 1:] >= 0
+    seven = codes[:, 7] == 0
+    valid = (codes[:, 0] == ord('#')) & digits[:, :6].all(axis=1) & (seven | digits[:, 6:].all(axis=1))
+
+    rgb = np.full((len(text), 3), np.nan)
+    pairs = nibbles[valid, 1:7].reshape(-1, 3, 2)
+    rgb[valid] = (pairs[..., 0] * 16 + pairs[..., 1]) / 255.0
+    return rgb, valid
+
+
+def to_hex(rgb: np.ndarray) -> List[str]:
+    """rgb in 0..1 (clipped) -> '#rrggbb' strings"""
+    raw = np.round(np.clip(rgb, 0.0, 1.0) * 255).astype(np.uint8).reshape(-1, 3).tobytes().hex()
+    return [f"#{raw[i:i + 6]}" for i in range(0, len(raw), 6)]
+
+
+def srgb_to_linear(rgb: np.ndarray) -> np.ndarray:
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_srgb(linear: np.ndarray) -> np.ndarray:
+    linear = np.clip(linear, 0.0, None)
+    return np.where(linear <= 0.0031308, linear * 12.92, 1.055 * linear ** (1 / 2.4) - 0.055)
+
+
+def srgb_to_oklab(rgb: np.ndarray) -> np.ndarray:
+    lms = srgb_to_linear(rgb) @ _LMS_FROM_LINEAR.T
+    return np.cbrt(lms) @ _LAB_FROM_LMS.T
+
+
+def oklab_to_linear(lab: np.ndarray) -> np.ndarray:
+    return (lab @ _LMS_FROM_LAB.T) ** 3 @ _LINEAR_FROM_LMS.T
+
+
+def oklab_to_srgb(lab: np.ndarray) -> np.ndarray:
+    """OKLab -> sRGB, clipped to the gamut"""
+    return np.clip(linear_to_srgb(oklab_to_linear(lab)), 0.0, 1.0)
+
+
+def oklab_to_oklch(lab: np.ndarray) -> np.ndarray:
+    chroma = np.hypot(lab[..., 1], lab[..., 2])
+    hue = np.degrees(np.arctan2(lab[..., 2], lab[..., 1])) % 360
+    return np.stack([lab[..., 0], chroma, hue], axis=-1)
+
+
+def oklch_to_oklab(lch: np.ndarray) -> np.ndarray:
+    hue = np.radians(lch[..., 2])
+    return np.stack([lch[..., 0], lch[..., 1] * np.cos(hue), lch[..., 1] * np.sin(hue)], axis=-1)
+
+
+def fit_gamut(lch: np.ndarray, steps: int = 12) -> np.ndarray:
+    """Lower the chroma of out-of-gamut OKLCH colours until they fit in sRGB,
+    keeping lightness and hue. Bisects all colours at once.
+    """
+    lch = lch.copy()
+    lch[..., 0] = np.clip(lch[..., 0], 0.0, 1.0)
+    outside = ~_in_gamut(lch)
+    if not outside.any():
+        return lch
+    low = np.zeros(outside.sum())
+    high = lch[outside, 1]
+    probe = lch[outside]
+    for _ in range(steps):
+        probe[:, 1] = (low + high) / 2
+        fits = _in_gamut(probe)
+        low = np.where(fits, probe[:, 1], low)
+        high = np.where(fits, high, probe[:, 1])
+    lch[outside, 1] = low
+    return lch
+
+
+def _in_gamut(lch: np.ndarray, tolerance: float = 1e-4) -> np.ndarray:
+    linear = oklab_to_linear(oklch_to_oklab(lch))
+    return ((linear >= -tolerance) & (linear <= 1 + tolerance)).all(axis=-1)
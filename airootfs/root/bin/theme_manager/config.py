@@ -1,7 +1,9 @@
 from pathlib import Path
+import os
 
 HOME = Path.home()
 CONF_DIR = HOME / ".config"
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", HOME / ".cache"))
 
 APP_CONFIGS = {
     "niri": CONF_DIR / "niri/themes",
@@ -12,6 +14,10 @@ APP_CONFIGS = {
     "waybar": CONF_DIR / "waybar/themes/css",
     "nvim": CONF_DIR / "nvim/themes",
     "rofi": CONF_DIR / "rofi/colors",
+    "foot": CONF_DIR / "foot/themes",
+    "tofi": CONF_DIR / "tofi/themes",
+    "vesktop": CONF_DIR / "vesktop/themes",
+    "fish": CONF_DIR / "fish/themes",
 }
 
 ACTIVE_CONFIGS = {
@@ -23,12 +29,28 @@ ACTIVE_CONFIGS = {
     "waybar": CONF_DIR / "waybar/theme.css",
     "superfile": CONF_DIR / "superfile/theme/current.toml",
     "rofi": CONF_DIR / "rofi/colors/current.rasi",
+    "foot": CONF_DIR / "foot/foot.ini",
+    "tofi": CONF_DIR / "tofi/config",
+    "vesktop": CONF_DIR / "vesktop/themes/current.theme.css",
+    "fish": CONF_DIR / "fish/conf.d/strix_theme.fish",
 }
 
 THEME_MANAGER_DIR = CONF_DIR / "theme-manager"
 THEMES_FILE = THEME_MANAGER_DIR / "themes.json"
 STATE_FILE = THEME_MANAGER_DIR / "state.json"
+HOOKS_DIR = THEME_MANAGER_DIR / "hooks"
+WALLPAPER_BAG_FILE = THEME_MANAGER_DIR / "wallpaper_bags.json"
 WALLS_DIR = CONF_DIR / "walls"
+# freedesktop.org thumbnail cache, shared with file managers
+THUMBNAIL_DIR = CACHE_DIR / "thumbnails" / "x-large"
+WALLPAPER_INDEX_FILE = CACHE_DIR / "strix-theme-manager" / "wallpapers.json"
+# Wallpapers pre-fitted to the output resolution
+WALLPAPER_CACHE_DIR = CACHE_DIR / "strix-theme-manager" / "fitted"
+# Palettes extracted from images, keyed by file hash
+PALETTE_CACHE_DIR = CACHE_DIR / "strix-theme-manager" / "palettes"
+SIGNATURE_CACHE_FILE = CACHE_DIR / "strix-theme-manager" / "signatures.npz"
+# Rendered theme previews, keyed by a hash of the theme's colours
+PREVIEW_CACHE_DIR = CACHE_DIR / "strix-theme-manager" / "previews"
 
 THEME_MANAGER_DIR.mkdir(parents=True, exist_ok=True)
 for app_dir in APP_CONFIGS.values():
@@ -0,0 +1,164 @@
+from typing import Dict, List, Any, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from color_space import parse_hex, to_hex, srgb_to_linear, linear_to_srgb
+
+_LUMINANCE = np.array([0.2126, 0.7152, 0.0722])
+# Suggested colours aim this far above the minimum so 8-bit rounding can't undo them
+_HEADROOM = 0.05
+
+
+class ContrastPair(NamedTuple):
+    app: str
+    # Theme keys (with the app prefix); fixes adjust ``key``
+    key: str
+    against: str
+    minimum: float
+
+
+class ContrastIssue(NamedTuple):
+    theme: str
+    app: str
+    key: str
+    against: str
+    ratio: float
+    minimum: float
+    # Closest passing colour of the same hue, lighter or darker
+    suggestion: Optional[str]
+
+
+def contrast_pairs(parsers: Dict[str, Any]) -> List[ContrastPair]:
+    """Every app's (key, background) pairs from its parser spec"""
+    return [
+        ContrastPair(app, f"{app}_{key}", f"{app}_{against}", minimum)
+        for app, parser in parsers.items()
+        for key, against, minimum in parser.spec.contrast
+    ]
+
+
+def relative_luminance(rgb: np.ndarray) -> np.ndarray:
+    """WCAG relative luminance of sRGB colours in 0..1"""
+    return srgb_to_linear(rgb) @ _LUMINANCE
+
+
+def contrast_ratio(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """WCAG contrast ratio between two arrays of luminances"""
+    return (np.maximum(a, b) + 0.05) / (np.minimum(a, b) + 0.05)
+
+
+def audit(themes: Sequence[Dict[str, Any]], pairs: Sequence[ContrastPair],
+          suggest: bool = False) -> List[ContrastIssue]:
+    """Check every pair in every theme in one pass.
+
+    Each distinct colour string is parsed once; ratios for the whole
+    library are then a few array operations on a (themes, pairs) grid.
+    Pairs with a missing or non-hex colour are skipped.
+    """
+    if not themes or not pairs:
+        return []
+    keys = list(dict.fromkeys(k for pair in pairs for k in (pair.key, pair.against)))
+    position = {key: i for i, key in enumerate(keys)}
+    lookup: Dict[Any, int] = {}
+    grid = np.array([
+        lookup.setdefault(theme['colors'].get(key), len(lookup)) for theme in themes for key in keys
+    ]).reshape(len(themes), len(keys))
+
+    # (themes, pairs) matrices of colour indices
+    fg = grid[:, [position[pair.key] for pair in pairs]]
+    bg = grid[:, [position[pair.against] for pair in pairs]]
+    minimum = np.array([pair.minimum for pair in pairs])
+
+    rgb, valid = parse_hex(list(lookup))
+    luminance = relative_luminance(np.nan_to_num(rgb))
+    ratio = contrast_ratio(luminance[fg], luminance[bg])
+    theme_rows, pair_rows = np.nonzero(valid[fg] & valid[bg] & (ratio < minimum))
+    failing_fg, failing_bg = fg[theme_rows, pair_rows], bg[theme_rows, pair_rows]
+
+    suggestions: List[Optional[str]] = [None] * len(theme_rows)
+    if suggest and len(theme_rows):
+        suggestions = suggest_colors(rgb[failing_fg], luminance[failing_bg], minimum[pair_rows])
+
+    issues = []
+    for t, p, suggestion in zip(theme_rows.tolist(), pair_rows.tolist(), suggestions):
+        pair = pairs[p]
+        issues.append(ContrastIssue(
+            themes[t]['name'], pair.app, pair.key, pair.against, float(ratio[t, p]), pair.minimum, suggestion
+        ))
+    return issues
+
+
+def suggest_colors(rgb: np.ndarray, against: np.ndarray, minimum: np.ndarray) -> List[Optional[str]]:
+    """Nearest passing colour for each row, in closed form.
+
+    Luminance is linear in linear-light RGB, so scaling a colour there
+    reaches an exact target luminance without changing its hue. Where a
+    channel saturates first, the rest is made up by mixing towards white.
+    """
+    linear = srgb_to_linear(rgb)
+    luminance = linear @ _LUMINANCE
+    goal = minimum + _HEADROOM
+    lighter_target = goal * (against + 0.05) - 0.05
+    darker_target = (against + 0.05) / goal - 0.05
+
+    # Keep the side of the background the colour is already on, if it can pass there
+    can_lighten = lighter_target <= 1.0
+    can_darken = darker_target >= 0.0
+    lighten = np.where(luminance >= against, can_lighten | ~can_darken, ~can_darken)
+    target = np.clip(np.where(lighten, lighter_target, darker_target), 0.0, 1.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(luminance > 0, target / luminance, np.inf)
+        scale = np.minimum(scale, 1.0 / linear.max(axis=1))
+        scale = np.nan_to_num(np.where(lighten, scale, target / luminance), nan=0.0, posinf=0.0)
+        scaled = linear * scale[:, None]
+        scaled_luminance = scaled @ _LUMINANCE
+        mix = np.where(lighten, (target - scaled_luminance) / (1.0 - scaled_luminance), 0.0)
+    mix = np.clip(np.nan_to_num(mix), 0.0, 1.0)
+    fixed = linear_to_srgb(scaled + (1.0 - scaled) * mix[:, None])
+
+    hexes = to_hex(fixed)
+    rounded, _ = parse_hex(hexes)
+    passes = contrast_ratio(relative_luminance(rounded), against) >= minimum
+    return [hex_color if ok else None for hex_color, ok in zip(hexes, passes)]
+
+
+def apply_fixes(themes: Sequence[Dict[str, Any]], issues: Sequence[ContrastIssue]) -> List[Dict[str, Any]]:
+    """Copies of the themes that had issues, with suggestions applied"""
+    by_theme: Dict[str, Dict[str, str]] = {}
+    for issue in issues:
+        if issue.suggestion is not None:
+            # The first suggestion for a key wins; a rerun handles the rest
+            by_theme.setdefault(issue.theme, {}).setdefault(issue.key, issue.suggestion)
+
+    fixed = []
+    for theme in themes:
+        changes = by_theme.get(theme['name'])
+        if changes:
+            colors = dict(theme['colors'])
+            for key, suggestion in changes.items():
+                # Keep any alpha suffix of the original
+                colors[key] = suggestion + colors[key][7:]
+            fixed.append({**theme, 'colors': colors})
+    return fixed
+
+
+def fix_themes(themes: Sequence[Dict[str, Any]], pairs: Sequence[ContrastPair],
+               passes: int = 3) -> Tuple[List[Dict[str, Any]], List[ContrastIssue]]:
+    """Apply suggestions until every pair passes or ``passes`` runs out.
+
+    A key checked against several backgrounds may need more than one
+    round. Returns the changed themes and the issues left.
+    """
+    current = {theme['name']: theme for theme in themes}
+    changed = set()
+    issues = audit(themes, pairs, suggest=True)
+    for _ in range(passes):
+        fixed = apply_fixes([current[name] for name in dict.fromkeys(i.theme for i in issues)], issues)
+        if not fixed:
+            break
+        for theme in fixed:
+            current[theme['name']] = theme
+            changed.add(theme['name'])
+        issues = audit(list(current.values()), pairs, suggest=True)
+    return [current[name] for name in current if name in changed], issues
@@ -0,0 +1,197 @@
+from typing import Dict
+
+
+# Colors for a new theme, organized by app. Also the template that
+# generated themes (e.g. from a wallpaper) are mapped onto.
+DEFAULT_COLORS: Dict[str, Dict[str, str]] = {
+    'kitty': {
+        'background': '#0e091d',
+        'foreground': '#14B9B5',
+        'selection_foreground': '#0e091d',
+        'selection_background': '#14B9B5',
+        'cursor': '#ff7f41',
+        'cursor_text_color': '#0e091d',
+        'active_tab_foreground': '#0e091d',
+        'active_tab_background': '#14B9B5',
+        'inactive_tab_foreground': '#0e091d',
+        'inactive_tab_background': '#14B9B5',
+        'color0': '#000000',
+        'color1': '#c8e967',
+        'color2': '#E20342',
+        'color3': '#7cd699',
+        'color4': '#BE3F50',
+        'color5': '#9147a8',
+        'color6': '#FF7F41',
+        'color7': '#A60234',
+        'color8': '#c53253',
+        'color9': '#CE4F48',
+        'color10': '#f93d3b',
+        'color11': '#FD3E6A',
+        'color12': '#04C5F0',
+        'color13': '#6C032C',
+        'color14': '#ffbe74',
+        'color15': '#11AEB3',
+    },
+    'niri': {
+        'border_width': '2.2',
+        'active-color': '#BE3F50',
+        'inactive-color': '#0e091d',
+        'urgent-color': '#14B9B5',
+    },
+    'btop': {
+        'main_bg': '#0e091d',
+        'main_fg': '#14b9b5',
+        'title': '#14b9b5',
+        'hi_fg': '#ff7f41',
+        'selected_bg': '#c8e967',
+        'selected_fg': '#000000',
+        'inactive_fg': '#c53253',
+        'graph_text': '#fd3e6a',
+        'meter_bg': '#918F9A',
+        'proc_misc': '#7cd699',
+        'cpu_box': '#e20342',
+        'mem_box': '#7cd699',
+        'net_box': '#917a8',
+        'proc_box': '#c8e967',
+        'div_line': '#a60234',
+    },
+    'nvim': {
+        'hex_0e091d': '#0e091d',
+        'hex_061F23': '#061F23',
+        'hex_092F34': '#092F34',
+        'hex_14B9B5': '#14B9B5',
+        'hex_C8E967': '#C8E967',
+        'hex_9147a8': '#9147a8',
+        'hex_E20342': '#E20342',
+        'hex_FF7F41': '#FF7F41',
+        'hex_04C5F0': '#04C5F0',
+        'hex_f93d3b': '#f93d3b',
+        'hex_ffbe74': '#ffbe74',
+        'hex_FD3E6A': '#FD3E6A',
+        'hex_7cd699': '#7cd699',
+    },
+    'waybar': {
+        'bg0_h': '#0e091d',
+        'bg0': '#0a1528',
+        'bg1': '#383450',
+        'bg2': '#454063',
+        'fg0': '#14b9b5',
+        'gray': '#918daa',
+        'border': '#BE3F50',  # This is the green color
+        'red': '#cc241d',
+        'yellow': '#d79921',
+        'blue': '#458588',
+        'purple': '#eb6f93',
+        'dark_purple': '#1d062d',
+        'aqua': '#689d6a',
+        'orange': '#d65d0e',
+        'white': '#ffffff',
+        'black': '#000000',
+    },
+    'superfile': {
+        'full_screen_fg': '#14B9B5',
+        'full_screen_bg': '#0e091d',
+        'gradient_0': '#14B9B5',
+        'gradient_1': '#A60234',
+        'file_panel_fg': '#14B9B5',
+        'file_panel_bg': '#0e091d',
+        'file_panel_border': '#A60234',
+        'file_panel_border_active': '#BE3F50',
+        'file_panel_top_directory_icon': '#000000',
+        'file_panel_top_path': '#c53253',
+        'file_panel_item_selected_fg': '#c53253',
+        'file_panel_item_selected_bg': '#0e091d',
+        'footer_fg': '#14B9B5',
+        'footer_bg': '#0e091d',
+        'footer_border': '#BE3F50',
+        'sidebar_fg': '#14B9B5',
+        'sidebar_bg': '#0e091d',
+        'sidebar_title': '#11AEB3',
+        'sidebar_border': '#A60234',
+        'sidebar_border_active': '#BE3F50',
+        'modal_fg': '#14B9B5',
+        'modal_bg': '#0e091d',
+        'modal_border_active': '#BE3F50',
+        'cursor': '#14B9B5',
+        'correct': '#E20342',
+        'error': '#c8e967',
+        'hint': '#FF7F41',
+    },
+    'rofi': {
+        'background': '#0e091d',
+        'background-alt': '#0a1528',
+        'foreground': '#14b9b5',
+        'selected': '#0ABDC6',
+        'active': '#00a138',
+        'urgent': '#E20342',
+    },
+    'dunst': {
+        'frame_color': '#BE3F50',
+        'urgency_low_background': '#0e091d',
+        'urgency_low_foreground': '#14b9b5',
+        'urgency_normal_background': '#0e091d',
+        'urgency_normal_foreground': '#14b9b5',
+        'urgency_critical_background': '#0e091d',
+        'urgency_critical_foreground': '#14b9b5',
+        'urgency_critical_frame_color': '#c8e967',
+    },
+    'foot': {
+        'background': '#0e091d',
+        'foreground': '#14B9B5',
+        'selection-background': '#14B9B5',
+        'selection-foreground': '#0e091d',
+        'regular0': '#000000',
+        'regular1': '#c8e967',
+        'regular2': '#E20342',
+        'regular3': '#7cd699',
+        'regular4': '#BE3F50',
+        'regular5': '#9147a8',
+        'regular6': '#FF7F41',
+        'regular7': '#A60234',
+        'bright0': '#c53253',
+        'bright1': '#CE4F48',
+        'bright2': '#f93d3b',
+        'bright3': '#FD3E6A',
+        'bright4': '#04C5F0',
+        'bright5': '#6C032C',
+        'bright6': '#ffbe74',
+        'bright7': '#11AEB3',
+    },
+    'tofi': {
+        'text-color': '#14B9B5',
+        'prompt-color': '#BE3F50',
+        'selection-color': '#FF7F41',
+        'background-color': '#0e091d',
+        'border-color': '#BE3F50',
+        'outline-color': '#0e091d',
+    },
+    'vesktop': {
+        'background-primary': '#0e091d',
+        'background-secondary': '#0a1528',
+        'background-tertiary': '#061F23',
+        'text-normal': '#14B9B5',
+        'text-muted': '#918daa',
+        'header-primary': '#11AEB3',
+        'interactive-normal': '#14B9B5',
+        'brand-experiment': '#BE3F50',
+    },
+    'fish': {
+        'color_normal': '#14B9B5',
+        'color_command': '#04C5F0',
+        'color_param': '#11AEB3',
+        'color_quote': '#ffbe74',
+        'color_redirection': '#9147a8',
+        'color_end': '#7cd699',
+        'color_error': '#E20342',
+        'color_comment': '#918daa',
+        'color_operator': '#FF7F41',
+        'color_autosuggestion': '#454063',
+        'pager_color_prefix': '#BE3F50',
+        'pager_color_description': '#918daa',
+    },
+}
+
+
+def default_theme_colors() -> Dict[str, str]:
+    """DEFAULT_COLORS flattened to theme keys ('kitty_background', ...)"""
+    return {f"{app}_{k}": v for app, colors in DEFAULT_COLORS.items() for k, v in colors.items()}
@@ -0,0 +1,44 @@
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+class ApplySignals(QObject):
+    progress = pyqtSignal(str, int, int)
+    finished = pyqtSignal(bool)
+
+class ApplyWorker(QRunnable):
+    """Run ThemeManager.apply_theme on a QThreadPool thread"""
+
+    def __init__(self, theme_manager, name, apps, apply_wallpaper, transition, per_output=False):
+        super().__init__()
+        self.theme_manager = theme_manager
+        self.name = name
+        self.apps = apps
+        self.apply_wallpaper = apply_wallpaper
+        self.transition = transition
+        self.per_output = per_output
+        self.signals = ApplySignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Stop before the next app; the current step still completes"""
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def run(self):
+        try:
+            ok = self.theme_manager.apply_theme(
+                self.name,
+                self.apps,
+                apply_wallpaper=self.apply_wallpaper,
+                transition=self.transition,
+                wallpaper_per_output=self.per_output,
+                progress=self.signals.progress.emit,
+                is_cancelled=self._cancel.is_set
+            )
+        except Exception as e:
+            print(f"Error applying theme: {e}")
+            ok = False
+        self.signals.finished.emit(ok)
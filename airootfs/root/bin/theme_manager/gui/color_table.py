@@ -0,0 +1,178 @@
+from typing import Dict, List
+
+from PyQt6.QtWidgets import (
+    QStyledItemDelegate, QStyle, QWidget, QHBoxLayout, QLineEdit, QPushButton, QColorDialog
+)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, QRect, pyqtSignal
+from PyQt6.QtGui import QColor
+
+NAME_COLUMN = 0
+COLOR_COLUMN = 1
+
+def app_of(key: str) -> str:
+    """Colors without prefix go to the "General" tab"""
+    return key.split('_')[0] if '_' in key else 'general'
+
+
+class ColorTableModel(QAbstractTableModel):
+    """Flat table of (key, value) colour entries for every app"""
+
+    def __init__(self, colors: Dict[str, str], parent=None):
+        super().__init__(parent)
+        self._rows: List[List[str]] = [[k, v] for k, v in colors.items()]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return ("Key", "Color")[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        key, value = self._rows[index.row()]
+
+        if index.column() == NAME_COLUMN:
+            if role == Qt.ItemDataRole.DisplayRole:
+                # Display name without prefix
+                return key.split('_', 1)[-1] if '_' in key else key
+            if role == Qt.ItemDataRole.UserRole:
+                return key
+        elif role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return value
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or index.column() != COLOR_COLUMN or role != Qt.ItemDataRole.EditRole:
+            return False
+        self._rows[index.row()][1] = value.strip()
+        self.dataChanged.emit(index, index)
+        return True
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() == COLOR_COLUMN:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def apps(self) -> List[str]:
+        return sorted({app_of(key) for key, _ in self._rows})
+
+    def add_color(self, key: str, value: str) -> QModelIndex:
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.append([key, value])
+        self.endInsertRows()
+        return self.index(row, COLOR_COLUMN)
+
+    def colors(self) -> Dict[str, str]:
+        return {key: value for key, value in self._rows}
+
+
+class AppFilterProxy(QSortFilterProxyModel):
+    """Show one app's rows, sorted by key"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.app = None
+
+    def set_app(self, app: str):
+        self.app = app
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        key = self.sourceModel().index(source_row, NAME_COLUMN, source_parent).data(Qt.ItemDataRole.UserRole)
+        return app_of(key) == self.app
+
+
+class ColorEditor(QWidget):
+    """Hex entry plus a picker button, only alive while a cell is edited"""
+
+    # The delegate's focus handling only sees this container, not the line
+    # edit inside it, so editing ends through this signal instead
+    finished = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._picking = False
+        self.setAutoFillBackground(True)
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        self.input = QLineEdit()
+        self.input.setPlaceholderText("#RRGGBB")
+        self.input.editingFinished.connect(self.on_editing_finished)
+        layout.addWidget(self.input)
+
+        btn_picker = QPushButton("Pick")
+        btn_picker.setMaximumWidth(60)
+        # Clicking it must not take focus from the input and end the edit
+        btn_picker.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        btn_picker.clicked.connect(self.pick_color)
+        layout.addWidget(btn_picker)
+        self.setFocusProxy(self.input)
+
+    def pick_color(self):
+        """Open color picker dialog"""
+        text = self.input.text()
+        self._picking = True
+        try:
+            color = QColorDialog.getColor(QColor(text if text.startswith('#') else "#000000"), self)
+        finally:
+            self._picking = False
+        if color.isValid():
+            self.input.setText(color.name())
+        self.input.setFocus()
+
+    def on_editing_finished(self):
+        # The colour dialog takes focus while it is open; that isn't the end
+        if not self._picking:
+            self.finished.emit()
+
+
+class ColorDelegate(QStyledItemDelegate):
+    """Paint a swatch beside the hex value and edit it with ColorEditor"""
+
+    SWATCH = 22
+
+    def paint(self, painter, option, index):
+        if index.column() != COLOR_COLUMN:
+            return super().paint(painter, option, index)
+
+        self.initStyleOption(option, index)
+        value = index.data() or ''
+        rect = option.rect
+        swatch = QRect(rect.left() + 4, rect.center().y() - self.SWATCH // 2, self.SWATCH, self.SWATCH)
+
+        painter.save()
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(rect, option.palette.highlight())
+        color = QColor(value)
+        if color.isValid():
+            painter.fillRect(swatch, color)
+        painter.setPen(QColor("#cccccc"))
+        painter.drawRect(swatch)
+        painter.setPen(option.palette.text().color())
+        text_rect = rect.adjusted(self.SWATCH + 12, 0, 0, 0)
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, value)
+        painter.restore()
+
+    def createEditor(self, parent, option, index):
+        editor = ColorEditor(parent)
+        editor.finished.connect(lambda: self.commit_and_close(editor))
+        return editor
+
+    def commit_and_close(self, editor):
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor, QStyledItemDelegate.EndEditHint.NoHint)
+
+    def setEditorData(self, editor, index):
+        editor.input.setText(index.data(Qt.ItemDataRole.EditRole) or '')
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.input.text(), Qt.ItemDataRole.EditRole)
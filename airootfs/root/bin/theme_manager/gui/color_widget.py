@@ -1,33 +1,77 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor, QPalette
-
-class ColorPreviewWidget(QWidget):
-    def __init__(self, name, color_hex):
-        super().__init__()
-        self.color_hex = color_hex
-        self.init_ui(name)
-
-    def init_ui(self, name):
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(5, 5, 5, 5)
-
-        swatch = QWidget()
-        swatch.setFixedSize(80, 60)
-        swatch.setAutoFillBackground(True)
-
-        palette = swatch.palette()
-        palette.setColor(QPalette.ColorRole.Window, QColor(self.color_hex))
-        swatch.setPalette(palette)
-
-        layout.addWidget(swatch, alignment=Qt.AlignmentFlag.AlignCenter)
-
-        name_label = QLabel(name.split('_', 1)[-1] if '_' in name else name)
-        name_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        name_label.setWordWrap(True)
-        layout.addWidget(name_label)
-
-        hex_label = QLabel(self.color_hex)
-        hex_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        hex_label.setStyleSheet("font-family: monospace; font-size: 10px;")
-        layout.addWidget(hex_label)
+from typing import List, Tuple
+
+from PyQt6.QtWidgets import QWidget
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QColor, QPainter, QPixmap, QFont
+
+class SwatchGridWidget(QWidget):
+    """Paint a whole app's colours as one grid of swatches.
+
+    Replaces a widget subtree per colour: the grid is rendered once into a
+    pixmap and only re-rendered when the colours or the width change.
+    """
+    CELL_WIDTH = 110
+    CELL_HEIGHT = 100
+    SWATCH_WIDTH = 80
+    SWATCH_HEIGHT = 60
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.colors: List[Tuple[str, str]] = []
+        self._cache = None
+        self._columns = 1
+
+    def set_colors(self, colors: List[Tuple[str, str]]):
+        """Set (name, hex) pairs to display"""
+        if colors == self.colors:
+            return
+        self.colors = colors
+        self._relayout()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._relayout()
+
+    def _relayout(self):
+        self._columns = max(1, self.width() // self.CELL_WIDTH)
+        rows = (len(self.colors) + self._columns - 1) // self._columns
+        self.setMinimumHeight(rows * self.CELL_HEIGHT)
+        self._cache = None
+        self.update()
+
+    def paintEvent(self, event):
+        if self._cache is None or self._cache.size() != self.size() * self.devicePixelRatio():
+            self._cache = self._render()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._cache)
+
+    def _render(self) -> QPixmap:
+        ratio = self.devicePixelRatio()
+        pixmap = QPixmap(self.size() * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        text_color = self.palette().windowText().color()
+        name_font = QFont(self.font())
+        hex_font = QFont("monospace")
+        hex_font.setPixelSize(10)
+        metrics = painter.fontMetrics()
+
+        for i, (name, color_hex) in enumerate(self.colors):
+            x = (i % self._columns) * self.CELL_WIDTH
+            y = (i // self._columns) * self.CELL_HEIGHT
+            swatch_x = x + (self.CELL_WIDTH - self.SWATCH_WIDTH) // 2
+
+            painter.fillRect(swatch_x, y + 5, self.SWATCH_WIDTH, self.SWATCH_HEIGHT, QColor(color_hex))
+
+            painter.setPen(text_color)
+            painter.setFont(name_font)
+            label = metrics.elidedText(name, Qt.TextElideMode.ElideMiddle, self.CELL_WIDTH - 6)
+            painter.drawText(QRect(x, y + 67, self.CELL_WIDTH, 16), Qt.AlignmentFlag.AlignCenter, label)
+
+            painter.setFont(hex_font)
+            painter.drawText(QRect(x, y + 83, self.CELL_WIDTH, 14), Qt.AlignmentFlag.AlignCenter, color_hex)
+
+        painter.end()
+        return pixmap
@@ -0,0 +1,13 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+
+class JobSignals(QObject):
+    """Re-emit theme manager job completions as Qt signals.
+
+    The queue calls back from its worker thread; Qt queues the signal to
+    receivers living on the GUI thread, so slots run there safely.
+    """
+    finished = pyqtSignal(str, bool, str)
+
+    def __init__(self, job_queue, parent=None):
+        super().__init__(parent)
+        job_queue.add_listener(self.finished.emit)
@@ -1,20 +1,35 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QPushButton, QListWidget, QLabel, QMessageBox,
+    QPushButton, QListView, QLabel, QMessageBox, QLineEdit,
     QGroupBox, QCheckBox, QScrollArea, QGridLayout, QInputDialog,
-    QTabWidget, QComboBox
+    QTabWidget, QComboBox, QProgressDialog, QFileDialog, QApplication, QColorDialog
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import Qt, QThreadPool
+from pathlib import Path
 
 from theme_manager import ThemeManager
-from gui.color_widget import ColorPreviewWidget
+from gui.apply_worker import ApplyWorker
+from gui.color_widget import SwatchGridWidget
+from gui.job_signals import JobSignals
 from gui.theme_editor import ThemeEditorDialog
+from gui.theme_list_model import ThemeListModel, ThemeFilterProxy, ThemeItemDelegate
+from gui.theme_preview import PreviewService
+from gui.thumbnails import ThumbnailService
 
 class ThemeManagerWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.theme_manager = ThemeManager()
+        self.apply_worker = None
+        self.apply_progress = None
+        self.preview_wallpaper = None
+        self.thumbnails = ThumbnailService(parent=self)
+        self.thumbnails.ready.connect(self.show_wallpaper_preview)
+        self.preview_key = None
+        self.previews = PreviewService(parent=self)
+        self.previews.ready.connect(self.show_theme_preview)
+        self.job_signals = JobSignals(self.theme_manager.jobs, self)
+        self.job_signals.finished.connect(self.on_theme_job_finished)
         self.init_ui()
         self.load_themes()
 
@@ -40,8 +55,23 @@ class ThemeManagerWindow(QMainWindow):
         title.setStyleSheet("font-size: 16px; font-weight: bold;")
         layout.addWidget(title)
 
-        self.theme_list = QListWidget()
-        self.theme_list.currentItemChanged.connect(self.on_theme_selected)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search name, author, variant:light, tag:retro...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.filter_themes)
+        layout.addWidget(self.search_input)
+
+        self.theme_model = ThemeListModel(self.theme_manager.store, self)
+        self.theme_model.rowsInserted.connect(lambda parent, first, last: self.warm_previews(first, last))
+        self.theme_model.dataChanged.connect(lambda top, bottom, roles=(): self.warm_previews(top.row(), bottom.row()))
+        self.theme_proxy = ThemeFilterProxy(self.theme_manager.store, self)
+        self.theme_proxy.setSourceModel(self.theme_model)
+        self.theme_list = QListView()
+        self.theme_list.setModel(self.theme_proxy)
+        self.theme_list.setItemDelegate(ThemeItemDelegate(self.theme_list))
+        # Fixed row height lets the view skip measuring every row
+        self.theme_list.setUniformItemSizes(True)
+        self.theme_list.selectionModel().currentChanged.connect(self.on_theme_selected)
         layout.addWidget(self.theme_list)
 
         btn_layout = QVBoxLayout()
@@ -62,6 +92,26 @@ class ThemeManagerWindow(QMainWindow):
         self.btn_import.clicked.connect(self.import_theme)
         btn_layout.addWidget(self.btn_import)
 
+        self.btn_from_wallpaper = QPushButton("Theme from Wallpaper")
+        self.btn_from_wallpaper.clicked.connect(self.theme_from_wallpaper)
+        btn_layout.addWidget(self.btn_from_wallpaper)
+
+        self.btn_generate = QPushButton("Generate Theme")
+        self.btn_generate.clicked.connect(self.generate_theme)
+        btn_layout.addWidget(self.btn_generate)
+
+        self.btn_variant = QPushButton("Create Variant")
+        self.btn_variant.clicked.connect(self.create_variant)
+        btn_layout.addWidget(self.btn_variant)
+
+        self.btn_find_color = QPushButton("Find by Colour")
+        self.btn_find_color.clicked.connect(self.find_by_color)
+        btn_layout.addWidget(self.btn_find_color)
+
+        self.btn_find_similar = QPushButton("Find Similar Themes")
+        self.btn_find_similar.clicked.connect(self.find_similar)
+        btn_layout.addWidget(self.btn_find_similar)
+
         self.btn_delete = QPushButton("Delete Theme")
         self.btn_delete.clicked.connect(self.delete_theme)
         btn_layout.addWidget(self.btn_delete)
@@ -122,11 +172,25 @@ class ThemeManagerWindow(QMainWindow):
         wallpaper_group.setLayout(wallpaper_layout)
         layout.addWidget(wallpaper_group)
 
+        theme_preview_group = QGroupBox("Theme Preview")
+        theme_preview_layout = QVBoxLayout()
+        self.theme_preview = QLabel("No theme selected")
+        self.theme_preview.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.theme_preview.setMinimumHeight(150)
+        self.theme_preview.setMaximumHeight(200)
+        theme_preview_layout.addWidget(self.theme_preview)
+        theme_preview_group.setLayout(theme_preview_layout)
+        layout.addWidget(theme_preview_group)
+
         # Tabbed color preview
         preview_group = QGroupBox("Color Preview")
         preview_layout = QVBoxLayout()
 
         self.color_tabs = QTabWidget()
+        self.color_tabs.currentChanged.connect(self.show_color_tab)
+        self.preview_apps = []
+        self.preview_colors = {}
+        self.swatch_grids = {}
         preview_layout.addWidget(self.color_tabs)
 
         preview_group.setLayout(preview_layout)
@@ -139,7 +203,8 @@ class ThemeManagerWindow(QMainWindow):
         # App checkboxes in grid
         app_grid = QGridLayout()
         self.app_checkboxes = {}
-        apps = ["niri", "btop", "kitty", "nvim", "waybar", "superfile", "rofi", "dunst"]
+        apps = ["niri", "btop", "kitty", "nvim", "waybar", "superfile", "rofi", "dunst",
+                "foot", "tofi", "vesktop", "fish"]
 
         for i, app_name in enumerate(apps):
             cb = QCheckBox(app_name.capitalize())
@@ -170,6 +235,9 @@ class ThemeManagerWindow(QMainWindow):
 
         app_layout.addLayout(transition_layout)
 
+        self.cb_wallpaper_per_output = QCheckBox("Different wallpaper on each monitor")
+        app_layout.addWidget(self.cb_wallpaper_per_output)
+
         app_group.setLayout(app_layout)
         layout.addWidget(app_group)
 
@@ -177,69 +245,117 @@ class ThemeManagerWindow(QMainWindow):
 
 
     def load_themes(self):
-        self.theme_list.clear()
-        themes = self.theme_manager.list_themes()
-        for theme in themes:
-            self.theme_list.addItem(theme['name'])
+        self.theme_model.reload()
+        self.previews.warm(self.theme_manager.list_themes())
+
+    def warm_previews(self, first: int, last: int):
+        """Render previews of saved themes in the background"""
+        themes = (self.theme_manager.get_theme(self.theme_model.name_at(self.theme_model.index(row)))
+                  for row in range(first, last + 1))
+        self.previews.warm([theme for theme in themes if theme])
+
+    def filter_themes(self, text: str):
+        self.theme_proxy.set_query(text)
+
+    def current_theme_name(self):
+        return self.theme_model.name_at(self.theme_proxy.mapToSource(self.theme_list.currentIndex()))
+
+    def select_theme(self, name: str):
+        index = self.theme_proxy.mapFromSource(self.theme_model.index_of(name))
+        if not index.isValid() and self.theme_proxy.query:
+            # Hidden by the search; show everything again so it can be selected
+            self.search_input.clear()
+            index = self.theme_proxy.mapFromSource(self.theme_model.index_of(name))
+        if index.isValid():
+            self.theme_list.setCurrentIndex(index)
 
     def on_theme_selected(self, current, previous):
-        if not current:
+        theme_name = self.theme_model.name_at(self.theme_proxy.mapToSource(current))
+        if not theme_name:
             return
 
-        theme_name = current.text()
         theme = self.theme_manager.get_theme(theme_name)
 
         if theme:
             self.lbl_theme_name.setText(theme['name'])
             self.lbl_theme_author.setText(f"Author: {theme.get('author', 'Unknown')}")
             self.update_color_preview_tabs(theme['colors'])
+            self.update_theme_preview(theme)
         
         # UPDATE WALLPAPER INFO
         self.update_wallpaper_info(theme_name)
 
-    def update_wallpaper_info(self, theme_name: str):
+    def update_wallpaper_info(self, theme_name: str, reroll: bool = False):
         """Update wallpaper preview and info"""
-        wp_info = self.theme_manager.get_theme_wallpaper_info(theme_name)
+        wp_info = self.theme_manager.get_theme_wallpaper_info(theme_name, reroll)
 
         count = wp_info['count']
         if count > 0:
             self.lbl_wallpaper_count.setText(f"🖼️  {count} wallpaper{'s' if count != 1 else ''} available")
 
-            # Show random wallpaper preview
-            import random
-            wallpaper = random.choice(wp_info['wallpapers'])
-            pixmap = QPixmap(str(wallpaper))
-
-            if not pixmap.isNull():
-                # Scale to fit preview
-                scaled = pixmap.scaled(
-                    400, 200, 
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-                self.wallpaper_preview.setPixmap(scaled)
+            # Preview the wallpaper the next apply will use
+            wallpaper = wp_info['next']
+            self.preview_wallpaper = str(wallpaper)
+
+            pixmap = self.thumbnails.request(wallpaper)
+            if pixmap is not None:
+                self.show_wallpaper_preview(self.preview_wallpaper, pixmap)
             else:
-                self.wallpaper_preview.setText(f"Preview: {wallpaper.name}")
+                self.wallpaper_preview.setText(f"Loading {wallpaper.name}...")
         else:
             self.lbl_wallpaper_count.setText("No wallpapers found")
+            self.preview_wallpaper = None
             self.wallpaper_preview.setText(
                 f"Add wallpapers to:\n{wp_info['directory']}"
             )
 
+    def show_wallpaper_preview(self, path: str, pixmap):
+        """Show a thumbnail if it is still the wallpaper being previewed"""
+        if path != self.preview_wallpaper:
+            return
+        if pixmap.isNull():
+            self.wallpaper_preview.setText(f"Preview: {Path(path).name}")
+            return
+        # Scale to fit preview
+        scaled = pixmap.scaled(
+            400, 200, 
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        self.wallpaper_preview.setPixmap(scaled)
+
+    def update_theme_preview(self, theme):
+        self.preview_key, pixmap = self.previews.request(theme['colors'])
+        if pixmap is not None:
+            self.show_theme_preview(self.preview_key, pixmap)
+        else:
+            self.theme_preview.setText("Rendering preview...")
+
+    def show_theme_preview(self, key: str, pixmap):
+        """Show a rendered preview if it is still the selected theme's"""
+        if key != self.preview_key:
+            return
+        if pixmap.isNull():
+            self.theme_preview.setText("No preview")
+            return
+        self.theme_preview.setPixmap(pixmap.scaled(
+            400, 200,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation
+        ))
+
     def refresh_wallpaper_preview(self):
         """Refresh wallpaper preview"""
-        current = self.theme_list.currentItem()
-        if current:
-            self.update_wallpaper_info(current.text())
+        theme_name = self.current_theme_name()
+        if theme_name:
+            self.update_wallpaper_info(theme_name, reroll=True)
 
     def open_wallpaper_directory(self):
         """Open wallpaper directory in file manager"""
-        current = self.theme_list.currentItem()
-        if not current:
+        theme_name = self.current_theme_name()
+        if not theme_name:
             QMessageBox.warning(self, "No Theme", "Please select a theme first.")
             return
-
-        theme_name = current.text()
         wp_info = self.theme_manager.get_theme_wallpaper_info(theme_name)
         wp_dir = wp_info['directory']
 
@@ -260,9 +376,6 @@ class ThemeManagerWindow(QMainWindow):
 
     def update_color_preview_tabs(self, colors):
         """Update color preview organized in tabs by application"""
-        # Clear existing tabs
-        self.color_tabs.clear()
-
         # Group colors by application
         app_colors = {}
         for key, value in colors.items():
@@ -274,52 +387,61 @@ class ThemeManagerWindow(QMainWindow):
                 app = key.split('_')[0]
                 if app not in app_colors:
                     app_colors[app] = []
-                app_colors[app].append((key, value))
-
-        # Create a tab for each application
-        for app_name in sorted(app_colors.keys()):
-            tab_widget = QWidget()
-            tab_layout = QVBoxLayout(tab_widget)
-
-            # Create scrollable area for colors
-            scroll = QScrollArea()
-            scroll.setWidgetResizable(True)
-            scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-
-            colors_widget = QWidget()
-            colors_layout = QGridLayout(colors_widget)
-            colors_layout.setSpacing(10)
-
-            # Add color widgets in a grid (4 per row)
-            row, col = 0, 0
-            for key, value in sorted(app_colors[app_name]):
                 # Display name without app prefix
-                display_name = key.replace(f"{app_name}_", "")
-                color_widget = ColorPreviewWidget(display_name, value)
-                colors_layout.addWidget(color_widget, row, col)
-
-                col += 1
-                if col >= 4:  # 4 colors per row
-                    col = 0
-                    row += 1
+                app_colors[app].append((key.replace(f"{app}_", "", 1), value))
+
+        for app in app_colors:
+            app_colors[app].sort()
+        self.preview_colors = app_colors
+
+        apps = sorted(app_colors.keys())
+        if apps != self.preview_apps:
+            # Tabs only change when the set of apps does; grids are filled on first show
+            current = self.color_tabs.tabText(self.color_tabs.currentIndex()).split(' ')[0].lower()
+            self.color_tabs.blockSignals(True)
+            self.color_tabs.clear()
+            self.swatch_grids = {}
+            for app_name in apps:
+                scroll = QScrollArea()
+                scroll.setWidgetResizable(True)
+                scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+                self.color_tabs.addTab(scroll, "")
+            self.preview_apps = apps
+            if current in apps:
+                self.color_tabs.setCurrentIndex(apps.index(current))
+            self.color_tabs.blockSignals(False)
 
-            # Add stretch to push colors to top
-            colors_layout.setRowStretch(row + 1, 1)
+        for i, app_name in enumerate(apps):
+            # Add tab with capitalized app name and color count
+            self.color_tabs.setTabText(i, f"{app_name.capitalize()} ({len(app_colors[app_name])})")
+            if app_name in self.swatch_grids:
+                self.swatch_grids[app_name].set_colors(app_colors[app_name])
 
-            scroll.setWidget(colors_widget)
-            tab_layout.addWidget(scroll)
+        self.show_color_tab(self.color_tabs.currentIndex())
 
-            # Add tab with capitalized app name and color count
-            color_count = len(app_colors[app_name])
-            self.color_tabs.addTab(tab_widget, f"{app_name.capitalize()} ({color_count})")
+    def show_color_tab(self, index: int):
+        """Build a tab's swatch grid the first time it is shown"""
+        if index < 0 or index >= len(self.preview_apps):
+            return
+        app_name = self.preview_apps[index]
+        if app_name not in self.swatch_grids:
+            grid = SwatchGridWidget()
+            self.color_tabs.widget(index).setWidget(grid)
+            self.swatch_grids[app_name] = grid
+        self.swatch_grids[app_name].set_colors(self.preview_colors.get(app_name, []))
+
+    def on_theme_job_finished(self, theme_name: str, ok: bool, error: str):
+        """Report background regeneration of a saved theme"""
+        if ok:
+            self.statusBar().showMessage(f"Theme files for '{theme_name}' regenerated", 3000)
+        else:
+            self.statusBar().showMessage(f"Failed to regenerate '{theme_name}': {error}")
 
     def apply_theme(self):
-        current = self.theme_list.currentItem()
-        if not current:
+        theme_name = self.current_theme_name()
+        if not theme_name:
             QMessageBox.warning(self, "No Theme", "Please select a theme to apply.")
             return
-
-        theme_name = current.text()
         selected_apps = [app for app, cb in self.app_checkboxes.items() if cb.isChecked()]
 
         if not selected_apps and not self.cb_apply_wallpaper.isChecked():
@@ -330,47 +452,74 @@ class ThemeManagerWindow(QMainWindow):
         apply_wallpaper = self.cb_apply_wallpaper.isChecked()
         transition = self.transition_combo.currentText()
 
-        success = self.theme_manager.apply_theme(
-            theme_name, 
-            selected_apps,
-            apply_wallpaper=apply_wallpaper,
-            transition=transition
+        # Apply runs on the thread pool so swww never blocks the UI
+        worker = ApplyWorker(
+            self.theme_manager, theme_name, selected_apps, apply_wallpaper, transition,
+            self.cb_wallpaper_per_output.isChecked()
         )
+        worker.signals.progress.connect(self.on_apply_progress)
+        worker.signals.finished.connect(self.on_apply_finished)
+
+        total = len(selected_apps) + int(apply_wallpaper) + 1
+        self.apply_progress = QProgressDialog(f"Applying '{theme_name}'...", "Cancel", 0, total, self)
+        self.apply_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.apply_progress.setMinimumDuration(200)
+        self.apply_progress.canceled.connect(worker.cancel)
+
+        self.apply_worker = worker
+        self.btn_apply.setEnabled(False)
+        QThreadPool.globalInstance().start(worker)
+
+    def on_apply_progress(self, step: str, done: int, total: int):
+        if self.apply_progress is not None:
+            self.apply_progress.setLabelText(f"Applied {step} ({done}/{total})")
+            self.apply_progress.setValue(done)
+
+    def on_apply_finished(self, success: bool):
+        worker, self.apply_worker = self.apply_worker, None
+        if self.apply_progress is not None:
+            self.apply_progress.reset()
+            # Parented to the window, so it would live as long as it
+            self.apply_progress.deleteLater()
+            self.apply_progress = None
+        self.btn_apply.setEnabled(True)
 
         if success:
-            apps_str = ", ".join(selected_apps)
+            apps_str = ", ".join(worker.apps)
             QMessageBox.information(self, "Success", 
-                f"Theme '{theme_name}' applied to: {apps_str}")
+                f"Theme '{worker.name}' applied to: {apps_str}")
+        elif worker.is_cancelled():
+            self.statusBar().showMessage(f"Applying '{worker.name}' cancelled", 3000)
         else:
             QMessageBox.warning(self, "Error", "Failed to apply theme.")
 
     def create_new_theme(self):
         dialog = ThemeEditorDialog(self, self.theme_manager)
         if dialog.exec():
-            self.load_themes()
+            self.theme_model.theme_saved(dialog.saved_name)
+            self.select_theme(dialog.saved_name)
 
     def edit_theme(self):
-        current = self.theme_list.currentItem()
-        if not current:
+        theme_name = self.current_theme_name()
+        if not theme_name:
             QMessageBox.warning(self, "No Theme", "Please select a theme to edit.")
             return
-
-        theme_name = current.text()
         theme = self.theme_manager.get_theme(theme_name)
 
         dialog = ThemeEditorDialog(self, self.theme_manager, theme)
         if dialog.exec():
-            self.load_themes()
-            items = self.theme_list.findItems(theme_name, Qt.MatchFlag.MatchExactly)
-            if items:
-                self.theme_list.setCurrentItem(items[0])
+            self.theme_model.theme_saved(dialog.saved_name)
+            self.select_theme(dialog.saved_name)
+            if dialog.saved_name == theme_name:
+                # Same row, so currentChanged won't fire; refresh the panels
+                self.on_theme_selected(self.theme_list.currentIndex(), None)
 
     def import_theme(self):
         name, ok = QInputDialog.getText(self, "Import Theme", 
             "Enter theme name to search for in config files:")
         if ok and name:
             if self.theme_manager.import_from_existing(name):
-                self.load_themes()
+                self.theme_model.theme_saved(name)
                 QMessageBox.information(self, "Success", 
                     f"Imported theme '{name}' from existing config files")
             else:
@@ -378,14 +527,148 @@ class ThemeManagerWindow(QMainWindow):
                     f"Could not find theme '{name}' in config files.\n"
                     f"Make sure theme files exist in your ~/.config/*/themes/ directories")
 
+    def theme_from_wallpaper(self):
+        theme_name = self.current_theme_name()
+        start_dir = self.theme_manager.wallpaper_manager.walls_dir
+        if theme_name and (start_dir / theme_name).is_dir():
+            start_dir = start_dir / theme_name
+
+        image, _ = QFileDialog.getOpenFileName(
+            self, "Choose Wallpaper", str(start_dir),
+            "Images (*.jpg *.jpeg *.png *.gif *.bmp *.webp)"
+        )
+        if not image:
+            return
+        name, ok = QInputDialog.getText(self, "Theme from Wallpaper", "Theme name:", text=Path(image).stem)
+        if not ok or not name:
+            return
+
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            # App files are regenerated off the GUI thread
+            theme = self.theme_manager.theme_from_wallpaper(Path(image), name, background=True)
+        except Exception as e:
+            theme = None
+            print(f"Error extracting palette: {e}")
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        if theme is None:
+            QMessageBox.warning(self, "Error", "Could not create a theme from that image.")
+            return
+        self.theme_model.theme_saved(name)
+        self.select_theme(name)
+
+    def generate_theme(self):
+        harmony, ok = QInputDialog.getItem(
+            self, "Generate Theme", "Accent hues:",
+            ["free", "analogous", "complementary", "split-complementary", "triadic", "tetradic"], 0, False
+        )
+        if not ok:
+            return
+        # Cancelling the colour dialog generates around random hues
+        color = QColorDialog.getColor(parent=self, title="Seed Colour (cancel for none)")
+        seed = color.name() if color.isValid() else None
+
+        try:
+            generated = self.theme_manager.generate_themes("generated", harmony, seed)
+        except Exception as e:
+            generated = []
+            print(f"Error generating themes: {e}")
+        if not generated:
+            QMessageBox.warning(self, "Error", "Could not generate a theme.")
+            return
+
+        descriptions = [
+            f"{g.theme['colors']['kitty_background']} / {g.theme['colors']['kitty_foreground']} / "
+            f"{g.theme['colors']['niri_active-color']}  (score {g.score:.2f})"
+            for g in generated
+        ]
+        choice, ok = QInputDialog.getItem(self, "Generate Theme", "Best candidates:", descriptions, 0, False)
+        if not ok:
+            return
+        theme = generated[descriptions.index(choice)].theme
+        name, ok = QInputDialog.getText(self, "Generate Theme", "Theme name:", text=theme['name'])
+        if not ok or not name:
+            return
+
+        theme = {**theme, 'name': name}
+        if not self.theme_manager.save_theme(theme, background=True):
+            QMessageBox.warning(self, "Error", f"Could not save theme '{name}'.")
+            return
+        self.theme_model.theme_saved(name)
+        self.select_theme(name)
+
+    def create_variant(self):
+        theme_name = self.current_theme_name()
+        if not theme_name:
+            QMessageBox.warning(self, "No Theme", "Please select a theme first.")
+            return
+        variant, ok = QInputDialog.getItem(
+            self, "Create Variant", f"Variant of '{theme_name}':", ["light", "dim", "high-contrast"], 0, False
+        )
+        if not ok:
+            return
+
+        try:
+            themes = self.theme_manager.create_variants([variant], [theme_name])
+        except Exception as e:
+            themes = []
+            print(f"Error creating variant: {e}")
+        if not themes:
+            message = "Could not create the variant."
+            if variant == 'light':
+                message += f"\n'{theme_name}' may already be a light theme."
+            QMessageBox.warning(self, "Error", message)
+            return
+        self.theme_model.theme_saved(themes[0]['name'])
+        self.select_theme(themes[0]['name'])
+
+    def find_by_color(self):
+        color = QColorDialog.getColor(parent=self, title="Find Themes by Colour")
+        if not color.isValid():
+            return
+        try:
+            matches = self.theme_manager.find_themes_by_color(color.name())
+        except Exception as e:
+            print(f"Error searching by colour: {e}")
+            return
+        self.pick_theme(
+            f"Themes with a colour close to {color.name()}:",
+            [(m.theme, f"{m.theme}  ({m.color}, {', '.join(m.keys)})") for m in matches]
+        )
+
+    def find_similar(self):
+        theme_name = self.current_theme_name()
+        if not theme_name:
+            QMessageBox.warning(self, "No Theme", "Please select a theme first.")
+            return
+        try:
+            results = self.theme_manager.find_similar_themes(theme_name)
+        except Exception as e:
+            print(f"Error searching for similar themes: {e}")
+            return
+        self.pick_theme(
+            f"Themes similar to '{theme_name}':",
+            [(name, f"{name}  (distance {score:.3f})") for name, score in results]
+        )
+
+    def pick_theme(self, label: str, results):
+        """Let the user choose one of (name, description) results and select it"""
+        if not results:
+            QMessageBox.information(self, "No Matches", "No matching themes found.")
+            return
+        descriptions = [description for _, description in results]
+        choice, ok = QInputDialog.getItem(self, "Matching Themes", label, descriptions, 0, False)
+        if ok:
+            self.select_theme(results[descriptions.index(choice)][0])
+
     def delete_theme(self):
-        current = self.theme_list.currentItem()
-        if not current:
+        theme_name = self.current_theme_name()
+        if not theme_name:
             QMessageBox.warning(self, "No Theme", "Please select a theme to delete.")
             return
 
-        theme_name = current.text()
-
         reply = QMessageBox.question(
             self, 
             "Confirm Deletion", 
@@ -396,5 +679,5 @@ class ThemeManagerWindow(QMainWindow):
 
         if reply == QMessageBox.StandardButton.Yes:
             if self.theme_manager.delete_theme(theme_name):
-                self.load_themes()
+                self.theme_model.theme_removed(theme_name)
                 QMessageBox.information(self, "Deleted", f"Theme '{theme_name}' deleted.")
@@ -0,0 +1,165 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect, QSortFilterProxyModel
+from PyQt6.QtGui import QColor, QPixmap, QPainter
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle
+
+# Keys tried first for the mini-palette, falling back to any hex colours
+PALETTE_KEYS = [
+    'kitty_background', 'kitty_foreground',
+    'kitty_color1', 'kitty_color2', 'kitty_color3',
+    'kitty_color4', 'kitty_color5', 'kitty_color6',
+]
+PALETTE_SIZE = 8
+
+PaletteRole = Qt.ItemDataRole.UserRole + 1
+
+
+def palette_strip(colors: Dict[str, str]) -> Tuple[str, ...]:
+    strip = [colors[k] for k in PALETTE_KEYS if colors.get(k, '').startswith('#')]
+    if len(strip) < PALETTE_SIZE:
+        for key in sorted(colors):
+            value = colors[key]
+            if value.startswith('#') and value not in strip:
+                strip.append(value)
+                if len(strip) == PALETTE_SIZE:
+                    break
+    return tuple(strip[:PALETTE_SIZE])
+
+
+class ThemeListModel(QAbstractListModel):
+    """List model over ThemeStore that updates row by row"""
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._names: List[str] = []
+        self._palettes: Dict[str, Tuple[str, ...]] = {}
+
+    def reload(self):
+        self.beginResetModel()
+        self._names = self.store.names()
+        self._palettes.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._names):
+            return None
+        name = self._names[index.row()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name
+        if role == PaletteRole:
+            if name not in self._palettes:
+                theme = self.store.get(name)
+                self._palettes[name] = palette_strip(theme['colors']) if theme else ()
+            return self._palettes[name]
+        return None
+
+    def name_at(self, index) -> Optional[str]:
+        if not index.isValid() or index.row() >= len(self._names):
+            return None
+        return self._names[index.row()]
+
+    def index_of(self, name: str) -> QModelIndex:
+        try:
+            return self.index(self._names.index(name))
+        except ValueError:
+            return QModelIndex()
+
+    def theme_saved(self, name: str):
+        """Insert a new theme row or refresh an existing one"""
+        self._palettes.pop(name, None)
+        if name in self._names:
+            index = self.index_of(name)
+            self.dataChanged.emit(index, index)
+            return
+        row = len(self._names)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._names.append(name)
+        self.endInsertRows()
+
+    def theme_removed(self, name: str):
+        if name not in self._names:
+            return
+        row = self._names.index(name)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._names[row]
+        self._palettes.pop(name, None)
+        self.endRemoveRows()
+
+
+class ThemeFilterProxy(QSortFilterProxyModel):
+    """Filter the theme list through the store's search index.
+
+    A query runs once per keystroke (or store change); rows are then
+    accepted with a set lookup instead of re-reading every theme.
+    """
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.query = ''
+        self._matches: Optional[Set[str]] = None
+        self._version = None
+
+    def set_query(self, query: str):
+        self.query = query.strip()
+        self._version = None
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self.query:
+            return True
+        if self._version != self.store.version:
+            self._matches = set(self.store.search(self.query))
+            self._version = self.store.version
+        name = self.sourceModel().index(source_row, 0, source_parent).data()
+        return name in self._matches
+
+
+class ThemeItemDelegate(QStyledItemDelegate):
+    """Paint a theme row as its name plus a cached mini-palette strip"""
+
+    SWATCH = 10
+    ROW_HEIGHT = 26
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._strips: Dict[Tuple[str, ...], QPixmap] = {}
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+            painter.setPen(option.palette.highlightedText().color())
+        else:
+            painter.setPen(option.palette.text().color())
+
+        strip = self._strip(index.data(PaletteRole) or ())
+        strip_x = option.rect.right() - strip.width() - 6
+        painter.drawPixmap(strip_x, option.rect.center().y() - strip.height() // 2, strip)
+
+        text_rect = QRect(option.rect.left() + 6, option.rect.top(),
+                          strip_x - option.rect.left() - 12, option.rect.height())
+        text = option.fontMetrics.elidedText(index.data(), Qt.TextElideMode.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+        painter.restore()
+
+    def _strip(self, colors: Tuple[str, ...]) -> QPixmap:
+        pixmap = self._strips.get(colors)
+        if pixmap is None:
+            pixmap = QPixmap(max(1, len(colors)) * self.SWATCH, self.SWATCH)
+            pixmap.fill(Qt.GlobalColor.transparent)
+            p = QPainter(pixmap)
+            for i, color in enumerate(colors):
+                p.fillRect(i * self.SWATCH, 0, self.SWATCH, self.SWATCH, QColor(color))
+            p.end()
+            self._strips[colors] = pixmap
+        return pixmap
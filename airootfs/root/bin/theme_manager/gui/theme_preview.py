@@ -0,0 +1,374 @@
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List
+
+from PyQt6.QtCore import QCoreApplication, QObject, QRectF, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QImage, QPainter, QPen, QPixmap
+
+from config import PREVIEW_CACHE_DIR
+from parsers.nvim_parser import palette_roles
+
+PREVIEW_WIDTH = 640
+PREVIEW_HEIGHT = 360
+# Part of every cache key; bump when the drawing changes
+_RENDER_VERSION = 1
+
+
+def preview_key(colors: Dict[str, str]) -> str:
+    """Content hash of a theme's colours: equal colours share one image"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{_RENDER_VERSION}:{PREVIEW_WIDTH}x{PREVIEW_HEIGHT}:".encode())
+    digest.update(json.dumps(colors, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def preview_path(colors: Dict[str, str]) -> Path:
+    return PREVIEW_CACHE_DIR / f"{preview_key(colors)}.png"
+
+
+class _Palette:
+    """Theme colour lookup with fallbacks between apps"""
+
+    def __init__(self, colors: Dict[str, str]):
+        self.colors = colors
+
+    def __call__(self, *keys: str, default: str = '#000000') -> QColor:
+        for key in keys:
+            value = self.colors.get(key, '')
+            if value.startswith('#') and len(value) >= 7:
+                color = QColor(value[:7])
+                if color.isValid():
+                    return color
+        return QColor(default)
+
+
+def _font(pixels: int, bold: bool = False) -> QFont:
+    font = QFont('monospace')
+    font.setStyleHint(QFont.StyleHint.Monospace)
+    font.setPixelSize(pixels)
+    font.setBold(bold)
+    return font
+
+
+def _text(p: QPainter, x: float, y: float, parts, pixels: int = 11):
+    """Draw (text, colour) runs left to right from a baseline; returns the end x"""
+    p.setFont(_font(pixels))
+    metrics = p.fontMetrics()
+    for text, color in parts:
+        p.setPen(color)
+        p.drawText(int(x), int(y), text)
+        x += metrics.horizontalAdvance(text)
+    return x
+
+
+def render_preview(colors: Dict[str, str]) -> QImage:
+    """Composite mock of a desktop in the theme's colours.
+
+    A waybar strip, two niri windows with their borders (kitty focused,
+    nvim beside it) and a dunst notification. Only
+    QImage and QPainter are used, so it runs on worker threads and without
+    a display (QT_QPA_PLATFORM=offscreen).
+    """
+    c = _Palette(colors)
+    image = QImage(PREVIEW_WIDTH, PREVIEW_HEIGHT, QImage.Format.Format_RGB32)
+    image.fill(c('kitty_background', 'waybar_bg0_h').darker(160))
+
+    p = QPainter(image)
+    p.setRenderHint(QPainter.RenderHint.Antialiasing)
+    p.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+    _draw_waybar(p, c)
+    try:
+        border = min(max(float(colors.get('niri_border_width', 2)) * 1.5, 1.0), 6.0)
+    except ValueError:
+        border = 3.0
+    active = QRectF(10, 38, 400, 312)
+    inactive = QRectF(422, 38, 208, 312)
+    _draw_window(p, inactive, c('niri_inactive-color', default='#444444'))
+    _draw_code(p, inactive.adjusted(border, border, -border, -border), c)
+    _draw_window(p, active, c('niri_active-color', default='#888888'))
+    _draw_terminal(p, active.adjusted(border, border, -border, -border), c)
+    _draw_notification(p, QRectF(PREVIEW_WIDTH - 208, 46, 196, 58), c)
+    p.end()
+    return image
+
+
+def _draw_waybar(p: QPainter, c: _Palette):
+    bar = QRectF(0, 0, PREVIEW_WIDTH, 28)
+    p.fillRect(bar, c('waybar_bg0_h', 'kitty_background'))
+    fg = c('waybar_fg0', 'kitty_foreground', default='#ffffff')
+
+    p.setFont(_font(11, bold=True))
+    for i in range(5):
+        pill = QRectF(8 + i * 26, 6, 22, 16)
+        active = i == 0
+        p.setPen(Qt.PenStyle.NoPen)
+        p.setBrush(c('waybar_border', 'niri_active-color') if active else c('waybar_bg1', 'kitty_color8'))
+        p.drawRoundedRect(pill, 5, 5)
+        p.setPen(c('waybar_bg0_h', 'kitty_background') if active else fg)
+        p.drawText(pill, Qt.AlignmentFlag.AlignCenter, str(i + 1))
+
+    p.setPen(fg)
+    p.drawText(bar, Qt.AlignmentFlag.AlignCenter, "Tue 14:32")
+
+    x = PREVIEW_WIDTH - 8
+    for label, keys in (("bat 87%", ('waybar_aqua', 'kitty_color6')), ("vol 60%", ('waybar_blue', 'kitty_color4')),
+                        ("mem 41%", ('waybar_yellow', 'kitty_color3')), ("cpu 12%", ('waybar_red', 'kitty_color1'))):
+        width = p.fontMetrics().horizontalAdvance(label) + 14
+        x -= width
+        module = QRectF(x, 6, width, 16)
+        p.setPen(Qt.PenStyle.NoPen)
+        p.setBrush(c('waybar_bg1', 'kitty_color8'))
+        p.drawRoundedRect(module, 5, 5)
+        p.setPen(c(*keys, default='#ffffff'))
+        p.drawText(module, Qt.AlignmentFlag.AlignCenter, label)
+        x -= 6
+
+
+def _draw_window(p: QPainter, rect: QRectF, border: QColor):
+    # Contents are drawn inset by the border width on top of this
+    p.setPen(Qt.PenStyle.NoPen)
+    p.setBrush(border)
+    p.drawRoundedRect(rect, 8, 8)
+
+
+def _draw_terminal(p: QPainter, rect: QRectF, c: _Palette):
+    bg = c('kitty_background')
+    fg = c('kitty_foreground', default='#ffffff')
+    p.setPen(Qt.PenStyle.NoPen)
+    p.setBrush(bg)
+    p.drawRoundedRect(rect, 6, 6)
+
+    # Tab bar
+    tab = QRectF(rect.left() + 8, rect.top() + 6, 90, 16)
+    p.fillRect(tab, c('kitty_active_tab_background', 'kitty_foreground'))
+    p.fillRect(tab.translated(94, 0), c('kitty_inactive_tab_background', 'kitty_color8'))
+    p.setFont(_font(10))
+    p.setPen(c('kitty_active_tab_foreground', 'kitty_background'))
+    p.drawText(tab, Qt.AlignmentFlag.AlignCenter, "1: zsh")
+    p.setPen(c('kitty_inactive_tab_foreground', 'kitty_foreground'))
+    p.drawText(tab.translated(94, 0), Qt.AlignmentFlag.AlignCenter, "2: nvim")
+
+    x0, y, step = rect.left() + 10, rect.top() + 42, 17
+    ansi = [c(f'kitty_color{i}', default='#808080') for i in range(16)]
+    lines = [
+        [("~/strix", ansi[4]), (" on ", fg), ("main", ansi[5]), (" ❯ ", ansi[2]), ("ls", fg)],
+        [("bin/  ", ansi[4]), ("themes/  ", ansi[4]), ("build.sh  ", ansi[2]), ("README.md", fg)],
+        [("~/strix", ansi[4]), (" ❯ ", ansi[2]), ("git status --short", fg)],
+        [(" M ", ansi[1]), ("theme_manager.py", fg)],
+        [("?? ", ansi[3]), ("previews/", fg)],
+        [(" D ", ansi[9]), ("old_theme.json", fg)],
+    ]
+    for parts in lines:
+        _text(p, x0, y, parts)
+        y += step
+
+    # A selected line
+    selection = QRectF(x0 - 2, y - 12, 210, step)
+    p.fillRect(selection, c('kitty_selection_background', 'kitty_foreground'))
+    _text(p, x0, y, [("selected text in the terminal", c('kitty_selection_foreground', 'kitty_background'))])
+    y += step * 1.5
+
+    # The 16 ANSI colours
+    for i, color in enumerate(ansi):
+        p.fillRect(QRectF(x0 + (i % 8) * 26, y - 10 + (i // 8) * 20, 22, 16), color)
+    y += 46
+
+    end = _text(p, x0, y, [("~/strix", ansi[4]), (" ❯ ", ansi[2])])
+    cursor = QRectF(end, y - 11, 7, 14)
+    p.fillRect(cursor, c('kitty_cursor', 'kitty_foreground', default='#ffffff'))
+
+
+def _draw_code(p: QPainter, rect: QRectF, c: _Palette):
+    """nvim with the highlight roles its generated theme uses"""
+    palette = [v for k, v in c.colors.items() if k.startswith('nvim_') and v.startswith('#') and len(v) >= 7]
+    if palette:
+        roles = {role: QColor(value) for role, value in palette_roles(palette).items()}
+    else:
+        roles = {}
+
+    def role(name: str, *keys: str, default: str = '#808080') -> QColor:
+        return roles.get(name) or c(*keys, default=default)
+
+    bg = role('bg', 'kitty_background', default='#000000')
+    p.setPen(Qt.PenStyle.NoPen)
+    p.setBrush(bg)
+    p.drawRoundedRect(rect, 6, 6)
+
+    fg = role('fg', 'kitty_foreground', default='#ffffff')
+    keyword = role('purple', 'kitty_color5')
+    function = role('blue', 'kitty_color4')
+    string = role('green', 'kitty_color2')
+    number = role('orange', 'kitty_color3')
+    lines = [
+        [("# render a preview", role('comment', 'kitty_color8'))],
+        [("def ", keyword), ("preview", function), ("(theme):", fg)],
+        [("    size ", fg), ("= ", keyword), ("640", number)],
+        [("    name ", fg), ("= ", keyword), ('"strix"', string)],
+        [("    return ", keyword), ("draw", function), ("(size)", fg)],
+    ]
+    left = rect.left() + 26
+    # Below the notification
+    y = rect.top() + 90
+    # Cursor line
+    p.fillRect(QRectF(rect.left() + 2, y + 15 * 2 - 12, rect.width() - 4, 15), role('bg_alt', 'kitty_color0'))
+    for line, parts in enumerate(lines, 1):
+        _text(p, rect.left() + 8, y, [(str(line), role('line_nr', 'kitty_color8'))], pixels=10)
+        _text(p, left, y, parts, pixels=10)
+        y += 15
+
+    # Status line
+    status = QRectF(rect.left() + 2, rect.bottom() - 22, rect.width() - 4, 18)
+    p.fillRect(status, role('selection', 'kitty_color8'))
+    p.setFont(_font(10, bold=True))
+    p.setPen(fg)
+    p.drawText(status.adjusted(6, 0, 0, 0), Qt.AlignmentFlag.AlignVCenter, "NORMAL  preview.py")
+
+
+def _draw_notification(p: QPainter, rect: QRectF, c: _Palette):
+    p.setPen(QPen(c('dunst_frame_color', 'niri_active-color', default='#888888'), 2))
+    p.setBrush(c('dunst_urgency_normal_background', 'kitty_background'))
+    p.drawRoundedRect(rect, 6, 6)
+
+    fg = c('dunst_urgency_normal_foreground', 'kitty_foreground', default='#ffffff')
+    p.setPen(fg)
+    p.setFont(_font(11, bold=True))
+    p.drawText(rect.adjusted(12, 10, -12, 0), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, "Theme Manager")
+    p.setFont(_font(11))
+    p.drawText(rect.adjusted(12, 30, -12, 0), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop,
+               "Theme applied to 12 apps")
+
+
+def load_preview(colors: Dict[str, str]) -> QImage:
+    """Cached preview image, rendered and written first if missing.
+
+    Runs on worker threads; the file is written to a temporary name and
+    renamed so concurrent readers never see a partial image.
+    """
+    cache_file = preview_path(colors)
+    if cache_file.exists():
+        cached = QImage(str(cache_file))
+        if not cached.isNull():
+            return cached
+
+    image = render_preview(colors)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_suffix(f'.{os.getpid()}.{id(image)}.tmp')
+    if image.save(str(tmp_file), 'PNG'):
+        os.replace(tmp_file, cache_file)
+    return image
+
+
+def prune_previews(themes: Iterable[Dict[str, Any]]) -> int:
+    """Delete cached previews that no theme's colours map to any more"""
+    if not PREVIEW_CACHE_DIR.exists():
+        return 0
+    keep = {preview_key(theme['colors']) for theme in themes}
+    removed = 0
+    for cached in PREVIEW_CACHE_DIR.glob('*.png'):
+        if cached.stem not in keep:
+            cached.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+class _PreviewSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+
+
+class _PreviewJob(QRunnable):
+    def __init__(self, key: str, colors: Dict[str, str], signals: _PreviewSignals):
+        super().__init__()
+        self.key = key
+        self.colors = colors
+        self.signals = signals
+
+    def run(self):
+        try:
+            image = load_preview(self.colors)
+        except OSError as e:
+            print(f"Error rendering theme preview: {e}")
+            image = QImage()
+        self.signals.loaded.emit(self.key, image)
+
+
+class _WarmJob(QRunnable):
+    def __init__(self, themes: List[Dict[str, str]], stop: threading.Event):
+        super().__init__()
+        self.themes = themes
+        self.stop = stop
+
+    def run(self):
+        for colors in self.themes:
+            if self.stop.is_set():
+                return
+            try:
+                if not preview_path(colors).exists():
+                    load_preview(colors)
+            except OSError as e:
+                print(f"Error rendering theme preview: {e}")
+
+
+class PreviewService(QObject):
+    """Theme previews rendered off the GUI thread.
+
+    ``request`` serves the selected theme first; ``warm`` queues the rest
+    at low priority so they are on disk before anyone asks. Pixmaps are
+    kept in a bounded LRU keyed by colour hash, and come back through
+    ``ready``.
+    """
+    ready = pyqtSignal(str, QPixmap)
+
+    def __init__(self, max_cached: int = 32, parent=None):
+        super().__init__(parent)
+        self.max_cached = max_cached
+        self._pixmaps: 'OrderedDict[str, QPixmap]' = OrderedDict()
+        self._in_flight = set()
+        self._stop = threading.Event()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, min(2, os.cpu_count() or 1)))
+        # Warming gets its own thread so it never queues ahead of a request
+        self._warm_pool = QThreadPool(self)
+        self._warm_pool.setMaxThreadCount(1)
+        self._signals = _PreviewSignals(self)
+        self._signals.loaded.connect(self._on_loaded)
+        app = QCoreApplication.instance()
+        if app is not None:
+            # Don't hold up exit rendering previews nobody will see
+            app.aboutToQuit.connect(self.shutdown)
+
+    def request(self, colors: Dict[str, str]) -> tuple:
+        """(key, pixmap) if cached, otherwise (key, None) and ``ready`` is emitted later"""
+        key = preview_key(colors)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return key, pixmap
+
+        if key not in self._in_flight:
+            self._in_flight.add(key)
+            self._pool.start(_PreviewJob(key, dict(colors), self._signals))
+        return key, None
+
+    def warm(self, themes: List[Dict[str, Any]]):
+        """Render missing previews to disk in the background"""
+        if themes:
+            self._warm_pool.start(_WarmJob([dict(theme['colors']) for theme in themes], self._stop))
+
+    def shutdown(self):
+        self._stop.set()
+        for pool in (self._pool, self._warm_pool):
+            pool.clear()
+            pool.waitForDone()
+
+    def _on_loaded(self, key: str, image: QImage):
+        self._in_flight.discard(key)
+        pixmap = QPixmap.fromImage(image)
+        if not pixmap.isNull():
+            self._pixmaps[key] = pixmap
+            while len(self._pixmaps) > self.max_cached:
+                self._pixmaps.popitem(last=False)
+        self.ready.emit(key, pixmap)
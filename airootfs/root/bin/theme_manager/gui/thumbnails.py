@@ -0,0 +1,112 @@
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import os
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+
+from config import THUMBNAIL_DIR
+
+THUMBNAIL_SIZE = 512
+
+
+def thumbnail_path(image_path: Path) -> Path:
+    """Cache file name per the freedesktop thumbnail spec: md5 of the file URI"""
+    uri = image_path.resolve().as_uri()
+    return THUMBNAIL_DIR / f"{hashlib.md5(uri.encode()).hexdigest()}.png"
+
+
+def load_thumbnail(image_path: Path) -> QImage:
+    """Return a cached thumbnail, creating it if missing or stale.
+
+    Runs on worker threads, so it only touches QImage (never QPixmap).
+    """
+    mtime = str(int(image_path.stat().st_mtime))
+    cache_file = thumbnail_path(image_path)
+
+    if cache_file.exists():
+        cached = QImage(str(cache_file))
+        if not cached.isNull() and cached.text('Thumb::MTime') == mtime:
+            return cached
+
+    reader = QImageReader(str(image_path))
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and max(size.width(), size.height()) > THUMBNAIL_SIZE:
+        # Let the decoder downscale (JPEG decodes at reduced resolution)
+        reader.setScaledSize(size.scaled(THUMBNAIL_SIZE, THUMBNAIL_SIZE, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return image
+
+    image.setText('Thumb::URI', image_path.resolve().as_uri())
+    image.setText('Thumb::MTime', mtime)
+    image.setText('Software', 'Niri Strix Theme Manager')
+
+    THUMBNAIL_DIR.mkdir(parents=True, exist_ok=True)
+    # Write then rename so readers never see a partial file
+    tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+    if image.save(str(tmp_file), 'PNG'):
+        os.replace(tmp_file, cache_file)
+    return image
+
+
+class _ThumbnailSignals(QObject):
+    loaded = pyqtSignal(str, QImage)
+
+
+class _ThumbnailJob(QRunnable):
+    def __init__(self, image_path: Path, signals: _ThumbnailSignals):
+        super().__init__()
+        self.image_path = image_path
+        self.signals = signals
+
+    def run(self):
+        try:
+            image = load_thumbnail(self.image_path)
+        except OSError as e:
+            print(f"Error creating thumbnail for {self.image_path}: {e}")
+            image = QImage()
+        self.signals.loaded.emit(str(self.image_path), image)
+
+
+class ThumbnailService(QObject):
+    """Decode wallpaper thumbnails off the GUI thread.
+
+    Pixmaps are kept in a bounded LRU; misses go to a worker pool and come
+    back through ``ready``.
+    """
+    ready = pyqtSignal(str, QPixmap)
+
+    def __init__(self, max_cached: int = 64, parent=None):
+        super().__init__(parent)
+        self.max_cached = max_cached
+        self._pixmaps: 'OrderedDict[str, QPixmap]' = OrderedDict()
+        self._in_flight = set()
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, min(4, os.cpu_count() or 1)))
+        self._signals = _ThumbnailSignals(self)
+        self._signals.loaded.connect(self._on_loaded)
+
+    def request(self, image_path: Path):
+        """Return the pixmap if cached, otherwise None and emit ``ready`` later"""
+        key = str(image_path)
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+            return pixmap
+
+        if key not in self._in_flight:
+            self._in_flight.add(key)
+            self._pool.start(_ThumbnailJob(image_path, self._signals))
+        return None
+
+    def _on_loaded(self, key: str, image: QImage):
+        self._in_flight.discard(key)
+        pixmap = QPixmap.fromImage(image)
+        if not pixmap.isNull():
+            self._pixmaps[key] = pixmap
+            while len(self._pixmaps) > self.max_cached:
+                self._pixmaps.popitem(last=False)
+        self.ready.emit(key, pixmap)
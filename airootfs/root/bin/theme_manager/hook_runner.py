@@ -0,0 +1,82 @@
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import signal
+import subprocess
+import time
+from typing import Dict, List, Any
+
+
+class HookRunner:
+    """Run post-apply hooks concurrently under per-hook and overall time limits"""
+
+    def __init__(self, hooks_dir: Path, hook_timeout: float = 2.0, budget: float = 5.0):
+        self.hooks_dir = hooks_dir
+        self.hook_timeout = hook_timeout
+        self.budget = budget
+        self.hooks_dir.mkdir(parents=True, exist_ok=True)
+
+    def get_hooks(self) -> List[Path]:
+        """Get executable hooks, in name order"""
+        return sorted(
+            p for p in self.hooks_dir.iterdir()
+            if p.is_file() and not p.name.startswith('.') and os.access(p, os.X_OK)
+        )
+
+    def run(self, theme: Dict[str, Any], apps: List[str]) -> List[Dict[str, Any]]:
+        """Feed the applied theme as JSON to every hook and collect timings"""
+        hooks = self.get_hooks()
+        if not hooks:
+            return []
+
+        payload = json.dumps(dict(theme, apps=apps)).encode()
+        env = dict(os.environ, STRIX_THEME=theme['name'], STRIX_APPS=','.join(apps))
+        deadline = time.monotonic() + self.budget
+
+        with ThreadPoolExecutor(max_workers=len(hooks)) as pool:
+            futures = [pool.submit(self._run_hook, hook, payload, env, deadline) for hook in hooks]
+            results = [f.result() for f in futures]
+
+        for result in results:
+            if result['timed_out']:
+                print(f"Hook {result['hook']} killed after {result['duration']:.2f}s")
+            elif result['returncode'] != 0:
+                print(f"Hook {result['hook']} failed ({result['returncode']}): {result['stderr']}")
+        return results
+
+    def _run_hook(self, hook: Path, payload: bytes, env: Dict[str, str], deadline: float) -> Dict[str, Any]:
+        start = time.monotonic()
+        result = {'hook': hook.name, 'returncode': None, 'timed_out': False, 'stderr': ''}
+        try:
+            proc = subprocess.Popen(
+                [str(hook)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                env=env,
+                start_new_session=True
+            )
+        except OSError as e:
+            result.update(duration=0.0, stderr=str(e))
+            return result
+
+        timeout = max(0.0, min(self.hook_timeout, deadline - start))
+        try:
+            _, stderr = proc.communicate(payload, timeout=timeout)
+            result['stderr'] = stderr.decode(errors='replace').strip()
+        except subprocess.TimeoutExpired:
+            # Kill the whole process group so children can't linger
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            proc.communicate()
+            result['timed_out'] = True
+        except BrokenPipeError:
+            # Hook exited without reading stdin
+            proc.wait()
+
+        result['returncode'] = proc.returncode
+        result['duration'] = time.monotonic() - start
+        return result
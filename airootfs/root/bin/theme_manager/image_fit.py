@@ -0,0 +1,112 @@
+from pathlib import Path
+import hashlib
+import os
+
+
+def fitted_path(cache_dir: Path, source: Path, width: int, height: int) -> Path:
+    digest = hashlib.sha1(str(source.resolve()).encode()).hexdigest()
+    return cache_dir / f"{digest}-{width}x{height}.png"
+
+
+def is_fresh(fitted: Path, source: Path) -> bool:
+    """A fitted copy carries its source's mtime; any change invalidates it"""
+    try:
+        return fitted.stat().st_mtime_ns == source.stat().st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def fit_image(source: Path, dest: Path, width: int, height: int) -> bool:
+    """Scale and centre-crop ``source`` to exactly width x height.
+
+    Uses QImageReader (no display needed) so the decoder can downscale
+    while reading. Returns False when PyQt6 is missing or decoding fails,
+    in which case callers fall back to the original file.
+    """
+    try:
+        from PyQt6.QtCore import QRect, QSize, Qt
+        from PyQt6.QtGui import QImageReader
+    except ImportError:
+        return False
+
+    reader = QImageReader(str(source))
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if not size.isValid():
+        return False
+
+    # Cover the output like swww's default crop resize
+    covering = size.scaled(QSize(width, height), Qt.AspectRatioMode.KeepAspectRatioByExpanding)
+    reader.setScaledSize(covering)
+    image = reader.read()
+    if image.isNull():
+        print(f"Error decoding {source}: {reader.errorString()}")
+        return False
+
+    x = max(0, (image.width() - width) // 2)
+    y = max(0, (image.height() - height) // 2)
+    image = image.copy(QRect(x, y, width, height))
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = dest.with_suffix(f'.{os.getpid()}.{id(image)}.tmp')
+    # Default compression: a fraction of the size of an uncompressed PNG
+    if not image.save(str(tmp_file), 'PNG'):
+        return False
+    st = source.stat()
+    os.utime(tmp_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+    os.replace(tmp_file, dest)
+    return True
+
+
+def load_pixels(source: Path, max_side: int = 256):
+    """Decode an image downscaled to at most max_side and return an (N, 3)
+    uint8 NumPy array of its RGB pixels.
+    """
+    import numpy as np
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QImage, QImageReader
+
+    reader = QImageReader(str(source))
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and max(size.width(), size.height()) > max_side:
+        # JPEG decodes straight to a fraction of its size this way
+        reader.setScaledSize(size.scaled(max_side, max_side, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Cannot decode {source}: {reader.errorString()}")
+    if max(image.width(), image.height()) > max_side:
+        image = image.scaled(max_side, max_side, Qt.AspectRatioMode.KeepAspectRatio)
+
+    image = image.convertToFormat(QImage.Format.Format_RGB888)
+    width, height = image.width(), image.height()
+    bits = image.constBits()
+    bits.setsize(image.sizeInBytes())
+    rows = np.frombuffer(bits, dtype=np.uint8).reshape(height, image.bytesPerLine())
+    return rows[:, :width * 3].reshape(-1, 3).copy()
+
+
+def perceptual_hash(source: Path) -> int:
+    """64-bit difference hash: brightness gradients of a 9x8 grayscale
+    thumbnail. Resized or re-encoded copies differ in only a few bits.
+    """
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtGui import QImage, QImageReader
+
+    reader = QImageReader(str(source))
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and max(size.width(), size.height()) > 64:
+        reader.setScaledSize(size.scaled(64, 64, Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        raise ValueError(f"Cannot decode {source}: {reader.errorString()}")
+
+    image = image.scaled(
+        9, 8, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation
+    ).convertToFormat(QImage.Format.Format_Grayscale8)
+    bits = 0
+    for y in range(8):
+        for x in range(8):
+            bits = (bits << 1) | (image.pixelColor(x, y).value() > image.pixelColor(x + 1, y).value())
+    return bits
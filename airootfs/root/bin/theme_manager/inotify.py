@@ -0,0 +1,87 @@
+from pathlib import Path
+import ctypes
+import ctypes.util
+import os
+import struct
+from typing import Dict, List, NamedTuple, Optional
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT = struct.Struct('iIII')
+
+
+class InotifyEvent(NamedTuple):
+    # None only for a queue overflow
+    directory: Optional[Path]
+    name: str
+    mask: int
+
+    @property
+    def path(self) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        return self.directory / self.name if self.name else self.directory
+
+
+class Inotify:
+    """Minimal inotify binding over libc, so no extra package is needed"""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches: Dict[int, Path] = {}
+
+    def add_watch(self, directory: Path, mask: int = IN_CLOSE_WRITE | IN_MOVED_TO) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"Cannot watch {directory}")
+        self._watches[wd] = directory
+        return wd
+
+    def read_raw(self) -> List[InotifyEvent]:
+        """Drain pending events without blocking"""
+        events = []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return events
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                events.append(InotifyEvent(None, '', mask))
+                continue
+            directory = self._watches.get(wd)
+            if mask & IN_IGNORED:
+                # The kernel dropped the watch (directory removed)
+                self._watches.pop(wd, None)
+            if directory is not None:
+                events.append(InotifyEvent(directory, name, mask))
+        return events
+
+    def read_events(self) -> List[Optional[Path]]:
+        """Drain pending events; ``None`` marks a queue overflow"""
+        return [
+            event.path for event in self.read_raw()
+            if event.directory is None or event.name
+        ]
+
+    def close(self):
+        os.close(self.fd)
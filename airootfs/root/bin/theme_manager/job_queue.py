@@ -0,0 +1,65 @@
+from collections import OrderedDict
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+class CoalescingJobQueue:
+    """Single background worker that keeps at most one pending job per key.
+
+    Submitting a job for a key that is still waiting replaces it, so a burst
+    of saves for one theme costs a single regeneration (latest save wins).
+    """
+
+    def __init__(self):
+        self._pending: 'OrderedDict[str, Callable[[], object]]' = OrderedDict()
+        self._running: Optional[str] = None
+        self._listeners: List[Callable[[str, bool, str], None]] = []
+        self._cond = threading.Condition()
+        self._worker = threading.Thread(target=self._run, name="theme-jobs", daemon=True)
+        self._worker.start()
+
+    def add_listener(self, callback: Callable[[str, bool, str], None]):
+        """Call ``callback(key, ok, error)`` from the worker after each job"""
+        self._listeners.append(callback)
+
+    def submit(self, key: str, job: Callable[[], object]):
+        with self._cond:
+            self._pending.pop(key, None)
+            self._pending[key] = job
+            self._cond.notify_all()
+
+    def cancel(self, key: str) -> bool:
+        with self._cond:
+            return self._pending.pop(key, None) is not None
+
+    def wait(self, key: str, timeout: Optional[float] = None) -> bool:
+        """Block until no job for ``key`` is pending or running"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: key not in self._pending and self._running != key, timeout
+            )
+
+    def is_busy(self) -> bool:
+        with self._cond:
+            return bool(self._pending) or self._running is not None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                key, job = self._pending.popitem(last=False)
+                self._running = key
+
+            ok, error = True, ''
+            try:
+                job()
+            except Exception as e:
+                ok, error = False, str(e)
+                print(f"Background job for '{key}' failed: {e}")
+
+            with self._cond:
+                self._running = None
+                self._cond.notify_all()
+
+            for callback in self._listeners:
+                callback(key, ok, error)
@@ -1,16 +1,17 @@
 #!/usr/bin/env python3
+import argparse
 import sys
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtGui import QColor
-from gui.main_window import ThemeManagerWindow
+def run_gui(qt_args):
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtGui import QColor
+    from gui.main_window import ThemeManagerWindow
 
-def main():
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setApplicationName("Theme Manager")
     app.setOrganizationName("NiriStrix")
 
@@ -37,5 +38,381 @@ def main():
 
     sys.exit(app.exec())
 
+def run_watch(args):
+    from theme_manager import ThemeManager
+    from theme_watcher import ThemeWatcher
+
+    watcher = ThemeWatcher(
+        ThemeManager(),
+        debounce=args.debounce / 1000,
+        latency_budget=args.budget / 1000
+    )
+    watcher.run()
+
+def run_cache_wallpapers(args):
+    from theme_manager import ThemeManager
+
+    wallpaper_manager = ThemeManager().wallpaper_manager
+    themes = args.themes or sorted(
+        d.name for d in wallpaper_manager.walls_dir.iterdir()
+        if d.is_dir() and not d.name.startswith('.')
+    )
+    if not wallpaper_manager.cache.enabled:
+        print("PyQt6 is required to build the wallpaper cache")
+        return
+
+    for theme in themes:
+        built = wallpaper_manager.warm_theme(theme, block=True)
+        print(f"{theme}: {built} fitted, {wallpaper_manager.count_wallpapers(theme)} wallpapers")
+    removed = wallpaper_manager.prune_cache()
+    if removed:
+        print(f"Removed {removed} stale cache files")
+    wallpaper_manager.cache.shutdown()
+
+def run_slideshow(args):
+    from theme_manager import ThemeManager
+    from wallpaper_slideshow import WallpaperSlideshow
+
+    slideshow = WallpaperSlideshow(
+        ThemeManager(),
+        interval=args.interval,
+        times=args.at or (),
+        theme=args.theme,
+        transition=args.transition,
+        per_output=args.per_output
+    )
+    slideshow.run()
+
+def run_from_wallpaper(args):
+    import time
+    from theme_manager import ThemeManager
+
+    image = Path(args.image).expanduser()
+    name = args.name or image.stem
+    start = time.perf_counter()
+    theme = ThemeManager().theme_from_wallpaper(image, name, args.author, save=not args.dry_run)
+    if theme is None:
+        print(f"Failed to save theme '{name}'")
+        return
+    colors = theme['colors']
+    print(f"Theme '{name}' from {image.name} in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for key in ('kitty_background', 'kitty_foreground', 'niri_active-color'):
+        print(f"  {key}: {colors[key]}")
+
+def run_classify_wallpapers(args):
+    from theme_manager import ThemeManager
+    from wallpaper_index import IMAGE_SUFFIXES
+
+    images = []
+    for arg in args.paths:
+        path = Path(arg).expanduser()
+        if path.is_dir():
+            images.extend(sorted(p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES))
+        elif path.is_file():
+            images.append(path)
+
+    placements = ThemeManager().classify_wallpapers(images, move=args.move, min_margin=args.min_margin)
+    for placement in placements:
+        if placement.theme is None:
+            print(f"{placement.path.name}: could not be decoded" + (", left in place" if args.move else ""))
+            continue
+        unsure = "" if placement.margin >= args.min_margin else "  (unsure, left in place)" if args.move else "  (unsure)"
+        print(f"{placement.path.name} -> {placement.theme}  "
+              f"score {placement.score:.3f}, margin {placement.margin:.3f}{unsure}")
+
+    if args.evaluate and placements:
+        # Each image's folder is taken as the theme it belongs to
+        placements = [p for p in placements if p.theme is not None]
+        correct = [p.theme.lower() == p.path.parent.name.lower() for p in placements]
+        sure = [ok for p, ok in zip(placements, correct) if p.margin >= args.min_margin]
+        print(f"{sum(correct)} of {len(placements)} match their folder; "
+              f"{len(sure)} sure at margin {args.min_margin}, {sum(sure)} of them correct")
+
+def run_dedup_wallpapers(args):
+    from theme_manager import ThemeManager
+
+    manager = ThemeManager().wallpaper_manager
+    report = manager.find_duplicates(args.near)
+    for group in report.exact:
+        print("Identical: " + ", ".join(str(p.relative_to(manager.walls_dir)) for p in group))
+    for group in report.near:
+        print("Similar:   " + ", ".join(str(p.relative_to(manager.walls_dir)) for p in group))
+    if not report.exact and not report.near:
+        print("No duplicates found")
+
+    if args.link and report.exact:
+        linked = manager.link_duplicates(report, args.link)
+        print(f"Linked {linked} identical copies ({args.link})")
+
+def run_make_variants(args):
+    import time
+    from theme_manager import ThemeManager
+
+    theme_manager = ThemeManager()
+    if args.benchmark:
+        benchmark_variants(theme_manager.list_themes(), args.variant)
+        return
+
+    start = time.perf_counter()
+    themes = theme_manager.create_variants(args.variant, args.themes, save=not args.dry_run)
+    elapsed = (time.perf_counter() - start) * 1000
+    for theme in themes:
+        print(f"{theme['name']} ({theme['variant']})")
+    print(f"{len(themes)} variants in {elapsed:.0f} ms" + (" (not saved)" if args.dry_run else ""))
+
+def benchmark_variants(themes, variants):
+    import time
+    from color_space import parse_hex
+    from theme_variants import VARIANTS, applies_to, detect_variant, make_variants, variant_color
+
+    colors = sum(len(t['colors']) for t in themes) * len(variants)
+    start = time.perf_counter()
+    batch = make_variants(themes, variants)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scalar = []
+    for variant in variants:
+        spec = VARIANTS[variant]
+        for t in themes:
+            base = detect_variant(t['colors'])
+            if applies_to(spec, base):
+                scalar.append({
+                    k: variant_color(v, spec, base == 'light') if parse_hex([v])[1][0] else v
+                    for k, v in t['colors'].items()
+                })
+    scalar_time = time.perf_counter() - start
+
+    mismatched = sum(
+        1 for b, s in zip(batch, scalar) for k, v in s.items()
+        if v != b['colors'][k] and max(abs(int(v[i:i + 2], 16) - int(b['colors'][k][i:i + 2], 16)) for i in (1, 3, 5)) > 1
+    )
+    print(f"{len(themes)} themes, {colors} colours")
+    print(f"NumPy batch:     {batch_time * 1000:8.1f} ms")
+    print(f"Per-colour loop: {scalar_time * 1000:8.1f} ms  ({scalar_time / max(batch_time, 1e-9):.0f}x slower)")
+    print(f"Colours differing by more than 1/255: {mismatched}")
+
+def run_audit_contrast(args):
+    import json
+    import time
+    from theme_manager import ThemeManager
+
+    theme_manager = ThemeManager()
+    start = time.perf_counter()
+    if args.fix:
+        fixed, issues = theme_manager.fix_contrast(args.themes)
+    else:
+        issues = theme_manager.audit_contrast(args.themes, suggest=args.suggest)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps([issue._asdict() for issue in issues], indent=2))
+        return
+
+    theme_name = None
+    for issue in issues:
+        if issue.theme != theme_name:
+            theme_name = issue.theme
+            print(theme_name)
+        key = issue.key[len(issue.app) + 1:]
+        against = issue.against[len(issue.app) + 1:]
+        line = f"  {issue.app:10} {key} on {against}: {issue.ratio:.2f} < {issue.minimum}"
+        if issue.suggestion:
+            line += f"  (try {issue.suggestion})"
+        print(line)
+
+    if args.fix:
+        print(f"Fixed {len(fixed)} themes")
+    themes = len({issue.theme for issue in issues})
+    print(f"{len(issues)} contrast issues in {themes} themes ({elapsed:.0f} ms)")
+
+def run_find_themes(args):
+    from theme_manager import ThemeManager
+
+    theme_manager = ThemeManager()
+    if args.like:
+        results = theme_manager.find_similar_themes(args.like, args.count)
+        if not results:
+            print(f"Theme not found: {args.like}")
+        for name, score in results:
+            print(f"{name:30} {score:.3f}")
+        if args.check and results:
+            check_similar(theme_manager, args.like, args.count, results)
+        return
+
+    try:
+        matches = theme_manager.find_themes_by_color(args.color, args.count, args.key or ())
+    except ValueError as e:
+        print(e)
+        return
+    for match in matches:
+        print(f"{match.theme:30} {match.color}  {match.distance:.3f}  {', '.join(match.keys)}")
+
+def check_similar(theme_manager, name, count, results):
+    import time
+
+    start = time.perf_counter()
+    expected = theme_manager.color_index.similar_brute_force(theme_manager.get_theme(name), count)
+    elapsed = (time.perf_counter() - start) * 1000
+    # Ties may swap places; the scores at each rank must agree
+    differing = sum(1 for (_, a), (_, b) in zip(results, expected) if abs(a - b) > 1e-9)
+    print(f"Brute force: {elapsed:.0f} ms, {differing} of {len(expected)} scores differ")
+    for (name, score), (expected_name, expected_score) in zip(results, expected):
+        if abs(score - expected_score) > 1e-9:
+            print(f"  {name} {score:.3f}, expected {expected_name} {expected_score:.3f}")
+
+def run_generate_theme(args):
+    import time
+    from theme_manager import ThemeManager
+
+    start = time.perf_counter()
+    try:
+        generated = ThemeManager().generate_themes(args.name, args.harmony, args.seed, args.count, save=args.save)
+    except ValueError as e:
+        print(e)
+        return
+    elapsed = (time.perf_counter() - start) * 1000
+    for g in generated:
+        colors = g.theme['colors']
+        print(f"{g.theme['name']:20} score {g.score:.3f}  (contrast {g.contrast:.2f}, hues {g.hue_separation:.2f}, "
+              f"distinct {g.distinctness:.2f})  {colors['kitty_background']} {colors['kitty_foreground']} "
+              f"{colors['niri_active-color']}")
+    print(f"{len(generated)} themes in {elapsed:.0f} ms" + ("" if args.save else " (not saved)"))
+
+def run_render_previews(args):
+    import os
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Rendering only needs QImage and fonts, never a display
+    if not os.environ.get('WAYLAND_DISPLAY') and not os.environ.get('DISPLAY'):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtGui import QGuiApplication
+    from gui.theme_preview import load_preview, preview_path, prune_previews
+    from theme_manager import ThemeManager
+
+    app = QGuiApplication(sys.argv[:1])
+    themes = ThemeManager().list_themes()
+    if args.themes:
+        themes = [t for t in themes if t['name'] in args.themes]
+    missing = [t for t in themes if not preview_path(t['colors']).exists()]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max(1, min(4, os.cpu_count() or 1))) as pool:
+        list(pool.map(lambda theme: load_preview(theme['colors']), missing))
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{len(missing)} previews rendered, {len(themes) - len(missing)} cached ({elapsed:.0f} ms)")
+    for theme in themes if args.themes else ():
+        print(f"{theme['name']}: {preview_path(theme['colors'])}")
+    if not args.themes:
+        removed = prune_previews(themes)
+        if removed:
+            print(f"Removed {removed} stale previews")
+    del app
+
+def main():
+    from wallpaper_slideshow import parse_interval, parse_clock
+
+    parser = argparse.ArgumentParser(description="Theme Manager for Niri Strix")
+    commands = parser.add_subparsers(dest='command')
+
+    watch = commands.add_parser('watch', help="Regenerate and apply the active theme when its sources change")
+    watch.add_argument('--debounce', type=float, default=100, help="Quiet period in ms before acting on a burst of writes")
+    watch.add_argument('--budget', type=float, default=250, help="Latency budget in ms from first write to applied theme")
+
+    cache = commands.add_parser('cache-wallpapers', help="Pre-scale wallpapers to every connected output")
+    cache.add_argument('themes', nargs='*', help="Themes to process (default: all)")
+
+    slideshow = commands.add_parser('slideshow', help="Rotate the active theme's wallpapers")
+    when = slideshow.add_mutually_exclusive_group(required=True)
+    when.add_argument('--interval', type=parse_interval, help="Rotation interval, e.g. 90s, 15m, 2h (plain numbers are minutes)")
+    when.add_argument('--at', type=parse_clock, nargs='+', metavar='HH:MM', help="Rotate at these times of day")
+    slideshow.add_argument('--theme', help="Rotate this theme's wallpapers instead of the active theme's")
+    slideshow.add_argument('--transition', help="swww transition (default: the one last applied)")
+    slideshow.add_argument('--per-output', action='store_true', default=None, help="Different wallpaper on each monitor")
+
+    from_wallpaper = commands.add_parser('from-wallpaper', help="Create a theme from an image's palette")
+    from_wallpaper.add_argument('image', help="Image to take colours from")
+    from_wallpaper.add_argument('--name', help="Theme name (default: image file name)")
+    from_wallpaper.add_argument('--author', default="Palette Extractor")
+    from_wallpaper.add_argument('--dry-run', action='store_true', help="Print the palette without saving")
+
+    classify = commands.add_parser('classify-wallpapers', help="Sort images into theme wallpaper folders by colour")
+    classify.add_argument('paths', nargs='+', help="Images or folders of images")
+    placing = classify.add_mutually_exclusive_group()
+    placing.add_argument('--move', action='store_true', help="Move each image into its best theme's folder")
+    placing.add_argument('--evaluate', action='store_true',
+                         help="Score the suggestions against the folders the images are already in")
+    classify.add_argument('--min-margin', type=float, default=0.05, help="Minimum lead over the runner-up theme to count as sure")
+
+    dedup = commands.add_parser('dedup-wallpapers', help="Find duplicate wallpapers across theme folders")
+    dedup.add_argument('--near', type=int, default=4, help="Max perceptual hash bits that may differ for similar images")
+    dedup.add_argument('--link', choices=['reflink', 'hardlink'], help="Replace identical copies with links to one file")
+
+    variants = commands.add_parser('make-variants', help="Generate light, dim or high-contrast variants of themes")
+    variants.add_argument('themes', nargs='*', help="Themes to derive from (default: all but generated variants)")
+    variants.add_argument('--variant', nargs='+', choices=['light', 'dim', 'high-contrast'],
+                          default=['light', 'dim', 'high-contrast'], help="Variants to generate")
+    variants.add_argument('--dry-run', action='store_true', help="List the variants without saving")
+    variants.add_argument('--benchmark', action='store_true', help="Time the batch engine against a per-colour loop")
+
+    contrast = commands.add_parser('audit-contrast', help="Check WCAG contrast of every app's text and UI colours")
+    contrast.add_argument('themes', nargs='*', help="Themes to check (default: all)")
+    contrast.add_argument('--suggest', action='store_true', help="Suggest the nearest passing colour for each issue")
+    contrast.add_argument('--fix', action='store_true', help="Apply the suggestions and save the themes")
+    contrast.add_argument('--json', action='store_true', help="Print the issues as JSON")
+
+    find = commands.add_parser('find-themes', help="Find themes by colour or by similarity to another theme")
+    query = find.add_mutually_exclusive_group(required=True)
+    query.add_argument('--color', help="Hex colour, e.g. '#BE3F50'")
+    query.add_argument('--like', metavar='THEME', help="Themes whose colours are closest to this one's")
+    find.add_argument('--key', action='append', help="Only match these theme keys (glob, e.g. 'kitty_color*'); repeatable")
+    find.add_argument('-n', '--count', type=int, default=10)
+    find.add_argument('--check', action='store_true', help="With --like, compare against scoring every colour")
+
+    previews = commands.add_parser('render-previews', help="Render theme preview images into the cache")
+    previews.add_argument('themes', nargs='*', help="Themes to render and print paths for (default: all)")
+
+    generate = commands.add_parser('generate-theme', help="Generate themes from a seed colour or harmony rule")
+    generate.add_argument('--seed', help="Hex colour the palette is built around, e.g. '#BE3F50'")
+    generate.add_argument('--harmony', default='free',
+                          choices=['free', 'analogous', 'complementary', 'split-complementary', 'triadic', 'tetradic'],
+                          help="Hue rule for the accents (default: free)")
+    generate.add_argument('--name', default='generated', help="Name prefix; themes are saved as <name>-1 ...")
+    generate.add_argument('-n', '--count', type=int, default=5, help="How many of the best candidates to keep")
+    generate.add_argument('--save', action='store_true', help="Save the themes and generate their app files")
+
+    # Without a command every argument is Qt's, passed on untouched: its
+    # options can take values (-platform offscreen) argparse can't know about
+    if len(sys.argv) > 1 and sys.argv[1] in (*commands.choices, '-h', '--help'):
+        args = parser.parse_args()
+    else:
+        args = argparse.Namespace(command=None)
+
+    if args.command == 'watch':
+        run_watch(args)
+    elif args.command == 'cache-wallpapers':
+        run_cache_wallpapers(args)
+    elif args.command == 'slideshow':
+        run_slideshow(args)
+    elif args.command == 'from-wallpaper':
+        run_from_wallpaper(args)
+    elif args.command == 'classify-wallpapers':
+        run_classify_wallpapers(args)
+    elif args.command == 'dedup-wallpapers':
+        run_dedup_wallpapers(args)
+    elif args.command == 'make-variants':
+        run_make_variants(args)
+    elif args.command == 'audit-contrast':
+        run_audit_contrast(args)
+    elif args.command == 'find-themes':
+        run_find_themes(args)
+    elif args.command == 'render-previews':
+        run_render_previews(args)
+    elif args.command == 'generate-theme':
+        run_generate_theme(args)
+    else:
+        run_gui(sys.argv[1:])
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,216 @@
+from pathlib import Path
+import hashlib
+import json
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from color_space import parse_hex, to_hex, srgb_to_oklab, oklab_to_srgb, oklab_to_oklch, oklch_to_oklab
+from default_theme import DEFAULT_COLORS, default_theme_colors
+from image_fit import load_pixels
+
+# Clusters smaller than this share of the image can't become the background
+_MIN_BG_WEIGHT = 0.02
+_NEUTRAL_CHROMA = 0.04
+# Accents closer than this (OKLab distance) count as the same colour
+_DISTINCT = 0.06
+# Template key holding the main accent; every key sharing its colour, and
+# the extra keys, take a pinned primary accent
+PRIMARY_ACCENT = 'niri_active-color'
+PRIMARY_EXTRA = ('kitty_cursor',)
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def kmeans(points: np.ndarray, k: int, iterations: int = 20, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Cluster (N, 3) points; returns (centers, counts) with k-means++ seeding"""
+    rng = np.random.default_rng(seed)
+    centers = [points[rng.integers(len(points))]]
+    d2 = ((points - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = d2.sum()
+        if total <= 0:
+            break
+        centers.append(points[rng.choice(len(points), p=d2 / total)])
+        d2 = np.minimum(d2, ((points - centers[-1]) ** 2).sum(axis=1))
+    centers = np.array(centers)
+
+    sq_points = (points ** 2).sum(axis=1)[:, None]
+    for _ in range(iterations):
+        # |p - c|^2 without materialising an (N, k, 3) array
+        dist = sq_points - 2 * points @ centers.T + (centers ** 2).sum(axis=1)
+        labels = dist.argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.stack([np.bincount(labels, points[:, d], len(centers)) for d in range(3)], axis=1)
+        moved = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        if np.abs(moved - centers).max() < 1e-4:
+            centers = moved
+            break
+        centers = moved
+
+    dist = sq_points - 2 * points @ centers.T + (centers ** 2).sum(axis=1)
+    counts = np.bincount(dist.argmin(axis=1), minlength=len(centers))
+    keep = counts > 0
+    return centers[keep], counts[keep]
+
+
+class PaletteExtractor:
+    """Extract a colour palette from an image and turn it into a theme.
+
+    The image is decoded at a small size and clustered with k-means in
+    OKLab, so cluster distances match perceived colour differences.
+    Palettes are cached by file content hash.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, colors: int = 12, max_side: int = 256):
+        self.cache_dir = cache_dir
+        self.colors = colors
+        self.max_side = max_side
+
+    def palette(self, image_path: Path) -> List[Tuple[str, float]]:
+        """(hex, share of the image) pairs, most common first"""
+        cache_file = None
+        if self.cache_dir is not None:
+            cache_file = self.cache_dir / f"{file_hash(image_path)}-k{self.colors}.json"
+            if cache_file.exists():
+                try:
+                    with open(cache_file, 'r') as f:
+                        return [tuple(entry) for entry in json.load(f)['palette']]
+                except (OSError, ValueError, KeyError):
+                    pass
+
+        pixels = load_pixels(image_path, self.max_side) / 255.0
+        centers, counts = kmeans(srgb_to_oklab(pixels), self.colors)
+        order = np.argsort(-counts)
+        weights = counts[order] / counts.sum()
+        palette = list(zip(to_hex(oklab_to_srgb(centers[order])), weights.round(4).tolist()))
+
+        if cache_file is not None:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'w') as f:
+                json.dump({'source': str(image_path), 'palette': palette}, f)
+        return palette
+
+    def theme(self, image_path: Path, name: str, author: str = "Palette Extractor") -> Dict[str, Any]:
+        """A full theme (every app in DEFAULT_COLORS) coloured from the image"""
+        return {
+            'name': name,
+            'author': author,
+            'variant': 'dark',
+            'colors': palette_colors(self.palette(image_path)),
+        }
+
+
+def palette_roles(palette: List[Tuple[str, float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pick background, foreground and accents (as OKLCH) from a palette"""
+    rgb, _ = parse_hex([hex_color for hex_color, _ in palette])
+    weights = np.array([weight for _, weight in palette])
+    lab = srgb_to_oklab(rgb)
+    lch = oklab_to_oklch(lab)
+
+    # Background: darkest cluster that covers a real part of the image
+    candidates = np.where(weights >= _MIN_BG_WEIGHT, lch[:, 0], np.inf)
+    bg_index = int(candidates.argmin()) if np.isfinite(candidates).any() else int(lch[:, 0].argmin())
+    bg = lch[bg_index].copy()
+    bg[0] = np.clip(bg[0], 0.14, 0.22)
+    bg[1] = min(bg[1], 0.05)
+
+    # Foreground: lightest cluster, lifted until it reads on the background
+    fg_index = int(lch[:, 0].argmax())
+    fg = lch[fg_index].copy()
+    fg[0] = max(fg[0], 0.85)
+    fg[1] = min(fg[1], 0.1)
+
+    # Accents: the most colourful clusters, weighted by how much they show,
+    # skipping near-duplicates so the hues stay varied
+    others = np.setdiff1d(np.arange(len(lch)), [bg_index, fg_index])
+    score = lch[others, 1] * np.sqrt(weights[others])
+    kept: List[int] = []
+    for index in others[np.argsort(-score)]:
+        if lch[index, 1] < _NEUTRAL_CHROMA or len(kept) == 8:
+            continue
+        if all(np.linalg.norm(lab[index] - lab[k]) >= _DISTINCT for k in kept):
+            kept.append(index)
+    accents = lch[kept]
+    if len(accents) < 3:
+        # Too grey to pick from: spread hues around the dominant one
+        base = accents[0] if len(accents) else np.array([0.7, 0.12, bg[2]])
+        accents = np.array([[base[0], max(base[1], 0.12), (base[2] + turn) % 360] for turn in (0, 120, 240)])
+    accents[:, 0] = np.clip(accents[:, 0], 0.62, 0.82)
+    accents[:, 1] = np.clip(accents[:, 1], 0.08, 0.2)
+    return bg, fg, accents
+
+
+def palette_colors(palette: List[Tuple[str, float]]) -> Dict[str, str]:
+    """Map a palette onto the default theme template"""
+    return role_colors(*palette_roles(palette))
+
+
+def role_colors(bg: np.ndarray, fg: np.ndarray, accents: np.ndarray,
+                primary: Optional[np.ndarray] = None) -> Dict[str, str]:
+    """Map background, foreground and accents (OKLCH) onto the default theme template.
+
+    Each template colour keeps its role: the template background and
+    foreground become the palette's, other dark or grey tones follow the
+    background-to-foreground ramp, and chromatic colours are matched to
+    accents by hue order. A ``primary`` accent is pinned, unchanged, to the
+    main accent roles (the niri active border and everything sharing its
+    template colour, plus the kitty cursor) before that. Non-colour values
+    (e.g. niri border width) pass through unchanged.
+    """
+    template = default_theme_colors()
+    keys = list(template)
+    values = [template[k] for k in keys]
+    rgb, valid = parse_hex(values)
+    lch = oklab_to_oklch(srgb_to_oklab(np.nan_to_num(rgb)))
+
+    kitty = DEFAULT_COLORS['kitty']
+    template_bg = lch[keys.index('kitty_background')]
+    template_fg = lch[keys.index('kitty_foreground')]
+    lowered = np.array([v.lower() for v in values])
+
+    out = np.empty_like(lch)
+    is_bg = lowered == kitty['background'].lower()
+    is_fg = lowered == kitty['foreground'].lower()
+    dark = (lch[:, 0] < 0.35) & ~is_bg
+    grey = (lch[:, 1] < _NEUTRAL_CHROMA) & ~dark & ~is_bg
+    chromatic = valid & ~(is_bg | is_fg | dark | grey)
+
+    # Dark tones keep their offset from the template background
+    out[:] = bg
+    out[dark, 0] = np.clip(bg[0] + lch[dark, 0] - template_bg[0], 0.05, 0.4)
+
+    # Greys sit on the same relative step between background and foreground
+    t = np.clip((lch[grey, 0] - template_bg[0]) / (template_fg[0] - template_bg[0]), 0, 1)
+    out[grey] = bg + (fg - bg) * t[:, None]
+    out[grey, 2] = fg[2]
+
+    out[is_fg] = fg
+
+    if primary is not None:
+        pinned = valid & ((lowered == template[PRIMARY_ACCENT].lower()) | np.isin(keys, PRIMARY_EXTRA))
+        out[pinned] = primary
+        chromatic &= ~pinned
+
+    # Chromatic colours: the n-th hue of the template gets the accent at the
+    # same relative position in the palette's hue order
+    accents = accents[np.argsort(accents[:, 2])]
+    order = np.argsort(np.argsort(lch[chromatic, 2]))
+    slot = (order * len(accents) // max(chromatic.sum(), 1)).astype(int)
+    picked = accents[slot].copy()
+    # Keep the template's lighter/darker shades of a hue distinguishable
+    picked[:, 0] = np.clip(picked[:, 0] + (lch[chromatic, 0] - lch[chromatic, 0].mean()) * 0.5, 0.45, 0.92)
+    out[chromatic] = picked
+
+    hexes = to_hex(oklab_to_srgb(oklch_to_oklab(out)))
+    colors = {}
+    for key, value, ok, hex_color in zip(keys, values, valid, hexes):
+        # Invalid entries are not colours; alpha suffixes are preserved
+        colors[key] = hex_color + value[7:] if ok else value
+    return colors
@@ -0,0 +1,149 @@
+from typing import Dict, List, Any, NamedTuple, Optional
+
+import numpy as np
+
+from color_space import parse_hex, srgb_to_oklab, oklab_to_srgb, oklab_to_oklch, oklch_to_oklab, fit_gamut
+from contrast_audit import relative_luminance, contrast_ratio
+from palette_extractor import role_colors
+
+# Hue offsets (degrees from the seed) that accents are drawn around
+HARMONIES: Dict[str, tuple] = {
+    'analogous': (0, 30, -30),
+    'complementary': (0, 180),
+    'split-complementary': (0, 150, 210),
+    'triadic': (0, 120, 240),
+    'tetradic': (0, 90, 180, 270),
+    # Hues anywhere on the wheel; only the ranking spreads them
+    'free': (),
+}
+
+# Accents per palette: one per ANSI colour slot (red ... cyan)
+ACCENTS = 6
+# Score weights for contrast, hue separation and accent distinctness
+_WEIGHTS = np.array([0.4, 0.3, 0.3])
+# OKLab distance at which two accents count as fully distinct
+_DISTINCT = 0.15
+# Palettes closer than this (mean OKLab distance per colour) to a better
+# ranked one are skipped, so the top results don't repeat each other
+_MIN_SPREAD = 0.04
+
+
+class GeneratedTheme(NamedTuple):
+    theme: Dict[str, Any]
+    score: float
+    # Per-criterion scores, each in 0..1
+    contrast: float
+    hue_separation: float
+    distinctness: float
+
+
+def sample_palettes(count: int, harmony: str, seed: Optional[str] = None,
+                    rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """(count, 2 + ACCENTS, 3) OKLCH palettes: background, foreground, accents.
+
+    Accent hues are drawn around the harmony's anchors, rotated to the seed
+    colour's hue (or a random hue per palette). With a seed colour the
+    first accent is the seed itself.
+    """
+    rng = rng or np.random.default_rng()
+    anchors = HARMONIES[harmony]
+    seed_lch = None
+    if seed is not None:
+        rgb, valid = parse_hex([seed])
+        if not valid[0]:
+            raise ValueError(f"Not a hex colour: {seed}")
+        seed_lch = oklab_to_oklch(srgb_to_oklab(rgb[0]))
+        base_hue = np.full(count, seed_lch[2])
+    else:
+        base_hue = rng.uniform(0, 360, count)
+
+    palettes = np.empty((count, 2 + ACCENTS, 3))
+    palettes[:, 0] = np.stack([
+        rng.uniform(0.12, 0.24, count), rng.uniform(0.0, 0.05, count), base_hue + rng.normal(0, 20, count)
+    ], axis=1)
+    palettes[:, 1] = np.stack([
+        rng.uniform(0.82, 0.95, count), rng.uniform(0.0, 0.08, count), base_hue + rng.normal(0, 40, count)
+    ], axis=1)
+
+    if anchors:
+        # Leave room between anchors so accents of neighbouring ones can separate
+        width = 360 / len(anchors) / 2
+        offsets = np.array([anchors[k % len(anchors)] for k in range(ACCENTS)], dtype=float)
+        hues = base_hue[:, None] + offsets + rng.uniform(-width / 2, width / 2, (count, ACCENTS))
+    else:
+        hues = rng.uniform(0, 360, (count, ACCENTS))
+    palettes[:, 2:] = np.stack([
+        rng.uniform(0.62, 0.85, (count, ACCENTS)), rng.uniform(0.08, 0.2, (count, ACCENTS)), hues
+    ], axis=-1)
+    if seed_lch is not None:
+        palettes[:, 2] = seed_lch
+    palettes[..., 2] %= 360
+    return fit_gamut(palettes)
+
+
+def score_palettes(palettes: np.ndarray) -> np.ndarray:
+    """(count, 3) scores in 0..1: contrast, hue separation, accent distinctness.
+
+    Contrast is the foreground (against 7:1) and the weakest accent
+    (against 4.5:1) on the background. Hue separation is the smallest gap
+    between accent hues relative to an even spread, and distinctness the
+    smallest OKLab distance between two accents.
+    """
+    lab = oklch_to_oklab(palettes)
+    luminance = relative_luminance(oklab_to_srgb(lab))
+    bg, fg, accents = luminance[:, :1], luminance[:, 1], luminance[:, 2:]
+    fg_contrast = np.clip(contrast_ratio(fg, bg[:, 0]) / 7.0, 0, 1)
+    accent_contrast = np.clip(contrast_ratio(accents, bg).min(axis=1) / 4.5, 0, 1)
+
+    hues = np.sort(palettes[:, 2:, 2], axis=1)
+    gaps = np.diff(np.concatenate([hues, hues[:, :1] + 360], axis=1), axis=1)
+    separation = np.clip(gaps.min(axis=1) / (360 / ACCENTS), 0, 1)
+
+    accent_lab = lab[:, 2:]
+    distances = np.sqrt(((accent_lab[:, :, None] - accent_lab[:, None, :]) ** 2).sum(axis=-1))
+    distances[:, np.arange(ACCENTS), np.arange(ACCENTS)] = np.inf
+    distinctness = np.clip(distances.min(axis=(1, 2)) / _DISTINCT, 0, 1)
+
+    return np.stack([(fg_contrast + accent_contrast) / 2, separation, distinctness], axis=1)
+
+
+def pick_top(palettes: np.ndarray, totals: np.ndarray, top: int) -> List[int]:
+    """Indices of the ``top`` best palettes, skipping near-copies of better ones"""
+    lab = oklch_to_oklab(palettes)
+    picked: List[int] = []
+    for index in np.argsort(-totals).tolist():
+        if len(picked) == top:
+            break
+        if picked:
+            spread = np.sqrt(((lab[picked] - lab[index]) ** 2).sum(axis=-1)).mean(axis=1)
+            if spread.min() < _MIN_SPREAD:
+                continue
+        picked.append(index)
+    return picked
+
+
+def generate_themes(name: str, harmony: str = 'free', seed: Optional[str] = None, top: int = 5,
+                    candidates: int = 4096, rng_seed: Optional[int] = None,
+                    author: str = "Palette Generator") -> List[GeneratedTheme]:
+    """Sample ``candidates`` palettes, rank them all in one batch and map
+    the ``top`` ones onto the default theme template as ``<name>-<n>``.
+    """
+    if harmony not in HARMONIES:
+        raise ValueError(f"Unknown harmony: {harmony}")
+    palettes = sample_palettes(candidates, harmony, seed, np.random.default_rng(rng_seed))
+    scores = score_palettes(palettes)
+    totals = scores @ _WEIGHTS
+
+    generated = []
+    for rank, index in enumerate(pick_top(palettes, totals, top), 1):
+        bg, fg, accents = palettes[index, 0], palettes[index, 1], palettes[index, 2:]
+        theme = {
+            'name': f"{name}-{rank}",
+            'author': author,
+            'variant': 'dark',
+            'tags': ['generated', harmony],
+            # A seed colour is the main accent, not just one hue among six
+            'colors': role_colors(bg, fg, accents[1:], accents[0]) if seed else role_colors(bg, fg, accents),
+        }
+        generated.append(GeneratedTheme(theme, float(totals[index]), *scores[index].tolist()))
+    return generated
@@ -0,0 +1,12 @@
+from parsers.spec import FormatSpec, SpecParser
+
+class FishParser(SpecParser):
+    spec = FormatSpec(
+        app='fish',
+        extension='fish',
+        entry='set -g fish_{key} {value}',
+        key_pattern=r'(?:pager_)?color_\w+',
+        value_pattern=r'[0-9a-fA-F]{6}',
+        bare_hex=True,
+        header=('# Theme: {name}', '# Author: {author}', ''),
+    )
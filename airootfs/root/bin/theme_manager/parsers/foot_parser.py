@@ -0,0 +1,22 @@
+from parsers.spec import FormatSpec, SpecParser, TEXT_CONTRAST, UI_CONTRAST
+
+class FootParser(SpecParser):
+    spec = FormatSpec(
+        app='foot',
+        extension='ini',
+        entry='{key}={value}',
+        key_pattern=r'foreground|background|regular[0-7]|bright[0-7]|dim[0-7]'
+                    r'|selection-foreground|selection-background|urls|jump-labels|scrollback-indicator',
+        value_pattern=r'[0-9a-fA-F]{6}',
+        bare_hex=True,
+        header=('# Theme: {name}', '# Author: {author}', ''),
+        sections={'colors': ''},
+        activation='include',
+        directive='include=~/.config/foot/themes/{file}',
+        directive_match='include=~/.config/foot/themes/',
+        contrast=(
+            ('foreground', 'background', TEXT_CONTRAST),
+            ('selection-foreground', 'selection-background', TEXT_CONTRAST),
+            *((f'{kind}{i}', 'background', UI_CONTRAST) for kind in ('regular', 'bright') for i in range(1, 8)),
+        ),
+    )
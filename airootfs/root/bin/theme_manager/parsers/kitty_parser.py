@@ -1,48 +1,55 @@
 from pathlib import Path
 from typing import Dict, Any
-from parsers.base import ThemeParser
 
-class KittyParser(ThemeParser):
-    def parse(self, file_path: Path) -> Dict[str, str]:
-        colors = {}
-        with open(file_path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    parts = line.split(None, 1)
-                    if len(parts) == 2:
-                        key, value = parts
-                        colors[f"kitty_{key}"] = value.strip()
-        return colors
+from parsers.spec import FormatSpec, SpecParser, TEXT_CONTRAST, UI_CONTRAST
+
+class KittyParser(SpecParser):
+    spec = FormatSpec(
+        app='kitty',
+        extension='conf',
+        entry='{key:23} {value}',
+        key_pattern=r'\S+',
+        value_pattern=r'.+',
+        header=('## name: {name}', '## author: {author}', '## variant: "{variant}"', ''),
+        activation='include',
+        directive='include themes/{file}',
+        directive_match='include themes/',
+        contrast=(
+            ('foreground', 'background', TEXT_CONTRAST),
+            ('selection_foreground', 'selection_background', TEXT_CONTRAST),
+            ('cursor_text_color', 'cursor', TEXT_CONTRAST),
+            ('cursor', 'background', UI_CONTRAST),
+            ('active_tab_foreground', 'active_tab_background', TEXT_CONTRAST),
+            ('inactive_tab_foreground', 'inactive_tab_background', TEXT_CONTRAST),
+            # ANSI colours, except the black and bright black meant to blend in
+            *((f'color{i}', 'background', UI_CONTRAST) for i in (*range(1, 8), *range(9, 16))),
+        ),
+    )
 
     def generate(self, colors: Dict[str, str], metadata: Dict[str, Any]) -> str:
-        lines = []
-        name = metadata.get('name', 'custom')
-        author = metadata.get('author', 'Theme Manager')
-        variant = metadata.get('variant', 'dark')
-        lines.append(f"## name: {name}")
-        lines.append(f"## author: {author}")
-        lines.append(f'## variant: "{variant}"')
-        lines.append("")
-
-        for key, value in sorted(colors.items()):
-            if key.startswith('kitty_'):
-                config_key = key.replace('kitty_', '')
-                padding = ' ' * max(1, 24 - len(config_key))
-                lines.append(f"{config_key}{padding}{value}")
-
+        content = super().generate(colors, metadata)
+        synthesized = self._extended(colors)
+        if not synthesized:
+            return content
+        lines = [content, '', '# 256-colour palette, interpolated from the colours above']
+        for key, value in synthesized.items():
+            # Colours set explicitly in the theme were already written
+            if f"kitty_{key}" not in colors:
+                lines.append(self.format_entry(key, value))
         return '\n'.join(lines)
 
-    def apply(self, theme_file: Path, target_config: Path):
-        if not target_config.exists():
-            target_config.parent.mkdir(parents=True, exist_ok=True)
-            target_config.touch()
-
-        with open(target_config, 'r') as f:
-            lines = f.readlines()
-
-        lines = [l for l in lines if not l.strip().startswith('include themes/')]
-        lines.insert(0, f'include themes/{theme_file.name}\n')
+    def parse(self, file_path: Path) -> Dict[str, str]:
+        colors = super().parse(file_path)
+        # Drop synthesised colours so they follow the base colours again
+        for key, value in self._extended(colors).items():
+            if colors.get(f"kitty_{key}", '').lower() == value:
+                del colors[f"kitty_{key}"]
+        return colors
 
-        with open(target_config, 'w') as f:
-            f.writelines(lines)
+    def _extended(self, colors: Dict[str, str]) -> Dict[str, str]:
+        try:
+            from ansi256 import extended_colors
+        except ImportError:
+            # numpy missing: kitty keeps its stock 256-colour cube
+            return {}
+        return extended_colors(colors, 'kitty_')
@@ -1,38 +1,330 @@
-from pathlib import Path
-from typing import Dict, Any
+import colorsys
 import re
-from parsers.base import ThemeParser
+from typing import Dict, Any, List, Tuple
 
-class NvimParser(ThemeParser):
-    def parse(self, file_path: Path) -> Dict[str, str]:
-        colors = {}
-        with open(file_path, 'r') as f:
-            content = f.read()
+from parsers.spec import FormatSpec, SpecParser
 
-        for match in re.finditer(r'hex_([a-fA-F0-9]+)\s*=\s*"(#[a-fA-F0-9]{6})"', content):
-            hex_name, color_value = match.groups()
-            colors[f"nvim_hex_{hex_name}"] = color_value
+_HEX = re.compile(r'#[0-9a-fA-F]{6}')
+# Neutral roles as a share of the way from background to foreground
+_RAMP = {
+    'bg_alt': 0.06,
+    'selection': 0.15,
+    'border': 0.25,
+    'line_nr': 0.35,
+    'comment': 0.45,
+    'fg_dim': 0.7,
+}
+# Accent roles by target hue (degrees); each takes the palette colour closest in hue
+_HUES = {
+    'red': 0,
+    'orange': 28,
+    'yellow': 50,
+    'green': 120,
+    'cyan': 185,
+    'blue': 220,
+    'purple': 275,
+    'pink': 335,
+}
 
-        return colors
+# Highlight group -> attributes. Colour attributes name a role above (or
+# 'bg'/'fg'); flags are written as they are.
+HIGHLIGHTS: Tuple[Tuple[str, Dict[str, Any]], ...] = (
+    # Editor
+    ('Normal', {'fg': 'fg', 'bg': 'bg'}),
+    ('NormalNC', {'fg': 'fg', 'bg': 'bg'}),
+    ('NormalFloat', {'fg': 'fg', 'bg': 'bg_alt'}),
+    ('FloatBorder', {'fg': 'purple', 'bg': 'bg_alt'}),
+    ('FloatTitle', {'fg': 'cyan', 'bg': 'bg_alt', 'bold': True}),
+    ('Cursor', {'fg': 'bg', 'bg': 'fg'}),
+    ('CursorLine', {'bg': 'bg_alt'}),
+    ('CursorLineNr', {'fg': 'yellow', 'bold': True}),
+    ('LineNr', {'fg': 'line_nr'}),
+    ('Visual', {'bg': 'selection'}),
+    ('Search', {'fg': 'bg', 'bg': 'cyan'}),
+    ('IncSearch', {'fg': 'bg', 'bg': 'orange'}),
+    ('CurSearch', {'fg': 'bg', 'bg': 'orange'}),
+    ('MatchParen', {'fg': 'pink', 'bold': True}),
+    ('NonText', {'fg': 'border'}),
+    ('Whitespace', {'fg': 'border'}),
+    ('EndOfBuffer', {'fg': 'bg'}),
+    ('Conceal', {'fg': 'comment'}),
+    ('Directory', {'fg': 'blue'}),
+    ('Title', {'fg': 'blue', 'bold': True}),
+    ('Question', {'fg': 'green'}),
+    ('MoreMsg', {'fg': 'green'}),
+    ('ModeMsg', {'fg': 'fg_dim'}),
+    ('ErrorMsg', {'fg': 'red', 'bold': True}),
+    ('WarningMsg', {'fg': 'yellow'}),
+    ('SpellBad', {'undercurl': True, 'sp': 'red'}),
+    ('SpellCap', {'undercurl': True, 'sp': 'yellow'}),
 
-    def generate(self, colors: Dict[str, str], metadata: Dict[str, Any]) -> str:
-        lines = ['-- Color palette']
-        lines.append('local colors = {')
+    # UI
+    ('StatusLine', {'fg': 'fg', 'bg': 'selection'}),
+    ('StatusLineNC', {'fg': 'comment', 'bg': 'bg_alt'}),
+    ('TabLine', {'fg': 'comment', 'bg': 'bg_alt'}),
+    ('TabLineFill', {'bg': 'bg_alt'}),
+    ('TabLineSel', {'fg': 'fg', 'bg': 'bg', 'bold': True}),
+    ('WinBar', {'fg': 'fg_dim', 'bg': 'bg'}),
+    ('Pmenu', {'fg': 'fg', 'bg': 'bg_alt'}),
+    ('PmenuSel', {'fg': 'bg', 'bg': 'cyan', 'bold': True}),
+    ('PmenuSbar', {'bg': 'selection'}),
+    ('PmenuThumb', {'bg': 'comment'}),
+    ('WildMenu', {'fg': 'bg', 'bg': 'cyan'}),
+    ('WinSeparator', {'fg': 'border'}),
+    ('VertSplit', {'fg': 'border'}),
+    ('Folded', {'fg': 'comment', 'bg': 'bg_alt'}),
+    ('FoldColumn', {'fg': 'border', 'bg': 'bg'}),
+    ('SignColumn', {'fg': 'border', 'bg': 'bg'}),
+    ('ColorColumn', {'bg': 'bg_alt'}),
 
-        for key, value in sorted(colors.items()):
-            if key.startswith('nvim_hex_'):
-                hex_name = key.replace('nvim_hex_', '')
-                lines.append(f'  hex_{hex_name} = "{value}",')
+    # Syntax
+    ('Comment', {'fg': 'comment', 'italic': True}),
+    ('Constant', {'fg': 'orange'}),
+    ('String', {'fg': 'green'}),
+    ('Character', {'fg': 'green'}),
+    ('Number', {'fg': 'orange'}),
+    ('Boolean', {'fg': 'orange'}),
+    ('Float', {'fg': 'orange'}),
+    ('Identifier', {'fg': 'fg'}),
+    ('Function', {'fg': 'blue'}),
+    ('Statement', {'fg': 'purple'}),
+    ('Conditional', {'fg': 'purple'}),
+    ('Repeat', {'fg': 'purple'}),
+    ('Label', {'fg': 'purple'}),
+    ('Operator', {'fg': 'cyan'}),
+    ('Keyword', {'fg': 'purple'}),
+    ('Exception', {'fg': 'red'}),
+    ('PreProc', {'fg': 'pink'}),
+    ('Include', {'fg': 'pink'}),
+    ('Define', {'fg': 'pink'}),
+    ('Macro', {'fg': 'pink'}),
+    ('Type', {'fg': 'yellow'}),
+    ('StorageClass', {'fg': 'yellow'}),
+    ('Structure', {'fg': 'yellow'}),
+    ('Typedef', {'fg': 'yellow'}),
+    ('Special', {'fg': 'cyan'}),
+    ('SpecialChar', {'fg': 'cyan'}),
+    ('Tag', {'fg': 'red'}),
+    ('Delimiter', {'fg': 'fg_dim'}),
+    ('SpecialComment', {'fg': 'comment', 'bold': True}),
+    ('Debug', {'fg': 'red'}),
+    ('Underlined', {'underline': True}),
+    ('Error', {'fg': 'red', 'bold': True}),
+    ('Todo', {'fg': 'bg', 'bg': 'yellow', 'bold': True}),
 
-        lines.append('}')
-        lines.append('')
-        lines.append('-- Apply your full highlight configuration here')
-        lines.append('return colors')
+    # Diffs and diagnostics
+    ('DiffAdd', {'fg': 'green', 'bg': 'bg_alt'}),
+    ('DiffChange', {'fg': 'blue', 'bg': 'bg_alt'}),
+    ('DiffDelete', {'fg': 'red', 'bg': 'bg_alt'}),
+    ('DiffText', {'fg': 'yellow', 'bg': 'selection', 'bold': True}),
+    ('Added', {'fg': 'green'}),
+    ('Changed', {'fg': 'blue'}),
+    ('Removed', {'fg': 'red'}),
+    ('DiagnosticError', {'fg': 'red'}),
+    ('DiagnosticWarn', {'fg': 'yellow'}),
+    ('DiagnosticInfo', {'fg': 'blue'}),
+    ('DiagnosticHint', {'fg': 'cyan'}),
+    ('DiagnosticOk', {'fg': 'green'}),
+    ('DiagnosticUnderlineError', {'undercurl': True, 'sp': 'red'}),
+    ('DiagnosticUnderlineWarn', {'undercurl': True, 'sp': 'yellow'}),
+    ('DiagnosticUnderlineInfo', {'undercurl': True, 'sp': 'blue'}),
+    ('DiagnosticUnderlineHint', {'undercurl': True, 'sp': 'cyan'}),
+    ('LspReferenceText', {'bg': 'selection'}),
+    ('LspReferenceRead', {'bg': 'selection'}),
+    ('LspReferenceWrite', {'bg': 'selection', 'underline': True}),
+    ('LspInlayHint', {'fg': 'line_nr', 'italic': True}),
+
+    # Treesitter
+    ('@variable', {'fg': 'fg'}),
+    ('@variable.builtin', {'fg': 'red'}),
+    ('@variable.parameter', {'fg': 'fg_dim'}),
+    ('@variable.member', {'fg': 'cyan'}),
+    ('@constant', {'fg': 'orange'}),
+    ('@constant.builtin', {'fg': 'orange'}),
+    ('@module', {'fg': 'yellow'}),
+    ('@label', {'fg': 'purple'}),
+    ('@string', {'fg': 'green'}),
+    ('@string.escape', {'fg': 'cyan'}),
+    ('@string.regexp', {'fg': 'pink'}),
+    ('@character', {'fg': 'green'}),
+    ('@boolean', {'fg': 'orange'}),
+    ('@number', {'fg': 'orange'}),
+    ('@type', {'fg': 'yellow'}),
+    ('@type.builtin', {'fg': 'yellow'}),
+    ('@attribute', {'fg': 'pink'}),
+    ('@property', {'fg': 'cyan'}),
+    ('@function', {'fg': 'blue'}),
+    ('@function.builtin', {'fg': 'blue'}),
+    ('@function.macro', {'fg': 'pink'}),
+    ('@constructor', {'fg': 'yellow'}),
+    ('@operator', {'fg': 'cyan'}),
+    ('@keyword', {'fg': 'purple'}),
+    ('@keyword.import', {'fg': 'pink'}),
+    ('@keyword.exception', {'fg': 'red'}),
+    ('@comment', {'fg': 'comment', 'italic': True}),
+    ('@punctuation', {'fg': 'fg_dim'}),
+    ('@punctuation.special', {'fg': 'cyan'}),
+    ('@tag', {'fg': 'red'}),
+    ('@tag.attribute', {'fg': 'yellow'}),
+    ('@tag.delimiter', {'fg': 'fg_dim'}),
+    ('@markup.heading', {'fg': 'blue', 'bold': True}),
+    ('@markup.link', {'fg': 'cyan', 'underline': True}),
+
+    # Plugins
+    ('GitSignsAdd', {'fg': 'green'}),
+    ('GitSignsChange', {'fg': 'blue'}),
+    ('GitSignsDelete', {'fg': 'red'}),
+    ('TelescopeBorder', {'fg': 'border', 'bg': 'bg_alt'}),
+    ('TelescopeNormal', {'fg': 'fg', 'bg': 'bg_alt'}),
+    ('TelescopePromptBorder', {'fg': 'purple', 'bg': 'bg_alt'}),
+    ('TelescopeSelection', {'fg': 'fg', 'bg': 'selection', 'bold': True}),
+    ('TelescopeMatching', {'fg': 'orange', 'bold': True}),
+    ('NeoTreeNormal', {'fg': 'fg', 'bg': 'bg_alt'}),
+    ('NeoTreeNormalNC', {'fg': 'fg', 'bg': 'bg_alt'}),
+    ('NeoTreeDirectoryName', {'fg': 'blue'}),
+    ('NeoTreeDirectoryIcon', {'fg': 'blue'}),
+    ('NeoTreeRootName', {'fg': 'purple', 'bold': True}),
+    ('NeoTreeIndentMarker', {'fg': 'border'}),
+    ('NeoTreeGitAdded', {'fg': 'green'}),
+    ('NeoTreeGitModified', {'fg': 'yellow'}),
+    ('NeoTreeGitDeleted', {'fg': 'red'}),
+    ('WhichKey', {'fg': 'cyan'}),
+    ('WhichKeyGroup', {'fg': 'purple'}),
+    ('WhichKeyDesc', {'fg': 'fg'}),
+    ('WhichKeySeparator', {'fg': 'comment'}),
+    ('LazyNormal', {'fg': 'fg', 'bg': 'bg_alt'}),
+    ('LazyH1', {'fg': 'bg', 'bg': 'purple', 'bold': True}),
+    ('BlinkCmpMenu', {'fg': 'fg', 'bg': 'bg_alt'}),
+    ('BlinkCmpMenuBorder', {'fg': 'border', 'bg': 'bg_alt'}),
+    ('BlinkCmpMenuSelection', {'bg': 'selection', 'bold': True}),
+    ('BlinkCmpLabelMatch', {'fg': 'orange', 'bold': True}),
+    ('CmpItemAbbrMatch', {'fg': 'orange', 'bold': True}),
+    ('CmpItemKind', {'fg': 'purple'}),
+    ('IblIndent', {'fg': 'bg_alt'}),
+    ('IblScope', {'fg': 'border'}),
+    ('SnacksIndent', {'fg': 'bg_alt'}),
+    ('SnacksIndentScope', {'fg': 'border'}),
+    ('SnacksDashboardHeader', {'fg': 'purple'}),
+    ('NoiceCmdlinePopupBorder', {'fg': 'purple'}),
+    ('NotifyBackground', {'bg': 'bg'}),
+    ('BufferLineFill', {'bg': 'bg_alt'}),
+    ('BufferLineBufferSelected', {'fg': 'fg', 'bold': True}),
+)
+
+# Terminal colours 0-15 by role
+TERMINAL = (
+    'selection', 'red', 'green', 'yellow', 'blue', 'purple', 'cyan', 'fg_dim',
+    'border', 'red', 'green', 'yellow', 'blue', 'pink', 'cyan', 'fg',
+)
+
+
+def _rgb(value: str) -> Tuple[float, float, float]:
+    return tuple(int(value[i:i + 2], 16) / 255 for i in (1, 3, 5))
+
+
+def _luminance(rgb: Tuple[float, float, float]) -> float:
+    linear = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in rgb]
+    return 0.2126 * linear[0] + 0.7152 * linear[1] + 0.0722 * linear[2]
+
+
+def _mix(a: Tuple[float, float, float], b: Tuple[float, float, float], t: float) -> str:
+    return '#' + ''.join(f"{round((x + (y - x) * t) * 255):02x}" for x, y in zip(a, b))
 
-        return '\n'.join(lines)
 
-    def apply(self, theme_file: Path, target_config: Path):
-        import shutil
-        if not target_config.exists():
-            target_config.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(theme_file, target_config)
+def palette_roles(palette: List[str], light: bool = False) -> Dict[str, str]:
+    """Resolve every highlight role to a colour of ``palette``.
+
+    Background and foreground are the darkest and lightest colours (the
+    other way round for light themes), the neutrals are steps between them,
+    and each accent role takes the saturated colour nearest its hue.
+    """
+    colors = sorted({value[:7].lower() for value in palette}, key=lambda c: _luminance(_rgb(c)))
+    if light:
+        colors.reverse()
+    bg, fg = colors[0], colors[-1]
+    roles = {'bg': bg, 'fg': fg}
+    for role, t in _RAMP.items():
+        roles[role] = _mix(_rgb(bg), _rgb(fg), t)
+
+    accents = []
+    for color in colors[1:-1]:
+        hue, lightness, saturation = colorsys.rgb_to_hls(*_rgb(color))
+        if saturation >= 0.3 and 0.2 <= lightness <= 0.9:
+            accents.append((hue * 360, color))
+    for role, target in _HUES.items():
+        if accents:
+            # Circular hue distance
+            roles[role] = min(accents, key=lambda a: min(abs(a[0] - target), 360 - abs(a[0] - target)))[1]
+        else:
+            roles[role] = fg
+    return roles
+
+
+def _lua_attrs(attrs: Dict[str, Any], roles: Dict[str, str]) -> str:
+    parts = []
+    for attr, value in attrs.items():
+        if value is True:
+            parts.append(f"{attr} = true")
+        else:
+            parts.append(f'{attr} = "{roles[value]}"')
+    return '{ ' + ', '.join(parts) + ' }'
+
+
+class NvimParser(SpecParser):
+    spec = FormatSpec(
+        app='nvim',
+        extension='lua',
+        entry='  {key} = {value},',
+        key_pattern=r'hex_[a-fA-F0-9]+',
+        value_pattern=r'#[a-fA-F0-9]{6}',
+        quote='"',
+        comment='--',
+        header=(
+            '-- {name} by {author}, generated by Theme Manager. Every highlight is',
+            '-- resolved to a colour here, so loading the theme computes nothing.',
+            '',
+            '-- Color palette, kept for re-importing the theme',
+        ),
+        block_open=('local colors = {',),
+        block_close=('}',),
+    )
+
+    def generate(self, colors: Dict[str, str], metadata: Dict[str, Any]) -> str:
+        content = super().generate(colors, metadata)
+        palette = [v for k, v in colors.items() if k.startswith('nvim_') and _HEX.match(v)]
+        if not palette:
+            return content + '\n\nreturn {}'
+
+        light = metadata.get('variant') == 'light'
+        roles = palette_roles(palette, light)
+        body = [
+            'vim.cmd("highlight clear")',
+            'if vim.fn.exists("syntax_on") == 1 then',
+            '  vim.cmd("syntax reset")',
+            'end',
+            'vim.o.termguicolors = true',
+            f'vim.o.background = "{"light" if light else "dark"}"',
+            f'vim.g.colors_name = "{metadata.get("name", "custom")}"',
+            '',
+            'local hl = vim.api.nvim_set_hl',
+        ]
+        body.extend(f'hl(0, "{group}", {_lua_attrs(attrs, roles)})' for group, attrs in HIGHLIGHTS)
+        body.append('')
+        body.extend(f'vim.g.terminal_color_{i} = "{roles[role]}"' for i, role in enumerate(TERMINAL))
+
+        indent = ' ' * 8
+        lines = [
+            content,
+            '',
+            'return {',
+            '  {',
+            '    "LazyVim/LazyVim",',
+            '    opts = {',
+            '      colorscheme = function()',
+            *(indent + line if line else '' for line in body),
+            '      end,',
+            '    },',
+            '  },',
+            '}',
+        ]
+        return '\n'.join(lines)
@@ -0,0 +1,318 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from string import Formatter
+from typing import Dict, Any, Tuple, Optional, List
+import re
+from parsers.base import ThemeParser
+
+# WCAG 2 minimum contrast ratios: body text, and UI parts / large text
+TEXT_CONTRAST = 4.5
+UI_CONTRAST = 3.0
+
+
+@dataclass(frozen=True)
+class FormatSpec:
+    """Declarative description of an app's theme file format.
+
+    A spec covers key syntax (``entry`` template plus key/value patterns),
+    comment style, quoting, sections and how a generated file is activated.
+    ``SpecParser`` compiles it once into single-pass parse/generate/apply.
+    """
+    app: str
+    extension: str
+    # Line template for one colour, e.g. 'theme[{key}]={value}'. Literal
+    # whitespace becomes optional (or required between two fields) when parsing.
+    entry: str
+    key_pattern: str = r'[\w.-]+'
+    value_pattern: str = r'[^"\'\s;,]+'
+    # Quote character used when writing values; parsing accepts either way
+    quote: str = ''
+    bare_keys: Tuple[str, ...] = ()
+    # Colours are stored without the leading '#' (foot, fish)
+    bare_hex: bool = False
+    comment: str = '#'
+
+    # Fixed text around the entries; may use {name}, {author}, {variant}
+    header: Tuple[str, ...] = ()
+    block_open: Tuple[str, ...] = ()
+    block_close: Tuple[str, ...] = ()
+    footer: Tuple[str, ...] = ()
+
+    # Section name -> infix inserted between app prefix and key. The section
+    # with an empty infix also owns lines that appear before any header.
+    sections: Dict[str, str] = field(default_factory=dict)
+    section_syntax: str = '[{section}]'
+
+    # Theme key -> key written to the file
+    aliases: Dict[str, str] = field(default_factory=dict)
+    # Keys always written (in this order) with fallback values
+    defaults: Dict[str, str] = field(default_factory=dict)
+    # File key -> theme key prefix for list values ('gradient_color' -> 'gradient_')
+    arrays: Dict[str, str] = field(default_factory=dict)
+
+    # Activation: 'copy', 'include', 'set_key' or 'splice'
+    activation: str = 'copy'
+    directive: str = ''
+    directive_match: str = ''
+    directive_position: str = 'top'
+    splice_pattern: str = ''
+    splice_position: str = 'append'
+    create_target: bool = True
+
+    # (key, background key, minimum ratio) for colours drawn on top of each
+    # other, checked by the contrast audit. Fixes adjust the first key.
+    contrast: Tuple[Tuple[str, str, float], ...] = ()
+
+
+def compile_entry(spec: FormatSpec) -> 're.Pattern[str]':
+    """Turn an entry template into a regex with ``key`` and ``value`` groups"""
+    parts = ['^\\s*']
+    fields = list(Formatter().parse(spec.entry.strip()))
+    for i, (literal, field_name, _fmt, _conv) in enumerate(fields):
+        if literal:
+            stripped = literal.strip()
+            if not stripped:
+                parts.append(r'\s+' if i else r'\s*')
+            else:
+                # Spaces are optional around '=' even where the template
+                # glues it to other text: theme[{key}]={value}
+                tokens = [r'\s*=\s*'.join(map(re.escape, tok.split('='))) for tok in stripped.split()]
+                parts.append(r'\s*' + r'\s+'.join(tokens) + r'\s*')
+        if field_name == 'key':
+            parts.append(f'(?P<key>{spec.key_pattern})')
+        elif field_name == 'value':
+            parts.append(f'(?P<q>["\']?)(?P<value>{spec.value_pattern})(?P=q)')
+    return re.compile(''.join(parts))
+
+
+def compile_section(spec: FormatSpec) -> Optional['re.Pattern[str]']:
+    if not spec.sections:
+        return None
+    before, _, after = spec.section_syntax.partition('{section}')
+    return re.compile(rf'^{re.escape(before)}(?P<section>[^\]\s]+){re.escape(after)}\s*$')
+
+
+class SpecParser(ThemeParser):
+    """Parser driven by a ``FormatSpec`` class attribute"""
+    spec: FormatSpec
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        spec = cls.__dict__.get('spec')
+        if spec is None:
+            return
+        # Compile once per class, not per call
+        cls._entry_re = compile_entry(spec)
+        cls._section_re = compile_section(spec)
+        cls._array_res = {
+            file_key: re.compile(rf'^\s*{re.escape(file_key)}\s*=\s*\[([^\]]*)\]')
+            for file_key in spec.arrays
+        }
+        cls._reverse_aliases = {v: k for k, v in spec.aliases.items()}
+        # Longest infix first so 'urgency_low_x' never lands in the '' section
+        cls._infixes = sorted(
+            ((infix, section) for section, infix in spec.sections.items()),
+            key=lambda item: len(item[0]), reverse=True
+        )
+
+    @property
+    def extension(self) -> str:
+        return self.spec.extension
+
+    def theme_key(self, file_key: str, value: str) -> str:
+        return self._reverse_aliases.get(file_key, file_key)
+
+    def file_key(self, theme_key: str) -> str:
+        return self.spec.aliases.get(theme_key, theme_key)
+
+    def read_value(self, value: str) -> str:
+        if self.spec.bare_hex and not value.startswith('#'):
+            return f'#{value}'
+        return value
+
+    def write_value(self, key: str, value: str) -> str:
+        if self.spec.bare_hex:
+            value = value.lstrip('#')
+        if self.spec.quote and key not in self.spec.bare_keys:
+            return f'{self.spec.quote}{value}{self.spec.quote}'
+        return value
+
+    def format_entry(self, key: str, value: str) -> str:
+        file_key = self.file_key(key)
+        return self.spec.entry.format(key=file_key, value=self.write_value(file_key, value))
+
+    def parse(self, file_path: Path) -> Dict[str, str]:
+        spec = self.spec
+        prefix = f"{spec.app}_"
+        colors = {}
+        infix = self._default_infix() if spec.sections else ''
+
+        with open(file_path, 'r') as f:
+            for line in f:
+                stripped = line.strip()
+                if not stripped or (spec.comment and stripped.startswith(spec.comment)):
+                    continue
+
+                if self._section_re is not None:
+                    match = self._section_re.match(stripped)
+                    if match:
+                        infix = spec.sections.get(match.group('section'))
+                        continue
+                    if infix is None:
+                        continue
+
+                if self._parse_array(stripped, prefix, colors):
+                    continue
+
+                match = self._entry_re.match(stripped)
+                if match:
+                    value = self.read_value(match.group('value').strip())
+                    key = self.theme_key(match.group('key'), value)
+                    colors[f"{prefix}{infix}{key}"] = value
+
+        return colors
+
+    def _parse_array(self, line: str, prefix: str, colors: Dict[str, str]) -> bool:
+        for file_key, array_re in self._array_res.items():
+            match = array_re.match(line)
+            if match:
+                values = re.findall(r'["\']([^"\']+)["\']', match.group(1))
+                for i, value in enumerate(values):
+                    colors[f"{prefix}{self.spec.arrays[file_key]}{i}"] = self.read_value(value)
+                return True
+        return False
+
+    def _default_infix(self) -> Optional[str]:
+        return '' if '' in self.spec.sections.values() else None
+
+    def generate(self, colors: Dict[str, str], metadata: Dict[str, Any]) -> str:
+        spec = self.spec
+        prefix = f"{spec.app}_"
+        fields = {
+            'name': metadata.get('name', 'custom'),
+            'author': metadata.get('author', 'Theme Manager'),
+            'variant': metadata.get('variant', 'dark'),
+        }
+
+        own = {k[len(prefix):]: v for k, v in colors.items() if k.startswith(prefix)}
+        lines = [line.format(**fields) for line in spec.header]
+        lines.extend(self._generate_arrays(own))
+        lines.extend(spec.block_open)
+
+        if spec.sections:
+            lines.extend(self._generate_sections(own))
+        else:
+            lines.extend(self._generate_entries(own))
+
+        lines.extend(spec.block_close)
+        lines.extend(line.format(**fields) for line in spec.footer)
+        return '\n'.join(lines)
+
+    def _generate_arrays(self, own: Dict[str, str]) -> List[str]:
+        lines = []
+        for file_key, key_prefix in self.spec.arrays.items():
+            items = []
+            for key in list(own):
+                index = key[len(key_prefix):]
+                if key.startswith(key_prefix) and index.isdigit():
+                    items.append((int(index), own.pop(key)))
+            if items:
+                values = ', '.join(f'"{v}"' for _, v in sorted(items))
+                lines.append(f'{file_key} = [{values}]')
+                lines.append('')
+        return lines
+
+    def _generate_entries(self, own: Dict[str, str]) -> List[str]:
+        lines = []
+        for key, default in self.spec.defaults.items():
+            lines.append(self.format_entry(key, own.pop(key, default)))
+        for key, value in sorted(own.items()):
+            lines.append(self.format_entry(key, value))
+        return lines
+
+    def _generate_sections(self, own: Dict[str, str]) -> List[str]:
+        grouped: Dict[str, Dict[str, str]] = {}
+        for key, value in own.items():
+            for infix, section in self._infixes:
+                if key.startswith(infix):
+                    grouped.setdefault(section, {})[key[len(infix):]] = value
+                    break
+
+        lines = []
+        # Sections are written in the order the spec declares them
+        for section, infix in self.spec.sections.items():
+            if section not in grouped:
+                continue
+            lines.append(self.spec.section_syntax.format(section=section))
+            lines.extend(self._generate_entries(grouped[section]))
+            lines.append('')
+        return lines
+
+    def apply(self, theme_file: Path, target_config: Path):
+        spec = self.spec
+        if not target_config.exists():
+            if not spec.create_target:
+                return
+            target_config.parent.mkdir(parents=True, exist_ok=True)
+            target_config.touch()
+
+        with open(theme_file, 'r') as f:
+            theme_content = f.read()
+
+        if spec.activation == 'copy':
+            content = theme_content
+        else:
+            with open(target_config, 'r') as f:
+                content = f.read()
+
+            if spec.activation == 'include':
+                content = self._apply_directive(content, theme_file, replace_in_place=False)
+            elif spec.activation == 'set_key':
+                content = self._apply_directive(content, theme_file, replace_in_place=True)
+            elif spec.activation == 'splice':
+                content = self._apply_splice(content, theme_content.strip())
+            else:
+                raise ValueError(f"Unknown activation strategy: {spec.activation}")
+
+        with open(target_config, 'w') as f:
+            f.write(content)
+
+    def _apply_directive(self, content: str, theme_file: Path, replace_in_place: bool) -> str:
+        spec = self.spec
+        directive = spec.directive.format(file=theme_file.name, stem=theme_file.stem) + '\n'
+        lines = content.splitlines(keepends=True)
+
+        if replace_in_place:
+            for i, line in enumerate(lines):
+                if line.strip().startswith(spec.directive_match):
+                    lines[i] = directive
+                    return ''.join(lines)
+            if lines and not lines[-1].endswith('\n'):
+                lines[-1] += '\n'
+            lines.append(directive)
+            return ''.join(lines)
+
+        lines = [l for l in lines if not l.strip().startswith(spec.directive_match)]
+        if spec.directive_position == 'bottom':
+            if lines and not lines[-1].endswith('\n'):
+                lines[-1] += '\n'
+            lines.append(directive)
+        else:
+            lines.insert(0, directive)
+        return ''.join(lines)
+
+    def _apply_splice(self, content: str, theme_content: str) -> str:
+        spec = self.spec
+        pattern = re.compile(spec.splice_pattern, flags=re.DOTALL)
+
+        if spec.splice_position == 'replace':
+            match = pattern.search(content)
+            if match:
+                head = content[:match.start()] + theme_content
+                return head + pattern.sub('', content[match.end():])
+            return content + '\n\n' + theme_content
+
+        content = pattern.sub('', content)
+        if spec.splice_position == 'prepend':
+            return theme_content + '\n\n' + content
+        return content + '\n\n' + theme_content
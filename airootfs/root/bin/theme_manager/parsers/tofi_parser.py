@@ -0,0 +1,22 @@
+from parsers.spec import FormatSpec, SpecParser, TEXT_CONTRAST, UI_CONTRAST
+
+class TofiParser(SpecParser):
+    spec = FormatSpec(
+        app='tofi',
+        extension='conf',
+        entry='{key} = {value}',
+        key_pattern=r'[\w-]+-color',
+        value_pattern=r'#[a-fA-F0-9]{3,8}',
+        header=('# Theme: {name}', '# Author: {author}', ''),
+        # Later keys win in tofi, so the include goes last
+        activation='include',
+        directive='include = themes/{file}',
+        directive_match='include = themes/',
+        directive_position='bottom',
+        contrast=(
+            ('text-color', 'background-color', TEXT_CONTRAST),
+            ('prompt-color', 'background-color', TEXT_CONTRAST),
+            ('selection-color', 'background-color', TEXT_CONTRAST),
+            ('border-color', 'background-color', UI_CONTRAST),
+        ),
+    )
@@ -0,0 +1,22 @@
+from parsers.spec import FormatSpec, SpecParser, TEXT_CONTRAST, UI_CONTRAST
+
+class VesktopParser(SpecParser):
+    spec = FormatSpec(
+        app='vesktop',
+        extension='theme.css',
+        entry='    --{key}: {value};',
+        key_pattern=r'[\w-]+',
+        value_pattern=r'#[a-fA-F0-9]{6,8}',
+        comment='/*',
+        # Vencord only lists themes that carry @name meta
+        header=('/**', ' * @name {name}', ' * @author {author}', ' */', ''),
+        block_open=(':root {',),
+        block_close=('}',),
+        contrast=(
+            ('text-normal', 'background-primary', TEXT_CONTRAST),
+            ('text-normal', 'background-secondary', TEXT_CONTRAST),
+            ('text-muted', 'background-primary', UI_CONTRAST),
+            ('header-primary', 'background-primary', TEXT_CONTRAST),
+            ('interactive-normal', 'background-secondary', UI_CONTRAST),
+        ),
+    )
@@ -0,0 +1,89 @@
+import re
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+# Searchable theme fields; a query term can be limited to one with 'field:term'
+FIELDS = ('name', 'author', 'variant', 'tags')
+_FIELD_ALIASES = {'tag': 'tags'}
+_WORD = re.compile(r'[^\W_]+')
+
+
+def theme_fields(theme: Dict[str, Any]) -> Dict[str, str]:
+    """Lower-cased text of each searchable field"""
+    tags = theme.get('tags') or []
+    if isinstance(tags, str):
+        tags = [tags]
+    return {
+        'name': str(theme.get('name', '')).lower(),
+        'author': str(theme.get('author', '')).lower(),
+        'variant': str(theme.get('variant', 'dark')).lower(),
+        'tags': ' '.join(str(tag) for tag in tags).lower(),
+    }
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Trigram and prefix index over theme names, authors, variants and tags.
+
+    Terms of three or more characters look up the rows holding all of
+    their trigrams; shorter ones use a table of word prefixes. Candidates
+    are then confirmed with a substring check, so matching is exact
+    ("strix" finds "niri-strix-light") while only a few rows are touched.
+    """
+
+    def __init__(self, themes: List[Dict[str, Any]]):
+        self.names = [theme['name'] for theme in themes]
+        self.fields = [theme_fields(theme) for theme in themes]
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._prefixes: Dict[str, Set[int]] = {}
+        for row, fields in enumerate(self.fields):
+            for text in fields.values():
+                for gram in trigrams(text):
+                    self._trigrams.setdefault(gram, set()).add(row)
+                for word in _WORD.findall(text):
+                    for length in (1, 2):
+                        if len(word) >= length:
+                            self._prefixes.setdefault(word[:length], set()).add(row)
+
+    def search(self, query: str) -> List[str]:
+        """Names of themes matching every term of ``query``, in store order"""
+        rows: Optional[Set[int]] = None
+        for term in query.lower().split():
+            field, term = self._split_field(term)
+            if not term:
+                continue
+            matched = self._match(term, field)
+            rows = matched if rows is None else rows & matched
+            if not rows:
+                return []
+        if rows is None:
+            return list(self.names)
+        return [self.names[row] for row in sorted(rows)]
+
+    def _split_field(self, term: str) -> Tuple[Optional[str], str]:
+        field, sep, rest = term.partition(':')
+        field = _FIELD_ALIASES.get(field, field)
+        if sep and field in FIELDS:
+            return field, rest
+        return None, term
+
+    def _match(self, term: str, field: Optional[str]) -> Set[int]:
+        if len(term) >= 3:
+            grams = sorted(trigrams(term), key=lambda g: len(self._trigrams.get(g, ())))
+            candidates = set(self._trigrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                candidates &= self._trigrams.get(gram, set())
+                if not candidates:
+                    break
+            texts = [field] if field else FIELDS
+            return {row for row in candidates if any(term in self.fields[row][f] for f in texts)}
+
+        # One or two characters: match word starts only
+        candidates = self._prefixes.get(term, set())
+        texts = [field] if field else FIELDS
+        return {
+            row for row in candidates
+            if any(word.startswith(term) for f in texts for word in _WORD.findall(self.fields[row][f]))
+        }
@@ -0,0 +1,110 @@
+from pathlib import Path
+import json
+import os
+import random
+import threading
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+
+class ShuffleBag:
+    """Per-key shuffle bags, persisted so order survives restarts.
+
+    Every item is drawn once before any repeats. Items added mid-cycle are
+    mixed into what is left; removed items are dropped. A refill never
+    starts with the item drawn last.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._bags: Dict[str, Dict[str, Any]] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+        self._lock = threading.RLock()
+
+    def peek(self, key: str, items: Sequence[str]) -> Optional[str]:
+        """The item the next ``draw`` will return"""
+        with self._lock:
+            bag = self._sync(key, items)
+            return bag['bag'][-1] if bag['bag'] else None
+
+    def draw(self, key: str, items: Sequence[str]) -> Optional[str]:
+        with self._lock:
+            bag = self._sync(key, items)
+            if not bag['bag']:
+                return None
+            item = bag['bag'].pop()
+            bag['drawn'].append(item)
+            bag['last'] = item
+            self._save()
+            return item
+
+    def defer(self, key: str, items: Sequence[str]) -> Optional[str]:
+        """Push the upcoming item to the bottom of the bag and peek again"""
+        with self._lock:
+            bag = self._sync(key, items)
+            if len(bag['bag']) > 1:
+                bag['bag'].insert(0, bag['bag'].pop())
+                self._save()
+            return bag['bag'][-1] if bag['bag'] else None
+
+    def _sync(self, key: str, items: Sequence[str]) -> Dict[str, Any]:
+        bags = self._load()
+        bag = bags.setdefault(key, {'bag': [], 'drawn': [], 'last': None})
+        current = set(items)
+
+        remaining: List[str] = [i for i in bag['bag'] if i in current]
+        drawn: List[str] = [i for i in bag['drawn'] if i in current]
+        changed = len(remaining) != len(bag['bag']) or len(drawn) != len(bag['drawn'])
+
+        known = set(remaining) | set(drawn)
+        for item in items:
+            if item not in known:
+                remaining.insert(random.randint(0, len(remaining)), item)
+                changed = True
+
+        if not remaining and items:
+            remaining = list(items)
+            random.shuffle(remaining)
+            if len(remaining) > 1 and remaining[-1] == bag['last']:
+                remaining[0], remaining[-1] = remaining[-1], remaining[0]
+            drawn = []
+            changed = True
+
+        bag['bag'], bag['drawn'] = remaining, drawn
+        if changed:
+            self._save()
+        return bag
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        # Re-read when another process (GUI, slideshow) has drawn meanwhile
+        signature = self._stat()
+        if signature != self._signature:
+            self._bags = {}
+            if signature is not None:
+                try:
+                    with open(self.path, 'r') as f:
+                        self._bags = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Error reading shuffle bags: {e}")
+            self._signature = signature
+        return self._bags
+
+    def _save(self):
+        if self.path is None:
+            return
+        try:
+            tmp_file = self.path.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(self._bags, f)
+            os.replace(tmp_file, self.path)
+            self._signature = self._stat()
+        except OSError as e:
+            print(f"Error saving shuffle bags: {e}")
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        if self.path is None:
+            return None
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
@@ -0,0 +1,116 @@
+from pathlib import Path
+import os
+import re
+import socket
+import subprocess
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+_QUERY_LINE = re.compile(r'^:?\s*(?P<name>[^:\s]+):\s*(?P<width>\d+)x(?P<height>\d+)(?:,\s*scale:\s*(?P<scale>[\d.]+))?')
+
+
+class Output(NamedTuple):
+    name: str
+    width: int
+    height: int
+    scale: float = 1.0
+
+
+class SwwwDaemon:
+    """Long-lived handle on swww-daemon.
+
+    Readiness is decided by connecting to the daemon's socket instead of
+    forking ``pgrep`` on every call, and a cold start waits for that socket
+    to accept connections rather than sleeping a fixed time.
+    """
+
+    def __init__(self, startup_timeout: float = 5.0):
+        self.startup_timeout = startup_timeout
+        self._process: Optional[subprocess.Popen] = None
+        self._ready = False
+        self._outputs: Optional[List[Output]] = None
+        self._lock = threading.Lock()
+
+    def socket_candidates(self) -> List[Path]:
+        runtime = Path(os.environ.get('XDG_RUNTIME_DIR', f'/run/user/{os.getuid()}'))
+        display = os.environ.get('WAYLAND_DISPLAY', 'wayland-0')
+        named = [
+            runtime / f'{display}-swww-daemon..sock',
+            runtime / f'{display}-swww-daemon..socket',
+            runtime / f'swww-{display}.socket',
+            runtime / 'swww.socket',
+        ]
+        return named + sorted(p for p in runtime.glob('*swww*.sock*') if p not in named)
+
+    def is_ready(self) -> bool:
+        """True if some swww socket accepts a connection"""
+        for path in self.socket_candidates():
+            if not path.exists():
+                continue
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                try:
+                    sock.connect(str(path))
+                    return True
+                except OSError:
+                    continue
+        return False
+
+    def ensure_running(self) -> bool:
+        """Start the daemon if needed and wait until it accepts requests"""
+        with self._lock:
+            if self._ready and (self._process is None or self._process.poll() is None):
+                return True
+            self._ready = self.is_ready()
+            if self._ready:
+                return True
+
+            print("Starting swww daemon...")
+            self._process = subprocess.Popen(
+                ['swww-daemon'],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                start_new_session=True
+            )
+            self._outputs = None
+
+            deadline = time.monotonic() + self.startup_timeout
+            delay = 0.005
+            while time.monotonic() < deadline:
+                if self._process.poll() is not None:
+                    print("swww-daemon exited during startup")
+                    return False
+                if self.is_ready():
+                    self._ready = True
+                    return True
+                time.sleep(delay)
+                delay = min(delay * 2, 0.1)
+
+            print(f"swww-daemon not ready after {self.startup_timeout:.1f}s")
+            return False
+
+    def invalidate(self):
+        """Forget cached state, e.g. after a failed request"""
+        with self._lock:
+            self._ready = False
+            self._outputs = None
+
+    def outputs(self) -> List[Output]:
+        """Connected outputs as reported by ``swww query`` (cached)"""
+        if self._outputs is not None:
+            return self._outputs
+        if not self.ensure_running():
+            return []
+        result = subprocess.run(['swww', 'query'], capture_output=True, text=True)
+        outputs = []
+        for line in result.stdout.splitlines():
+            match = _QUERY_LINE.match(line.strip())
+            if match:
+                outputs.append(Output(
+                    match.group('name'),
+                    int(match.group('width')),
+                    int(match.group('height')),
+                    float(match.group('scale') or 1)
+                ))
+        self._outputs = outputs
+        return outputs
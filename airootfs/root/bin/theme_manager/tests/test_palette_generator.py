@@ -0,0 +1,17 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from palette_generator import HARMONIES, generate_themes
+
+
+@pytest.mark.parametrize('seed', ['#be3f50', '#3fbe8a', '#1a73e8', '#f4c430'])
+@pytest.mark.parametrize('harmony', sorted(HARMONIES))
+def test_seed_is_main_accent(seed, harmony):
+    for generated in generate_themes('test', harmony, seed, top=3, candidates=256, rng_seed=0):
+        colors = generated.theme['colors']
+        assert colors['niri_active-color'] == seed
+        assert colors['kitty_cursor'] == seed
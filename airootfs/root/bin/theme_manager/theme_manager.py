@@ -1,16 +1,23 @@
 from pathlib import Path
 import json
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
-from config import THEME_MANAGER_DIR, THEMES_FILE, STATE_FILE, APP_CONFIGS, ACTIVE_CONFIGS, WALLS_DIR
+from config import THEME_MANAGER_DIR, THEMES_FILE, STATE_FILE, APP_CONFIGS, ACTIVE_CONFIGS, WALLS_DIR, HOOKS_DIR, WALLPAPER_INDEX_FILE, WALLPAPER_CACHE_DIR, WALLPAPER_BAG_FILE, PALETTE_CACHE_DIR, SIGNATURE_CACHE_FILE
 from parsers.btop_parser import BtopParser
 from parsers.dunst_parser import DunstParser
+from parsers.fish_parser import FishParser
+from parsers.foot_parser import FootParser
 from parsers.kitty_parser import KittyParser
 from parsers.niri_parser import NiriParser
 from parsers.nvim_parser import NvimParser
 from parsers.rofi_parser import RofiParser
 from parsers.superfile_parser import SuperfileParser
+from parsers.tofi_parser import TofiParser
+from parsers.vesktop_parser import VesktopParser
 from parsers.waybar_parser import WaybarParser
+from hook_runner import HookRunner
+from job_queue import CoalescingJobQueue
+from theme_store import ThemeStore
 from wallpaper_manager import WallpaperManager
 
 class ThemeManager:
@@ -24,8 +31,19 @@ class ThemeManager:
             'superfile': SuperfileParser(), 
             'rofi': RofiParser(),          
             'dunst': DunstParser(),        
+            'foot': FootParser(),
+            'tofi': TofiParser(),
+            'vesktop': VesktopParser(),
+            'fish': FishParser(),
         }
-        self.wallpaper_manager = WallpaperManager(WALLS_DIR)
+        self.store = ThemeStore(THEMES_FILE)
+        self.wallpaper_manager = WallpaperManager(
+            WALLS_DIR, WALLPAPER_INDEX_FILE, WALLPAPER_CACHE_DIR, WALLPAPER_BAG_FILE
+        )
+        self.hook_runner = HookRunner(HOOKS_DIR)
+        self.jobs = CoalescingJobQueue()
+        # Built on first colour query (needs numpy)
+        self._color_index = None
         self.ensure_dirs()
 
     def ensure_dirs(self):
@@ -34,40 +52,30 @@ class ThemeManager:
             app_dir.mkdir(parents=True, exist_ok=True)
 
     def list_themes(self) -> List[Dict[str, Any]]:
-        if not THEMES_FILE.exists():
-            return []
-        try:
-            with open(THEMES_FILE, 'r') as f:
-                data = json.load(f)
-            return data.get('themes', [])
-        except:
-            return []
+        return self.store.themes()
 
     def get_theme(self, name: str) -> Optional[Dict[str, Any]]:
-        themes = self.list_themes()
-        for theme in themes:
-            if theme['name'] == name:
-                return theme
-        return None
+        return self.store.get(name)
 
-    def save_theme(self, theme: Dict[str, Any]) -> bool:
-        try:
-            themes = self.list_themes()
-            existing = None
-            for i, t in enumerate(themes):
-                if t['name'] == theme['name']:
-                    existing = i
-                    break
+    def write_themes(self, themes: List[Dict[str, Any]]):
+        self.store.write(themes)
 
-            if existing is not None:
-                themes[existing] = theme
-            else:
-                themes.append(theme)
+    def save_theme(self, theme: Dict[str, Any], background: bool = False) -> bool:
+        """Store a theme and regenerate its app files.
 
-            with open(THEMES_FILE, 'w') as f:
-                json.dump({'themes': themes}, f, indent=2)
+        With ``background`` the store is written immediately but the app files
+        are regenerated on the job queue, coalesced per theme name.
+        """
+        try:
+            self.store.put(theme)
+            if self._color_index is not None:
+                self._color_index.update(theme)
 
-            self.generate_theme_files(theme)
+            if background:
+                # Raising marks the job failed, so the GUI reports it
+                self.jobs.submit(theme['name'], lambda: self.generate_theme_files(theme, strict=True))
+            else:
+                self.generate_theme_files(theme)
             return True
         except Exception as e:
             print(f"Error saving theme: {e}")
@@ -75,14 +83,14 @@ class ThemeManager:
 
     def delete_theme(self, name: str) -> bool:
         try:
-            themes = self.list_themes()
-            themes = [t for t in themes if t['name'] != name]
-
-            with open(THEMES_FILE, 'w') as f:
-                json.dump({'themes': themes}, f, indent=2)
+            self.jobs.cancel(name)
+            self.jobs.wait(name)
+            self.store.remove(name)
+            if self._color_index is not None:
+                self._color_index.remove(name)
 
-            for app, theme_dir in APP_CONFIGS.items():
-                theme_file = theme_dir / f"{name}.{self.get_extension(app)}"
+            for app in APP_CONFIGS:
+                theme_file = self.get_theme_file(name, app)
                 if theme_file.exists():
                     theme_file.unlink()
 
@@ -91,8 +99,21 @@ class ThemeManager:
             print(f"Error deleting theme: {e}")
             return False
 
-    def generate_theme_files(self, theme: Dict[str, Any]):
+    def get_theme_file(self, name: str, app: str) -> Path:
+        return APP_CONFIGS[app] / f"{name}.{self.get_extension(app)}"
+
+    def generate_theme_files(self, theme: Dict[str, Any], apps: Optional[List[str]] = None,
+                             strict: bool = False) -> List[Path]:
+        """Write per-app theme files, optionally limited to some apps.
+
+        A failing app doesn't stop the others; with ``strict`` the failures
+        are raised together once every app has been tried.
+        """
+        written = []
+        failed = []
         for app, parser in self.parsers.items():
+            if apps is not None and app not in apps:
+                continue
             try:
                 content = parser.generate(theme['colors'], {
                     'name': theme['name'],
@@ -100,43 +121,87 @@ class ThemeManager:
                     'variant': theme.get('variant', 'dark')
                 })
 
-                theme_dir = APP_CONFIGS[app]
-                theme_file = theme_dir / f"{theme['name']}.{self.get_extension(app)}"
+                theme_file = self.get_theme_file(theme['name'], app)
 
                 with open(theme_file, 'w') as f:
                     f.write(content)
+                written.append(theme_file)
             except Exception as e:
                 print(f"Error generating {app} theme: {e}")
-    
-    
-    def apply_theme(self, name: str, apps: List[str], apply_wallpaper: bool = False, transition: str = "fade") -> bool:
+                failed.append(f"{app}: {e}")
+        if strict and failed:
+            raise RuntimeError("; ".join(failed))
+        return written
+
+    def activate_apps(self, name: str, apps: List[str]):
+        """Point each app's active config at the theme's generated file"""
+        for app in apps:
+            if app not in self.parsers:
+                continue
+
+            theme_file = self.get_theme_file(name, app)
+
+            if theme_file.exists() and app in ACTIVE_CONFIGS:
+                parser = self.parsers[app]
+                parser.apply(theme_file, ACTIVE_CONFIGS[app])
+
+    def apply_theme(self, name: str, apps: List[str], apply_wallpaper: bool = False, transition: str = "fade",
+                    wallpaper_per_output: bool = False,
+                    progress: Optional[Callable[[str, int, int], None]] = None,
+                    is_cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Apply a theme to apps (and optionally the wallpaper).
+
+        ``wallpaper_per_output`` gives each monitor its own wallpaper.
+        ``progress(step, done, total)`` is called after each app, the wallpaper
+        and the hooks. ``is_cancelled`` is checked between steps; a cancelled
+        apply stops early, leaves the saved state untouched and returns False.
+        """
         theme = self.get_theme(name)
         if not theme:
             return False
 
+        # Don't activate files that a queued save is about to rewrite
+        self.jobs.wait(name)
+
+        steps = list(apps) + (['wallpaper'] if apply_wallpaper else []) + ['hooks']
+
+        def step_done(step: str) -> bool:
+            if progress:
+                progress(step, steps.index(step) + 1, len(steps))
+            if is_cancelled and is_cancelled():
+                print(f"Applying '{name}' cancelled after {step}")
+                return False
+            return True
+
         try:
             # Apply colors to apps
             for app in apps:
-                if app not in self.parsers:
-                    continue
-
-                theme_dir = APP_CONFIGS[app]
-                theme_file = theme_dir / f"{name}.{self.get_extension(app)}"
-
-                if theme_file.exists() and app in ACTIVE_CONFIGS:
-                    parser = self.parsers[app]
-                    parser.apply(theme_file, ACTIVE_CONFIGS[app])
+                self.activate_apps(name, [app])
+                if not step_done(app):
+                    return False
 
             # Apply wallpaper BEFORE return
             if apply_wallpaper:
-                self.wallpaper_manager.set_random_wallpaper(name, transition)
+                self.wallpaper_manager.set_random_wallpaper(name, transition, wallpaper_per_output)
+                if not step_done('wallpaper'):
+                    return False
+
+            # User hooks run last, bounded by the runner's time budget
+            hook_results = self.hook_runner.run(theme, apps)
+            if progress:
+                progress('hooks', len(steps), len(steps))
 
             # Save state with wallpaper info
             self.save_state({
                 'current_theme': name, 
                 'apps': apps,
                 'wallpaper_enabled': apply_wallpaper,
-                'wallpaper_transition': transition
+                'wallpaper_transition': transition,
+                'wallpaper_per_output': wallpaper_per_output,
+                'hooks': [
+                    {k: r[k] for k in ('hook', 'duration', 'returncode', 'timed_out')}
+                    for r in hook_results
+                ]
             })
         
             return True
@@ -144,7 +209,15 @@ class ThemeManager:
             print(f"Error applying theme: {e}")
             return False
 
-   
+    def load_state(self) -> Dict[str, Any]:
+        if not STATE_FILE.exists():
+            return {}
+        try:
+            with open(STATE_FILE, 'r') as f:
+                return json.load(f)
+        except:
+            return {}
+
     def save_state(self, state: Dict[str, Any]):
         try:
             with open(STATE_FILE, 'w') as f:
@@ -153,27 +226,134 @@ class ThemeManager:
             pass
 
     def get_extension(self, app: str) -> str:
-        extensions = {
-            'btop': 'theme',
-            'kitty': 'conf',
-            'niri': 'kdl',
-            'nvim': 'lua',
-            'waybar': 'css',
-            'superfile': 'toml',
-            'rofi': 'rasi',
-            'dunst': 'conf',
-        }
-        return extensions.get(app, 'conf')
+        parser = self.parsers.get(app)
+        return parser.extension if parser else 'conf'
+
+    def get_theme_wallpaper_info(self, theme_name: str, reroll: bool = False) -> dict:
+        """Get wallpaper information for a theme.
 
-    def get_theme_wallpaper_info(self, theme_name: str) -> dict:
-        """Get wallpaper information for a theme"""
+        ``next`` is the wallpaper a random switch will use; it is prefetched
+        in the background. ``reroll`` picks a different one.
+        """
         wallpapers = self.wallpaper_manager.get_theme_wallpapers(theme_name)
         return {
             'count': len(wallpapers),
             'wallpapers': wallpapers,
+            'next': self.wallpaper_manager.prefetch(theme_name, reroll),
             'directory': self.wallpaper_manager.walls_dir / theme_name
         }
 
+    def theme_from_wallpaper(self, image_path: Path, name: str, author: str = "Palette Extractor",
+                             save: bool = True, background: bool = False) -> Optional[Dict[str, Any]]:
+        """Build a full theme from an image's palette (needs numpy and PyQt6)"""
+        from palette_extractor import PaletteExtractor
+
+        theme = PaletteExtractor(PALETTE_CACHE_DIR).theme(image_path, name, author)
+        if save and not self.save_theme(theme, background):
+            return None
+        return theme
+
+    def classify_wallpapers(self, images: List[Path], move: bool = False, min_margin: float = 0.05) -> list:
+        """Suggest a theme for each image by palette distance (needs numpy and PyQt6).
+
+        With ``move`` images whose best theme beats the runner-up by at least
+        ``min_margin`` are moved into that theme's wallpaper folder.
+        """
+        from wallpaper_classifier import WallpaperClassifier
+
+        placements = WallpaperClassifier(SIGNATURE_CACHE_FILE).classify(images, self.list_themes())
+        if move:
+            for placement in placements:
+                if placement.theme is not None and placement.margin >= min_margin:
+                    self.wallpaper_manager.place_wallpaper(placement.path, placement.theme)
+        return placements
+
+    def create_variants(self, variants: List[str], names: Optional[List[str]] = None,
+                        save: bool = True) -> List[Dict[str, Any]]:
+        """Generate light/dim/high-contrast variants (needs numpy).
+
+        Defaults to every theme that isn't itself a generated variant.
+        Existing variants of the same name are replaced.
+        """
+        from theme_variants import make_variants
+
+        themes = self.list_themes()
+        if names:
+            themes = [t for t in themes if t['name'] in names]
+        else:
+            themes = [t for t in themes if 'base' not in t]
+        generated = make_variants(themes, variants)
+        if save and generated:
+            self.store.put_many(generated)
+            for theme in generated:
+                self.generate_theme_files(theme)
+        return generated
+
+    def audit_contrast(self, names: Optional[List[str]] = None, suggest: bool = False) -> list:
+        """WCAG contrast problems of every app's fg/bg pairs (needs numpy)"""
+        from contrast_audit import audit, contrast_pairs
+
+        themes = self.list_themes()
+        if names:
+            themes = [t for t in themes if t['name'] in names]
+        return audit(themes, contrast_pairs(self.parsers), suggest)
+
+    def fix_contrast(self, names: Optional[List[str]] = None) -> Tuple[List[Dict[str, Any]], list]:
+        """Apply the audit's suggestions and save the changed themes.
+
+        Returns the changed themes and any issues that remain.
+        """
+        from contrast_audit import contrast_pairs, fix_themes
+
+        themes = self.list_themes()
+        if names:
+            themes = [t for t in themes if t['name'] in names]
+        fixed, remaining = fix_themes(themes, contrast_pairs(self.parsers))
+        if fixed:
+            self.store.put_many(fixed)
+            for theme in fixed:
+                self.generate_theme_files(theme)
+        return fixed, remaining
+
+    def generate_themes(self, name: str, harmony: str = 'free', seed: Optional[str] = None, top: int = 5,
+                        save: bool = False) -> list:
+        """Generate and rank candidate palettes, returning the best ``top``
+        as GeneratedTheme results (needs numpy).
+
+        The app contrast pairs are fixed up before anything is saved.
+        """
+        from contrast_audit import contrast_pairs, fix_themes
+        from palette_generator import generate_themes
+
+        generated = generate_themes(name, harmony, seed, top)
+        fixed, _ = fix_themes([g.theme for g in generated], contrast_pairs(self.parsers))
+        fixed = {theme['name']: theme for theme in fixed}
+        generated = [g._replace(theme=fixed.get(g.theme['name'], g.theme)) for g in generated]
+        if save and generated:
+            self.store.put_many([g.theme for g in generated])
+            for g in generated:
+                self.generate_theme_files(g.theme)
+        return generated
+
+    @property
+    def color_index(self):
+        if self._color_index is None:
+            from color_index import ColorIndex
+            self._color_index = ColorIndex(self.store)
+        return self._color_index
+
+    def find_themes_by_color(self, color: str, count: int = 10, keys: List[str] = ()) -> list:
+        """Themes with a colour closest to ``color``, optionally only among
+        keys matching the ``keys`` patterns (needs numpy)"""
+        return self.color_index.nearest(color, count, keys)
+
+    def find_similar_themes(self, name: str, count: int = 10) -> List[tuple]:
+        """(theme, score) pairs for the themes whose colours best match ``name``'s"""
+        theme = self.get_theme(name)
+        if theme is None:
+            return []
+        return self.color_index.similar(theme, count)
+
     def import_from_existing(self, name: str, author: str = "Imported"):
         colors = {}
 
@@ -188,10 +368,17 @@ class ThemeManager:
                     print(f"Error parsing {app}: {e}")
 
         if colors:
+            try:
+                from theme_variants import detect_variant
+                variant = detect_variant(colors)
+            except ImportError:
+                # numpy missing: imported themes default to dark as before
+                variant = 'dark'
+
             theme = {
                 'name': name,
                 'author': author,
-                'variant': 'dark',
+                'variant': variant,
                 'colors': colors
             }
             return self.save_theme(theme)
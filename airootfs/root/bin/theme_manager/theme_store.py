@@ -0,0 +1,134 @@
+from pathlib import Path
+import json
+import os
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+
+from search_index import SearchIndex
+
+
+class ThemeStore:
+    """In-memory index over themes.json.
+
+    The file is only re-read when its mtime or size changes, and lookups by
+    name go through a dict instead of scanning the list. ``version`` goes
+    up whenever the list changes.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._themes: List[Dict[str, Any]] = []
+        self._index: Dict[str, int] = {}
+        self._signature: Optional[Tuple[int, int]] = None
+        self._search: Optional[SearchIndex] = None
+        self.version = 0
+        self._lock = threading.RLock()
+
+    def themes(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            return list(self._themes)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return [t['name'] for t in self._themes]
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            row = self._index.get(name)
+            return self._themes[row] if row is not None else None
+
+    def search(self, query: str) -> List[str]:
+        """Names of themes whose name, author, variant or tags match ``query``"""
+        with self._lock:
+            self._refresh()
+            # Built on the first search after a change
+            if self._search is None:
+                self._search = SearchIndex(self._themes)
+            return self._search.search(query)
+
+    def row(self, name: str) -> Optional[int]:
+        with self._lock:
+            self._refresh()
+            return self._index.get(name)
+
+    def put(self, theme: Dict[str, Any]) -> int:
+        """Insert or replace a theme by name and return its row"""
+        with self._lock:
+            self._refresh()
+            themes = list(self._themes)
+            row = self._index.get(theme['name'])
+            if row is None:
+                row = len(themes)
+                themes.append(theme)
+            else:
+                themes[row] = theme
+            self.write(themes)
+            return row
+
+    def put_many(self, new_themes: List[Dict[str, Any]]):
+        """Insert or replace several themes with a single write"""
+        with self._lock:
+            self._refresh()
+            themes = list(self._themes)
+            # Rows of the new list; write() swaps in the real index once saved
+            index = dict(self._index)
+            for theme in new_themes:
+                row = index.get(theme['name'])
+                if row is None:
+                    index[theme['name']] = len(themes)
+                    themes.append(theme)
+                else:
+                    themes[row] = theme
+            self.write(themes)
+
+    def remove(self, name: str) -> Optional[int]:
+        """Remove a theme and return the row it occupied"""
+        with self._lock:
+            self._refresh()
+            row = self._index.get(name)
+            if row is not None:
+                self.write(self._themes[:row] + self._themes[row + 1:])
+            return row
+
+    def write(self, themes: List[Dict[str, Any]]):
+        with self._lock:
+            # A failed write leaves both the file and the index as they were
+            tmp_file = self.path.with_suffix('.tmp')
+            try:
+                with open(tmp_file, 'w') as f:
+                    json.dump({'themes': themes}, f, indent=2)
+                os.replace(tmp_file, self.path)
+            finally:
+                tmp_file.unlink(missing_ok=True)
+            self._set(themes)
+            self._signature = self._stat()
+
+    def _refresh(self):
+        signature = self._stat()
+        if signature == self._signature:
+            return
+        themes = []
+        if signature is not None:
+            try:
+                with open(self.path, 'r') as f:
+                    themes = json.load(f).get('themes', [])
+            except (OSError, ValueError) as e:
+                print(f"Error reading themes: {e}")
+        self._set(themes)
+        self._signature = signature
+
+    def _set(self, themes: List[Dict[str, Any]]):
+        self._themes = themes
+        self._index = {t['name']: i for i, t in enumerate(themes)}
+        self._search = None
+        self.version += 1
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
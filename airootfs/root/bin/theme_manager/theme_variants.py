@@ -0,0 +1,201 @@
+import math
+from typing import Dict, List, Any, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from color_space import parse_hex, to_hex, srgb_to_oklab, oklab_to_srgb, oklab_to_oklch, oklch_to_oklab, fit_gamut
+
+# Colours below this OKLCH chroma are treated as neutrals, above twice it
+# as accents; in between the two lightness curves are blended
+_NEUTRAL_CHROMA = 0.04
+
+
+class VariantSpec(NamedTuple):
+    # What the curves make of a dark theme. A variant that changes it
+    # (light) is skipped for themes that already are one
+    variant: str
+    # Neutral lightness: offset + slope * L ** power
+    neutral: Tuple[float, float, float]
+    # Accent lightness: offset + slope * L, clipped to [low, high]
+    accent: Tuple[float, float, float, float]
+    chroma: float
+
+
+# The curves are written for dark themes; light themes run through them
+# mirrored (L -> 1 - L before and after), so dim still softens the extremes
+# and high-contrast still pushes them apart
+VARIANTS: Dict[str, VariantSpec] = {
+    # Dark backgrounds become near-white; accents darken enough to read on them
+    'light': VariantSpec('light', (0.98, -0.75, 1.5), (1.05, -1.0, 0.35, 0.6), 0.9),
+    # Lifted blacks, softer whites, muted accents
+    'dim': VariantSpec('dark', (0.2, 0.65, 1.0), (0.15, 0.7, 0.3, 0.75), 0.7),
+    # Neutrals pushed apart, brighter and more saturated accents
+    'high-contrast': VariantSpec('dark', (-0.25, 1.5, 1.0), (0.1, 1.0, 0.65, 0.9), 1.15),
+}
+
+
+def applies_to(spec: VariantSpec, base_variant: str) -> bool:
+    """Whether a theme of base_variant ('dark'/'light') gets this variant"""
+    return spec.variant == 'dark' or spec.variant != base_variant
+
+
+def transform_lch(lch: np.ndarray, spec: VariantSpec, mirror=False) -> np.ndarray:
+    """Apply a variant's lightness and chroma curves to (N, 3) OKLCH colours.
+
+    mirror (a bool or an (N,) mask) marks colours of light themes.
+    """
+    lightness = np.clip(lch[:, 0], 0.0, 1.0)
+    lightness = np.where(mirror, 1.0 - lightness, lightness)
+    offset, slope, power = spec.neutral
+    neutral = offset + slope * lightness ** power
+    offset, slope, low, high = spec.accent
+    accent = np.clip(offset + slope * lightness, low, high)
+    weight = np.clip(lch[:, 1] / _NEUTRAL_CHROMA - 1, 0.0, 1.0)
+
+    out = lch.copy()
+    out[:, 0] = neutral + (accent - neutral) * weight
+    out[:, 0] = np.where(mirror, 1.0 - out[:, 0], out[:, 0])
+    out[:, 1] = lch[:, 1] * spec.chroma
+    return fit_gamut(out)
+
+
+def make_variants(themes: Sequence[Dict[str, Any]], variants: Sequence[str]) -> List[Dict[str, Any]]:
+    """Derive every requested variant of every theme.
+
+    All colours of all themes are converted to OKLCH in one batch, each
+    variant's curves run over that one array, and the results are split
+    back into themes named ``<theme>-<variant>``. Light themes get no
+    light variant.
+    """
+    values = [value for theme in themes for value in theme['colors'].values()]
+    rgb, valid = parse_hex(values)
+    lch = oklab_to_oklch(srgb_to_oklab(rgb[valid]))
+    sizes = [len(theme['colors']) for theme in themes]
+    backgrounds = np.array([_is_background(key) for theme in themes for key in theme['colors']], dtype=bool)
+    lightness = np.full(len(values), np.nan)
+    lightness[valid] = lch[:, 0]
+    bases = _detect(lightness, backgrounds, sizes)
+    mirror = np.repeat(np.array([base == 'light' for base in bases], dtype=bool), sizes)[valid]
+
+    generated = []
+    for variant in variants:
+        spec = VARIANTS[variant]
+        out = transform_lch(lch, spec, mirror)
+        lightness[valid] = out[:, 0]
+        results = _detect(lightness, backgrounds, sizes)
+        hexes = iter(to_hex(oklab_to_srgb(oklch_to_oklab(out))))
+        flags = iter(valid)
+        for theme, base, result in zip(themes, bases, results):
+            colors = {}
+            for key, value in theme['colors'].items():
+                # Non-colour values pass through; alpha suffixes are kept
+                colors[key] = next(hexes) + value[7:] if next(flags) else value
+            if not applies_to(spec, base):
+                continue
+            generated.append({
+                'name': f"{theme['name']}-{variant}",
+                'author': theme.get('author', 'Theme Manager'),
+                'variant': result,
+                'base': theme['name'],
+                'colors': colors,
+            })
+            if theme.get('tags'):
+                generated[-1]['tags'] = list(theme['tags'])
+    return generated
+
+
+def _is_background(key: str) -> bool:
+    return key.endswith('background') or key.endswith('bg')
+
+
+def _detect(lightness: np.ndarray, backgrounds: np.ndarray, sizes: Sequence[int]) -> List[str]:
+    """detect_variant for consecutive themes' OKLab lightness (NaN: not a colour)"""
+    variants = []
+    start = 0
+    for size in sizes:
+        values = lightness[start:start + size]
+        flags = backgrounds[start:start + size]
+        start += size
+        if flags.any():
+            values = values[flags]
+        values = values[~np.isnan(values)]
+        variants.append('light' if values.size and np.median(values) > 0.6 else 'dark')
+    return variants
+
+
+def detect_variant(colors: Dict[str, str]) -> str:
+    """'light' or 'dark', from the lightness of the background colours"""
+    rgb, valid = parse_hex(list(colors.values()))
+    lightness = np.full(len(colors), np.nan)
+    lightness[valid] = srgb_to_oklab(rgb[valid])[:, 0]
+    backgrounds = np.array([_is_background(key) for key in colors], dtype=bool)
+    return _detect(lightness, backgrounds, [len(colors)])[0]
+
+
+# Per-colour pure-Python version of the same pipeline, kept as the
+# baseline for `make-variants --benchmark` and to check the batch results
+
+_LMS_FROM_LINEAR = (
+    (0.4122214708, 0.5363325363, 0.0514459929),
+    (0.2119034982, 0.6806995451, 0.1073969566),
+    (0.0883024619, 0.2817188376, 0.6299787005),
+)
+_LAB_FROM_LMS = (
+    (0.2104542553, 0.7936177850, -0.0040720468),
+    (1.9779984951, -2.4285922050, 0.4505937099),
+    (0.0259040371, 0.7827717662, -0.8086757660),
+)
+_LMS_FROM_LAB = tuple(tuple(row) for row in np.linalg.inv(_LAB_FROM_LMS).tolist())
+_LINEAR_FROM_LMS = tuple(tuple(row) for row in np.linalg.inv(_LMS_FROM_LINEAR).tolist())
+
+
+def _mul(matrix, vector):
+    return tuple(sum(m * v for m, v in zip(row, vector)) for row in matrix)
+
+
+def _clip(value: float, low: float, high: float) -> float:
+    return min(max(value, low), high)
+
+
+def _lch_to_linear(l: float, c: float, h: float):
+    lab = (l, c * math.cos(math.radians(h)), c * math.sin(math.radians(h)))
+    return _mul(_LINEAR_FROM_LMS, [x ** 3 for x in _mul(_LMS_FROM_LAB, lab)])
+
+
+def variant_color(color: str, spec: VariantSpec, mirror: bool = False) -> str:
+    """One colour through the variant pipeline, without NumPy"""
+    rgb = [int(color[i:i + 2], 16) / 255 for i in (1, 3, 5)]
+    linear = [c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4 for c in rgb]
+    lab = _mul(_LAB_FROM_LMS, [math.copysign(abs(x) ** (1 / 3), x) for x in _mul(_LMS_FROM_LINEAR, linear)])
+    l, c, h = lab[0], math.hypot(lab[1], lab[2]), math.degrees(math.atan2(lab[2], lab[1])) % 360
+
+    lightness = _clip(l, 0.0, 1.0)
+    if mirror:
+        lightness = 1.0 - lightness
+    offset, slope, power = spec.neutral
+    neutral = offset + slope * lightness ** power
+    offset, slope, low, high = spec.accent
+    accent = _clip(offset + slope * lightness, low, high)
+    weight = _clip(c / _NEUTRAL_CHROMA - 1, 0.0, 1.0)
+    l = neutral + (accent - neutral) * weight
+    l = _clip(1.0 - l if mirror else l, 0.0, 1.0)
+    c *= spec.chroma
+
+    def fits(chroma: float) -> bool:
+        return all(-1e-4 <= x <= 1 + 1e-4 for x in _lch_to_linear(l, chroma, h))
+
+    if not fits(c):
+        low, high = 0.0, c
+        for _ in range(12):
+            if fits((low + high) / 2):
+                low = (low + high) / 2
+            else:
+                high = (low + high) / 2
+        c = low
+
+    out = []
+    for x in _lch_to_linear(l, c, h):
+        x = max(x, 0.0)
+        x = x * 12.92 if x <= 0.0031308 else 1.055 * x ** (1 / 2.4) - 0.055
+        out.append(round(_clip(x, 0.0, 1.0) * 255))
+    return '#' + ''.join(f"{x:02x}" for x in out) + color[7:]
@@ -0,0 +1,171 @@
+from pathlib import Path
+import select
+import time
+from typing import Dict, List, Any, Optional, Set
+
+from config import THEMES_FILE, APP_CONFIGS, ACTIVE_CONFIGS
+from inotify import Inotify
+
+
+class ThemeWatcher:
+    """Regenerate and live-apply themes when their sources are edited"""
+
+    def __init__(self, theme_manager, debounce: float = 0.1, latency_budget: float = 0.25):
+        self.theme_manager = theme_manager
+        self.debounce = debounce
+        self.latency_budget = latency_budget
+        self._snapshot = self._load_snapshot()
+        # mtime_ns of files we wrote ourselves, so their events are ignored
+        self._own_writes: Dict[Path, int] = {}
+        self._app_dirs = {theme_dir.resolve(): app for app, theme_dir in APP_CONFIGS.items()}
+        # Active files (current.kdl, ...) may share a theme directory; they
+        # are written on apply and never hold a theme of their own
+        self._active_files = {path.parent.resolve() / path.name for path in ACTIVE_CONFIGS.values()}
+
+    def run(self):
+        inotify = Inotify()
+        inotify.add_watch(THEMES_FILE.parent)
+        for theme_dir in APP_CONFIGS.values():
+            inotify.add_watch(theme_dir)
+
+        print(f"Watching {THEMES_FILE} and {len(APP_CONFIGS)} app theme directories")
+        pending: Set[Optional[Path]] = set()
+        first_event = deadline = 0.0
+        try:
+            while True:
+                timeout = max(0.0, deadline - time.monotonic()) if pending else None
+                ready, _, _ = select.select([inotify.fd], [], [], timeout)
+                now = time.monotonic()
+
+                if ready:
+                    if not pending:
+                        first_event = now
+                    pending.update(inotify.read_events())
+                    # Wait for the burst to settle, but never past the budget
+                    deadline = min(now + self.debounce, first_event + self.latency_budget / 2)
+                    continue
+
+                if pending:
+                    self.process(pending)
+                    pending = set()
+                    elapsed = time.monotonic() - first_event
+                    if elapsed > self.latency_budget:
+                        print(f"Watch update took {elapsed * 1000:.0f} ms "
+                              f"(budget {self.latency_budget * 1000:.0f} ms)")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            inotify.close()
+
+    def process(self, paths: Set[Optional[Path]]):
+        """Handle one debounced batch of changed paths"""
+        # An overflow means events were lost; re-check the whole store
+        store_changed = None in paths or THEMES_FILE in paths
+        touched_apps: Dict[str, Set[str]] = {}
+
+        for path in paths:
+            if path is None or path == THEMES_FILE or self._is_own_write(path):
+                continue
+            located = self._locate_theme_file(path)
+            if located:
+                app, name = located
+                touched_apps.setdefault(name, set()).add(app)
+
+        state = self.theme_manager.load_state()
+        active = state.get('current_theme')
+        active_apps = set(state.get('apps', []))
+
+        if store_changed:
+            self._sync_store(active, active_apps)
+
+        for name, apps in touched_apps.items():
+            self._sync_app_files(name, apps, active, active_apps)
+
+    def _sync_store(self, active: Optional[str], active_apps: Set[str]):
+        snapshot = self._load_snapshot()
+        for name, theme in snapshot.items():
+            previous = self._snapshot.get(name)
+            changed = self._changed_apps(previous, theme)
+            if not changed:
+                continue
+
+            written = self.theme_manager.generate_theme_files(theme, sorted(changed))
+            self._remember_writes(written)
+            if name == active:
+                self._activate(name, changed & active_apps)
+        self._snapshot = snapshot
+
+    def _sync_app_files(self, name: str, apps: Set[str], active: Optional[str], active_apps: Set[str]):
+        """Re-parse hand-edited app files and fold them back into the store"""
+        theme = self._snapshot.get(name)
+        if theme is None:
+            return
+
+        colors = dict(theme['colors'])
+        for app in apps:
+            try:
+                parsed = self.theme_manager.parsers[app].parse(self.theme_manager.get_theme_file(name, app))
+            except Exception as e:
+                print(f"Error parsing {app} theme: {e}")
+                continue
+            prefix = f"{app}_"
+            colors = {k: v for k, v in colors.items() if not k.startswith(prefix)}
+            colors.update(parsed)
+
+        if colors != theme['colors']:
+            updated = dict(theme, colors=colors)
+            # Store only: the edited files are already the source of truth
+            self.theme_manager.write_themes(
+                [updated if t['name'] == name else t for t in self._snapshot.values()]
+            )
+            self._snapshot[name] = updated
+
+        if name == active:
+            self._activate(name, apps & active_apps)
+
+    def _activate(self, name: str, apps: Set[str]):
+        if not apps:
+            return
+        self.theme_manager.activate_apps(name, sorted(apps))
+        print(f"Applied '{name}' to: {', '.join(sorted(apps))}")
+
+    def _changed_apps(self, previous: Optional[Dict[str, Any]], theme: Dict[str, Any]) -> Set[str]:
+        apps = set(self.theme_manager.parsers)
+        if previous is None:
+            return apps
+        if any(previous.get(k) != theme.get(k) for k in ('author', 'variant')):
+            return apps
+
+        old, new = previous['colors'], theme['colors']
+        changed = set()
+        for key in old.keys() | new.keys():
+            if old.get(key) != new.get(key):
+                changed.add(key.split('_', 1)[0])
+        return changed & apps
+
+    def _locate_theme_file(self, path: Path) -> Optional[tuple]:
+        parent = path.parent.resolve()
+        app = self._app_dirs.get(parent)
+        if app is None or parent / path.name in self._active_files:
+            return None
+        suffix = f".{self.theme_manager.get_extension(app)}"
+        if not path.name.endswith(suffix):
+            return None
+        return app, path.name[:-len(suffix)]
+
+    def _is_own_write(self, path: Path) -> bool:
+        mtime = self._own_writes.pop(path, None)
+        try:
+            return mtime is not None and path.stat().st_mtime_ns == mtime
+        except FileNotFoundError:
+            return True
+
+    def _remember_writes(self, paths: List[Path]):
+        for path in paths:
+            try:
+                self._own_writes[path] = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                pass
+
+    def _load_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {t['name']: t for t in self.theme_manager.list_themes()}
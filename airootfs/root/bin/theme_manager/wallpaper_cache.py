@@ -0,0 +1,85 @@
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from pathlib import Path
+import importlib.util
+import multiprocessing
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from image_fit import fit_image, fitted_path, is_fresh
+
+
+class WallpaperCache:
+    """Wallpapers pre-scaled and centre-cropped to each output resolution.
+
+    Decoding full-size images is CPU bound, so fitting runs in a process
+    pool rather than threads. Cached files carry their source's mtime and
+    are rebuilt as soon as it changes.
+    """
+
+    def __init__(self, cache_dir: Path, workers: Optional[int] = None):
+        self.cache_dir = cache_dir
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) // 2))
+        # Fitting needs Qt's image readers; without them the cache stays empty
+        self.enabled = importlib.util.find_spec('PyQt6') is not None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Path, Future] = {}
+        self._lock = threading.RLock()
+
+    def get(self, source: Path, width: int, height: int) -> Optional[Path]:
+        """Fitted copy of ``source`` if it is already built and current"""
+        fitted = fitted_path(self.cache_dir, source, width, height)
+        return fitted if is_fresh(fitted, source) else None
+
+    def warm(self, sources: Iterable[Path], sizes: Iterable[Tuple[int, int]]) -> List[Future]:
+        """Queue every missing or stale (source, size) pair; returns the jobs"""
+        if not self.enabled:
+            return []
+        sizes = list(sizes)
+        futures = []
+        with self._lock:
+            for source in sources:
+                for width, height in sizes:
+                    fitted = fitted_path(self.cache_dir, source, width, height)
+                    future = self._pending.get(fitted)
+                    if future is None:
+                        if is_fresh(fitted, source):
+                            continue
+                        future = self._executor().submit(fit_image, source, fitted, width, height)
+                        self._pending[fitted] = future
+                        future.add_done_callback(lambda _f, key=fitted: self._done(key))
+                    futures.append(future)
+        return futures
+
+    def wait(self, futures: List[Future], timeout: Optional[float] = None) -> int:
+        """Wait for jobs and return how many produced a file"""
+        done, _ = wait(futures, timeout)
+        return sum(1 for f in done if f.exception() is None and f.result())
+
+    def prune(self, sources: Iterable[Path]) -> int:
+        """Delete cached files whose source is no longer in ``sources``"""
+        if not self.cache_dir.exists():
+            return 0
+        keep = {fitted_path(self.cache_dir, s, 0, 0).name.split('-', 1)[0] for s in sources}
+        removed = 0
+        for fitted in self.cache_dir.glob('*.png'):
+            if fitted.name.split('-', 1)[0] not in keep:
+                fitted.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=not wait)
+                self._pool = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that has Qt threads running is unsafe
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def _done(self, fitted: Path):
+        with self._lock:
+            self._pending.pop(fitted, None)
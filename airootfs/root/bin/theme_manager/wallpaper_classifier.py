@@ -0,0 +1,192 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import os
+from typing import Dict, List, Any, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from color_space import parse_hex, srgb_to_oklab
+from image_fit import load_pixels
+
+# Signature grid over OKLab: lightness bins x a bins x b bins
+_L_BINS = 8
+_AB_BINS = 8
+_AB_RANGE = 0.25
+# Lightness counts half as much as hue and chroma between bins: the same
+# palette shows up lighter or darker from one wallpaper to the next
+_L_WEIGHT = 0.5
+
+
+def bin_centers() -> np.ndarray:
+    """OKLab centre of every histogram bin, in signature order"""
+    l = (np.arange(_L_BINS) + 0.5) / _L_BINS
+    ab = (np.arange(_AB_BINS) + 0.5) / _AB_BINS * 2 * _AB_RANGE - _AB_RANGE
+    grid = np.stack(np.meshgrid(l, ab, ab, indexing='ij'), axis=-1)
+    return grid.reshape(-1, 3)
+
+
+def _bin_distances() -> np.ndarray:
+    centers = bin_centers() * np.array([_L_WEIGHT, 1.0, 1.0])
+    sq = (centers ** 2).sum(axis=1)[:, None] - 2 * centers @ centers.T + (centers ** 2).sum(axis=1)
+    return np.sqrt(np.maximum(sq, 0.0)).astype(np.float32)
+
+
+_BIN_DISTANCES = _bin_distances()
+
+
+def signature(lab: np.ndarray) -> np.ndarray:
+    """Normalised OKLab histogram of (N, 3) pixels"""
+    l = np.clip((lab[:, 0] * _L_BINS).astype(int), 0, _L_BINS - 1)
+    ab = np.clip(((lab[:, 1:] + _AB_RANGE) / (2 * _AB_RANGE) * _AB_BINS).astype(int), 0, _AB_BINS - 1)
+    index = (l * _AB_BINS + ab[:, 0]) * _AB_BINS + ab[:, 1]
+    hist = np.bincount(index, minlength=_L_BINS * _AB_BINS * _AB_BINS).astype(np.float32)
+    return hist / max(hist.sum(), 1.0)
+
+
+class Placement(NamedTuple):
+    path: Path
+    # None when the image couldn't be decoded
+    theme: Optional[str]
+    # Energy distance between the image's and the theme's colours (lower is closer)
+    score: float
+    # How much worse the runner-up theme scored
+    margin: float
+
+
+class WallpaperClassifier:
+    """Match wallpapers to the theme whose palette they are closest to.
+
+    Images and theme palettes are both reduced to small OKLab histograms
+    (image ones cached per file by size and mtime). Every image is scored
+    against every theme with a few matrix products over those histograms.
+    """
+
+    def __init__(self, cache_file: Optional[Path] = None, max_side: int = 64, workers: Optional[int] = None):
+        self.cache_file = cache_file
+        self.max_side = max_side
+        self.workers = workers or os.cpu_count() or 1
+        self._cache: Dict[str, Tuple[Tuple[int, int], np.ndarray]] = self._load_cache()
+        self._dirty = False
+
+    def signatures(self, paths: Sequence[Path]) -> np.ndarray:
+        """(images, bins) matrix, decoding only files not already cached.
+
+        Rows of images that can't be decoded are NaN and aren't cached, so
+        the file is tried again next time.
+        """
+        rows: List[Optional[np.ndarray]] = []
+        missing = []
+        for i, path in enumerate(paths):
+            st = path.stat()
+            cached = self._cache.get(str(path))
+            if cached and cached[0] == (st.st_size, st.st_mtime_ns):
+                rows.append(cached[1])
+            else:
+                rows.append(None)
+                missing.append((i, path, (st.st_size, st.st_mtime_ns)))
+
+        if missing:
+            # QImageReader releases the GIL while decoding, so threads scale
+            with ThreadPoolExecutor(self.workers) as pool:
+                hists = pool.map(lambda item: self._signature(item[1]), missing)
+                for (i, path, stamp), hist in zip(missing, hists):
+                    if hist is None:
+                        rows[i] = np.full(_L_BINS * _AB_BINS * _AB_BINS, np.nan, dtype=np.float32)
+                        continue
+                    rows[i] = hist
+                    self._cache[str(path)] = (stamp, hist)
+            self._dirty = True
+            self._save_cache()
+
+        if not rows:
+            return np.zeros((0, _L_BINS * _AB_BINS * _AB_BINS), dtype=np.float32)
+        return np.stack(rows)
+
+    def theme_signatures(self, themes: List[Dict[str, Any]]) -> Tuple[List[str], np.ndarray]:
+        """Theme names and their (themes, bins) histograms.
+
+        Each distinct colour counts once, however many keys use it. Counting
+        keys let the colours repeated across every app (background and
+        foreground) outweigh the accents that set themes apart.
+        """
+        names, hists = [], []
+        for theme in themes:
+            values = {value[:7].lower() for value in theme['colors'].values() if isinstance(value, str)}
+            rgb, valid = parse_hex(sorted(values))
+            if valid.any():
+                names.append(theme['name'])
+                hists.append(signature(srgb_to_oklab(rgb[valid])))
+        if not hists:
+            return [], np.zeros((0, len(_BIN_DISTANCES)), dtype=np.float32)
+        return names, np.stack(hists)
+
+    def classify(self, paths: Sequence[Path], themes: List[Dict[str, Any]]) -> List[Placement]:
+        names, theme_hists = self.theme_signatures(themes)
+        if not names or not paths:
+            return []
+        image_hists = self.signatures(paths)
+        decoded = ~np.isnan(image_hists).any(axis=1)
+        image_hists = image_hists[decoded]
+
+        # Energy distance between colour distributions, for all pairs at once:
+        # 2 E|X - Y| - E|X - X'| - E|Y - Y'|, with |.| the OKLab distance
+        # between bins. Unlike nearest-colour matching it doesn't favour
+        # themes just for having more colours.
+        image_spread = image_hists @ _BIN_DISTANCES
+        cross = image_spread @ theme_hists.T
+        image_self = (image_spread * image_hists).sum(axis=1)
+        theme_self = ((theme_hists @ _BIN_DISTANCES) * theme_hists).sum(axis=1)
+        scores = 2 * cross - image_self[:, None] - theme_self[None, :]
+
+        order = np.argsort(scores, axis=1)
+        best = order[:, 0]
+        rows = np.arange(len(image_hists))
+        best_scores = scores[rows, best]
+        margins = scores[rows, order[:, 1]] - best_scores if len(names) > 1 else np.zeros(len(rows))
+
+        # Undecodable images have no colours to match; they get no theme
+        matched = iter(zip(best, best_scores, margins))
+        placements = []
+        for path, ok in zip(paths, decoded):
+            if ok:
+                b, score, margin = next(matched)
+                placements.append(Placement(path, names[b], float(score), float(margin)))
+            else:
+                placements.append(Placement(path, None, float('nan'), 0.0))
+        return placements
+
+    def _signature(self, path: Path) -> Optional[np.ndarray]:
+        try:
+            return signature(srgb_to_oklab(load_pixels(path, self.max_side) / 255.0))
+        except ValueError as e:
+            print(f"Error decoding wallpaper: {e}")
+            return None
+
+    def _load_cache(self) -> Dict[str, Tuple[Tuple[int, int], np.ndarray]]:
+        if self.cache_file is None or not self.cache_file.exists():
+            return {}
+        try:
+            with np.load(self.cache_file) as data:
+                return {
+                    path: ((int(size), int(mtime)), hist)
+                    for path, (size, mtime), hist in zip(data['paths'], data['stamps'], data['hists'])
+                }
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading signature cache: {e}")
+            return {}
+
+    def _save_cache(self):
+        if self.cache_file is None or not self._dirty:
+            return
+        # Forget files that have been moved or deleted since
+        paths = [p for p in self._cache if os.path.exists(p)]
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix('.tmp.npz')
+        np.savez(
+            tmp_file,
+            paths=np.array(paths),
+            stamps=np.array([self._cache[p][0] for p in paths], dtype=np.int64).reshape(-1, 2),
+            hists=np.stack([self._cache[p][1] for p in paths]),
+        )
+        os.replace(tmp_file, self.cache_file)
+        self._dirty = False
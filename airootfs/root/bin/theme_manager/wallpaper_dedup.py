@@ -0,0 +1,162 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import fcntl
+import hashlib
+import os
+import shutil
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from image_fit import perceptual_hash
+
+# ioctl that makes dst share src's extents (btrfs, xfs)
+FICLONE = 0x40049409
+
+# Set bits of every 16-bit value, for NumPy builds without bitwise_count
+_POPCOUNT16 = np.unpackbits(np.arange(1 << 16, dtype='>u2').view(np.uint8)).reshape(-1, 16).sum(axis=1).astype(np.uint8)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    return _POPCOUNT16[values.view(np.uint16)].reshape(*values.shape, 4).sum(axis=-1)
+
+
+class DuplicateReport(NamedTuple):
+    # Byte-identical files; the first of each group is the one kept
+    exact: List[List[Path]]
+    # Visually near-identical files (resized, re-encoded) that differ in bytes
+    near: List[List[Path]]
+
+
+def content_hash(path: Path) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hamming_groups(phashes: np.ndarray, max_distance: int, block: int = 256) -> List[List[int]]:
+    """Union-find groups of indices whose 64-bit hashes differ in at most
+    ``max_distance`` bits, comparing one block of rows at a time.
+    """
+    parent = list(range(len(phashes)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for start in range(0, len(phashes), block):
+        rows = phashes[start:start + block]
+        xor = rows[:, None] ^ phashes[None, :]
+        distance = popcount(xor)
+        for i, j in zip(*np.nonzero(distance <= max_distance)):
+            i += start
+            if i < j:
+                parent[find(i)] = find(j)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(phashes)):
+        groups.setdefault(find(i), []).append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def link_copy(original: Path, duplicate: Path, mode: str = 'reflink') -> bool:
+    """Replace ``duplicate`` with a hard link or reflink to ``original``.
+
+    The new file is built next to the duplicate and renamed over it, so the
+    path is never missing. Reflinks keep separate files that share storage;
+    hard links make them one file.
+    """
+    tmp_file = duplicate.with_name(f".{duplicate.name}.dedup")
+    try:
+        if mode == 'hardlink':
+            os.link(original, tmp_file)
+        else:
+            with open(original, 'rb') as src, open(tmp_file, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(duplicate, tmp_file)
+        os.replace(tmp_file, duplicate)
+        return True
+    except OSError as e:
+        tmp_file.unlink(missing_ok=True)
+        print(f"Cannot {mode} {duplicate.name}: {e}")
+        return False
+
+
+class WallpaperDeduplicator:
+    """Find exact and near-duplicate wallpapers across theme folders.
+
+    Content (blake2b) and perceptual (dHash) hashes are computed in a
+    thread pool and stored in the wallpaper index by inode, so a rerun only
+    hashes new or changed files.
+    """
+
+    def __init__(self, index, workers: Optional[int] = None):
+        self.index = index
+        self.workers = workers or os.cpu_count() or 1
+
+    def scan(self, max_distance: int = 4) -> DuplicateReport:
+        paths = [p for theme in self.index.theme_names() for p in self.index.wallpapers(theme)]
+        hashes = self._hash_all(paths)
+        self.index.prune_hashes(paths)
+
+        by_content: Dict[str, List[Path]] = {}
+        inodes = set()
+        for path, (content, _) in zip(paths, hashes):
+            st = path.stat()
+            # Paths that are already the same file are not duplicates to fix
+            if (st.st_dev, st.st_ino) in inodes:
+                continue
+            inodes.add((st.st_dev, st.st_ino))
+            by_content.setdefault(content, []).append(path)
+        exact = [group for group in by_content.values() if len(group) > 1]
+
+        # Near duplicates: one representative per distinct content, leaving
+        # out files that couldn't be decoded (no perceptual hash)
+        phash_of = dict(zip(paths, (phash for _, phash in hashes)))
+        unique = [group[0] for group in by_content.values() if phash_of[group[0]] is not None]
+        phashes = np.array([phash_of[p] for p in unique], dtype=np.uint64)
+        near = [[unique[i] for i in group] for group in hamming_groups(phashes, max_distance)]
+        return DuplicateReport(exact, near)
+
+    def link(self, report: DuplicateReport, mode: str = 'reflink') -> int:
+        """Replace every exact copy with a link to the first of its group"""
+        linked = 0
+        for original, *copies in report.exact:
+            hashes = self.index.hashes(original)
+            for duplicate in copies:
+                if link_copy(original, duplicate, mode):
+                    linked += 1
+                    if hashes:
+                        # A reflink is a new inode with the same content
+                        self.index.set_hashes(duplicate, *hashes)
+        self.index.prune_hashes(
+            [p for theme in self.index.theme_names() for p in self.index.wallpapers(theme)]
+        )
+        return linked
+
+    def _hash_all(self, paths: List[Path]) -> List[Tuple[str, Optional[int]]]:
+        results: List[Optional[Tuple[str, Optional[int]]]] = [self.index.hashes(p) for p in paths]
+        missing = [i for i, cached in enumerate(results) if cached is None]
+        if missing:
+            # blake2b and Qt's decoders both release the GIL
+            with ThreadPoolExecutor(self.workers) as pool:
+                computed = pool.map(lambda i: self._hash(paths[i]), missing)
+                for i, hashed in zip(missing, computed):
+                    results[i] = hashed
+                    self.index.set_hashes(paths[i], *hashed)
+        return results
+
+    def _hash(self, path: Path) -> Tuple[str, Optional[int]]:
+        try:
+            phash = perceptual_hash(path)
+        except ValueError as e:
+            # 0 is a real hash (a flat image); None keeps the file out of the near groups
+            print(e)
+            phash = None
+        return content_hash(path), phash
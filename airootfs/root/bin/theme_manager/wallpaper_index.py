@@ -0,0 +1,325 @@
+from dataclasses import dataclass, asdict
+from pathlib import Path
+import json
+import os
+import random
+import struct
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from inotify import (
+    Inotify, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE,
+    IN_DELETE_SELF, IN_ISDIR
+)
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp'}
+
+_ROOT_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+_THEME_MASK = IN_CLOSE_WRITE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF
+
+
+@dataclass(frozen=True)
+class Wallpaper:
+    path: Path
+    size: int
+    mtime_ns: int
+    width: int
+    height: int
+
+
+def image_dimensions(path: Path) -> Tuple[int, int]:
+    """Read width and height from the image header; (0, 0) if unknown"""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(32)
+            if head.startswith(b'\x89PNG\r\n\x1a\n'):
+                return struct.unpack('>II', head[16:24])
+            if head[:6] in (b'GIF87a', b'GIF89a'):
+                return struct.unpack('<HH', head[6:10])
+            if head.startswith(b'BM'):
+                width, height = struct.unpack('<ii', head[18:26])
+                return width, abs(height)
+            if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+                return _webp_dimensions(head)
+            if head.startswith(b'\xff\xd8'):
+                f.seek(2)
+                return _jpeg_dimensions(f)
+    except (OSError, struct.error):
+        pass
+    return 0, 0
+
+
+def _webp_dimensions(head: bytes) -> Tuple[int, int]:
+    chunk = head[12:16]
+    if chunk == b'VP8 ':
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3fff, height & 0x3fff
+    if chunk == b'VP8L':
+        b0, b1, b2, b3 = head[21:25]
+        return 1 + (b0 | (b1 & 0x3f) << 8), 1 + (b1 >> 6 | b2 << 2 | (b3 & 0x0f) << 10)
+    if chunk == b'VP8X':
+        return 1 + int.from_bytes(head[24:27], 'little'), 1 + int.from_bytes(head[27:30], 'little')
+    return 0, 0
+
+
+def _jpeg_dimensions(f) -> Tuple[int, int]:
+    # Walk the marker segments up to the first start-of-frame
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xff:
+            return 0, 0
+        kind = marker[1]
+        if kind == 0xff:
+            f.seek(-1, os.SEEK_CUR)
+            continue
+        length = struct.unpack('>H', f.read(2))[0]
+        if 0xc0 <= kind <= 0xcf and kind not in (0xc4, 0xc8, 0xcc):
+            height, width = struct.unpack('>xHH', f.read(5))
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _inode_key(st: os.stat_result) -> str:
+    return f"{st.st_dev}:{st.st_ino}"
+
+
+class _ThemeWallpapers:
+    """Wallpapers of one theme directory, with sorted views built on demand"""
+
+    def __init__(self):
+        self.by_name: Dict[str, Wallpaper] = {}
+        self.dir_mtime_ns = 0
+        self._entries: Optional[Tuple[Wallpaper, ...]] = None
+        self._paths: Optional[Tuple[Path, ...]] = None
+
+    def set(self, wallpaper: Wallpaper):
+        self.by_name[wallpaper.path.name] = wallpaper
+        self._entries = self._paths = None
+
+    def discard(self, name: str):
+        if self.by_name.pop(name, None) is not None:
+            self._entries = self._paths = None
+
+    def entries(self) -> Tuple[Wallpaper, ...]:
+        if self._entries is None:
+            self._entries = tuple(self.by_name[name] for name in sorted(self.by_name))
+        return self._entries
+
+    def paths(self) -> Tuple[Path, ...]:
+        if self._paths is None:
+            self._paths = tuple(w.path for w in self.entries())
+        return self._paths
+
+
+class WallpaperIndex:
+    """Per-theme wallpaper index kept current by inotify.
+
+    A theme folder is scanned the first time it is asked for; after that,
+    events on ``walls_dir`` update it file by file, so listing, counting and
+    picking a random wallpaper never touch the disk. Header metadata is
+    persisted in ``cache_file`` and reused while size and mtime match.
+    Without inotify the directory mtime is checked on each lookup instead.
+    """
+
+    def __init__(self, walls_dir: Path, cache_file: Optional[Path] = None):
+        self.walls_dir = walls_dir
+        self.cache_file = cache_file
+        self._themes: Dict[str, _ThemeWallpapers] = {}
+        self._cached, self._hashes = self._load_cache()
+        self._dirty = False
+        self._lock = threading.RLock()
+        try:
+            self._inotify: Optional[Inotify] = Inotify()
+            self._inotify.add_watch(walls_dir, _ROOT_MASK)
+        except OSError as e:
+            print(f"Wallpaper index falling back to polling: {e}")
+            self._inotify = None
+
+    def wallpapers(self, theme_name: str) -> Tuple[Path, ...]:
+        with self._lock:
+            return self._theme(theme_name).paths()
+
+    def entries(self, theme_name: str) -> Tuple[Wallpaper, ...]:
+        with self._lock:
+            return self._theme(theme_name).entries()
+
+    def count(self, theme_name: str) -> int:
+        with self._lock:
+            return len(self._theme(theme_name).by_name)
+
+    def random(self, theme_name: str) -> Optional[Path]:
+        with self._lock:
+            paths = self._theme(theme_name).paths()
+            return random.choice(paths) if paths else None
+
+    def get(self, path: Path) -> Optional[Wallpaper]:
+        with self._lock:
+            return self._theme(path.parent.name).by_name.get(path.name)
+
+    def theme_names(self) -> List[str]:
+        """Every theme folder under ``walls_dir``"""
+        return sorted(
+            entry.name for entry in os.scandir(self.walls_dir)
+            if entry.is_dir() and not entry.name.startswith('.')
+        )
+
+    def hashes(self, path: Path) -> Optional[Tuple[str, Optional[int]]]:
+        """Cached (content hash, perceptual hash) of a file, if still valid.
+
+        Keyed by inode, so hard links share one entry and stay known after
+        deduplication. The perceptual hash is None for undecodable files.
+        """
+        with self._lock:
+            st = path.stat()
+            entry = self._hashes.get(_inode_key(st))
+            if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+                return entry['content'], entry['phash']
+            return None
+
+    def set_hashes(self, path: Path, content: str, phash: Optional[int]):
+        with self._lock:
+            st = path.stat()
+            self._hashes[_inode_key(st)] = {
+                'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'content': content, 'phash': phash,
+            }
+            self._dirty = True
+
+    def prune_hashes(self, paths: List[Path]):
+        """Keep hash entries only for the inodes behind ``paths``"""
+        with self._lock:
+            keep = {_inode_key(p.stat()) for p in paths}
+            if keep != set(self._hashes):
+                self._hashes = {k: v for k, v in self._hashes.items() if k in keep}
+                self._dirty = True
+            self._save_cache()
+
+    def rescan(self, theme_name: Optional[str] = None):
+        """Drop indexed state so the next lookup re-reads the directory"""
+        with self._lock:
+            if theme_name is None:
+                self._themes.clear()
+            else:
+                self._themes.pop(theme_name, None)
+
+    def close(self):
+        with self._lock:
+            self._save_cache()
+            if self._inotify is not None:
+                self._inotify.close()
+                self._inotify = None
+
+    def _theme(self, theme_name: str) -> _ThemeWallpapers:
+        self._refresh()
+        theme = self._themes.get(theme_name)
+        if theme is None or (self._inotify is None and theme.dir_mtime_ns != self._dir_mtime(theme_name)):
+            theme = self._scan(theme_name)
+        return theme
+
+    def _scan(self, theme_name: str) -> _ThemeWallpapers:
+        theme = _ThemeWallpapers()
+        self._themes[theme_name] = theme
+        theme_dir = self.walls_dir / theme_name
+        if not theme_dir.is_dir():
+            return theme
+
+        if self._inotify is not None:
+            # Watch before listing so nothing slips in between
+            try:
+                self._inotify.add_watch(theme_dir, _THEME_MASK)
+            except OSError as e:
+                print(f"Cannot watch {theme_dir}: {e}")
+        theme.dir_mtime_ns = self._dir_mtime(theme_name)
+
+        with os.scandir(theme_dir) as it:
+            for entry in it:
+                if entry.is_file():
+                    self._index_file(theme, Path(entry.path))
+
+        # Forget cached metadata for files removed while we were not watching
+        for key in [k for k in self._cached if Path(k).parent == theme_dir]:
+            if Path(key).name not in theme.by_name:
+                del self._cached[key]
+                self._dirty = True
+        self._save_cache()
+        return theme
+
+    def _index_file(self, theme: _ThemeWallpapers, path: Path):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            return
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            theme.discard(path.name)
+            return
+
+        cached = self._cached.get(str(path))
+        if cached and cached['size'] == st.st_size and cached['mtime_ns'] == st.st_mtime_ns:
+            width, height = cached['width'], cached['height']
+        else:
+            width, height = image_dimensions(path)
+            self._dirty = True
+        wallpaper = Wallpaper(path, st.st_size, st.st_mtime_ns, width, height)
+        self._cached[str(path)] = asdict(wallpaper)
+        theme.set(wallpaper)
+
+    def _refresh(self):
+        if self._inotify is None:
+            return
+        events = self._inotify.read_raw()
+        if not events:
+            return
+
+        for event in events:
+            if event.directory is None:
+                # Queue overflow: events were lost, rebuild lazily
+                self._themes.clear()
+                continue
+
+            if event.directory == self.walls_dir:
+                # A theme folder appeared, vanished or was renamed
+                if event.mask & IN_ISDIR:
+                    self._themes.pop(event.name, None)
+                continue
+
+            theme = self._themes.get(event.directory.name)
+            if theme is None:
+                continue
+            if event.mask & IN_DELETE_SELF:
+                self._themes.pop(event.directory.name, None)
+            elif event.mask & (IN_DELETE | IN_MOVED_FROM):
+                theme.discard(event.name)
+                self._cached.pop(str(event.path), None)
+                self._dirty = True
+            elif event.mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                self._index_file(theme, event.path)
+        self._save_cache()
+
+    def _dir_mtime(self, theme_name: str) -> int:
+        try:
+            return (self.walls_dir / theme_name).stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _load_cache(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        if self.cache_file is None or not self.cache_file.exists():
+            return {}, {}
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            return data.get('wallpapers', {}), data.get('hashes', {})
+        except (OSError, ValueError) as e:
+            print(f"Error reading wallpaper index: {e}")
+            return {}, {}
+
+    def _save_cache(self):
+        if self.cache_file is None or not self._dirty:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump({'wallpapers': self._cached, 'hashes': self._hashes}, f, default=str)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+        except OSError as e:
+            print(f"Error saving wallpaper index: {e}")
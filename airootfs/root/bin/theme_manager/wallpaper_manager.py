@@ -1,68 +1,85 @@
 from pathlib import Path
+import shutil
 import subprocess
-import random
-from typing import Optional, List
+import threading
+from typing import Optional, List, Sequence, Set, Tuple
+
+from config import WALLPAPER_CACHE_DIR
+from shuffle_bag import ShuffleBag
+from swww import SwwwDaemon
+from wallpaper_cache import WallpaperCache
+from wallpaper_index import WallpaperIndex
 
 class WallpaperManager:
     """Manage wallpapers using swww"""
 
-    def __init__(self, walls_dir: Path):
+    def __init__(self, walls_dir: Path, index_file: Optional[Path] = None, cache_dir: Path = WALLPAPER_CACHE_DIR,
+                 bag_file: Optional[Path] = None):
         self.walls_dir = walls_dir
         self.walls_dir.mkdir(parents=True, exist_ok=True)
+        self.index = WallpaperIndex(walls_dir, index_file)
+        self.cache = WallpaperCache(cache_dir)
+        self.daemon = SwwwDaemon()
+        self.bag = ShuffleBag(bag_file)
 
-    def get_theme_wallpapers(self, theme_name: str) -> List[Path]:
-        """Get all wallpaper images for a theme"""
-        theme_dir = self.walls_dir / theme_name
-        if not theme_dir.exists():
-            return []
-
-        # Supported image formats
-        extensions = ['*.jpg', '*.jpeg', '*.png', '*.gif', '*.bmp', '*.webp']
-        wallpapers = []
+    def get_theme_wallpapers(self, theme_name: str) -> Sequence[Path]:
+        """Get all wallpaper images for a theme, sorted by name"""
+        return self.index.wallpapers(theme_name)
 
-        for ext in extensions:
-            wallpapers.extend(theme_dir.glob(ext))
-            # Also check uppercase
-            wallpapers.extend(theme_dir.glob(ext.upper()))
-
-        return sorted(wallpapers)
+    def count_wallpapers(self, theme_name: str) -> int:
+        return self.index.count(theme_name)
 
     def set_wallpaper(self, image_path: Path, transition: str = "fade") -> bool:
         """Set wallpaper using swww"""
         if not image_path.exists():
             print(f"Wallpaper not found: {image_path}")
             return False
+        return self.set_wallpapers([image_path], transition)
+
+    def set_wallpapers(self, wallpapers: Sequence[Path], transition: str = "fade") -> bool:
+        """Set wallpapers on all outputs at once.
 
+        Output ``i`` gets ``wallpapers[i % len(wallpapers)]``, fitted to its own
+        resolution when the cache has it. One ``swww img -o`` runs per output,
+        all started before any is waited on, so every transition starts together.
+        """
         try:
-            # Check if swww daemon is running
-            result = subprocess.run(
-                ['pgrep', '-x', 'swww-daemon'],
-                capture_output=True
-            )
-
-            # Start daemon if not running
-            if result.returncode != 0:
-                print("Starting swww daemon...")
-                subprocess.Popen(
-                    ['swww-daemon'],
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL
-                )
-                # Give it a moment to start
-                import time
-                time.sleep(0.5)
-
-            # Set the wallpaper with transition
-            cmd = ['swww', 'img', str(image_path), '--transition-type', transition]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-            if result.returncode == 0:
-                print(f"Wallpaper set: {image_path.name}")
-                return True
-            else:
-                print(f"Error setting wallpaper: {result.stderr}")
+            if not self.daemon.ensure_running():
                 return False
 
+            outputs = self.daemon.outputs()
+            if outputs:
+                jobs = [(o, wallpapers[i % len(wallpapers)]) for i, o in enumerate(outputs)]
+            else:
+                # Unknown layout: a single request covers every output
+                jobs = [(None, wallpapers[0])]
+
+            processes = []
+            for output, wallpaper in jobs:
+                cmd = ['swww', 'img']
+                source = wallpaper
+                if output is not None:
+                    cmd += ['--outputs', output.name]
+                    source = self.cache.get(wallpaper, output.width, output.height) or wallpaper
+                cmd += [str(source), '--transition-type', transition]
+                process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+                processes.append((output, wallpaper, process))
+
+            ok = True
+            for output, wallpaper, process in processes:
+                _, stderr = process.communicate()
+                target = f" on {output.name}" if output else ""
+                if process.returncode == 0:
+                    print(f"Wallpaper set{target}: {wallpaper.name}")
+                else:
+                    ok = False
+                    print(f"Error setting wallpaper{target}: {stderr}")
+
+            if not ok:
+                # The daemon or an output may have gone away; probe again next time
+                self.daemon.invalidate()
+            return ok
+
         except FileNotFoundError:
             print("swww not found. Install it with: paru -S swww")
             return False
@@ -70,16 +87,105 @@ class WallpaperManager:
             print(f"Error setting wallpaper: {e}")
             return False
 
-    def set_random_wallpaper(self, theme_name: str, transition: str = "fade") -> bool:
-        """Set a random wallpaper from theme directory"""
-        wallpapers = self.get_theme_wallpapers(theme_name)
+    def set_random_wallpaper(self, theme_name: str, transition: str = "fade", per_output: bool = False) -> bool:
+        """Set the next wallpaper from the theme's shuffle bag.
+
+        Every wallpaper is shown once before any repeats. With ``per_output``
+        each output draws its own from the bag.
+        """
+        names = self._wallpaper_names(theme_name)
+        count = len(self.daemon.outputs()) if per_output else 1
+        drawn = [self.bag.draw(theme_name, names) for _ in range(max(1, min(count, len(names))))]
+        wallpapers = [self.walls_dir / theme_name / name for name in drawn if name]
 
         if not wallpapers:
             print(f"No wallpapers found for theme: {theme_name}")
             return False
 
-        wallpaper = random.choice(wallpapers)
-        return self.set_wallpaper(wallpaper, transition)
+        ok = self.set_wallpapers(wallpapers, transition)
+        self.prefetch(theme_name)
+        return ok
+
+    def prefetch(self, theme_name: str, reroll: bool = False) -> Optional[Path]:
+        """Return the wallpaper the next switch will use and prepare it.
+
+        The image is fitted to the output resolutions in the background, so
+        ``set_random_wallpaper`` can hand swww a small, ready file. That only
+        happens while swww-daemon runs; prefetching never starts it.
+        ``reroll`` moves the upcoming wallpaper to the back of the bag.
+        """
+        names = self._wallpaper_names(theme_name)
+        name = self.bag.defer(theme_name, names) if reroll else self.bag.peek(theme_name, names)
+        if name is None:
+            return None
+
+        wallpaper = self.walls_dir / theme_name / name
+        self._warm_async([wallpaper], start_daemon=False)
+        return wallpaper
+
+    def warm_theme(self, theme_name: str, block: bool = False) -> int:
+        """Fit every wallpaper of a theme to every output size.
+
+        With ``block`` the call waits and returns how many files were built.
+        """
+        wallpapers = self.get_theme_wallpapers(theme_name)
+        if not block:
+            self._warm_async(wallpapers)
+            return 0
+        return self.cache.wait(self.cache.warm(wallpapers, self._output_sizes()))
+
+    def prune_cache(self) -> int:
+        """Drop fitted copies of wallpapers that no longer exist"""
+        sources = []
+        for theme_dir in self.walls_dir.iterdir():
+            if theme_dir.is_dir() and not theme_dir.name.startswith('.'):
+                sources.extend(self.get_theme_wallpapers(theme_dir.name))
+        return self.cache.prune(sources)
+
+    def find_duplicates(self, max_distance: int = 4):
+        """Exact and near-duplicate wallpapers across all theme folders.
+
+        Needs numpy and PyQt6. Hashes are kept in the index, so only new or
+        changed files are read again.
+        """
+        from wallpaper_dedup import WallpaperDeduplicator
+        return WallpaperDeduplicator(self.index).scan(max_distance)
+
+    def link_duplicates(self, report, mode: str = 'reflink') -> int:
+        """Replace exact copies with reflinks (or hard links) to one file"""
+        from wallpaper_dedup import WallpaperDeduplicator
+        return WallpaperDeduplicator(self.index).link(report, mode)
+
+    def _warm_async(self, wallpapers: Sequence[Path], start_daemon: bool = True):
+        if not self.cache.enabled or not wallpapers:
+            return
+        # Querying outputs may have to start the daemon; keep it off the caller
+        threading.Thread(
+            target=lambda: self.cache.warm(wallpapers, self._output_sizes(start_daemon)),
+            daemon=True
+        ).start()
+
+    def _wallpaper_names(self, theme_name: str) -> List[str]:
+        return [p.name for p in self.get_theme_wallpapers(theme_name)]
+
+    def _output_sizes(self, start_daemon: bool = True) -> Set[Tuple[int, int]]:
+        """Sizes of the connected outputs; empty (nothing to fit) when the
+        daemon isn't running and ``start_daemon`` is False"""
+        if not start_daemon and not self.daemon.is_ready():
+            return set()
+        try:
+            return {(o.width, o.height) for o in self.daemon.outputs()}
+        except FileNotFoundError:
+            return set()
+
+    def place_wallpaper(self, image_path: Path, theme_name: str) -> Optional[Path]:
+        """Move an image into a theme's wallpaper folder"""
+        target = self.create_theme_wallpaper_dir(theme_name) / image_path.name
+        if target.exists():
+            print(f"Skipping {image_path.name}: already in {theme_name}")
+            return None
+        shutil.move(str(image_path), target)
+        return target
 
     def create_theme_wallpaper_dir(self, theme_name: str) -> Path:
         """Create wallpaper directory for a theme"""
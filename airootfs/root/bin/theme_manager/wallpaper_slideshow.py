@@ -0,0 +1,93 @@
+from datetime import datetime, time as clock_time, timedelta
+import re
+import threading
+from typing import Optional, Sequence
+
+_DURATION = re.compile(r'^(?P<amount>\d+(?:\.\d+)?)(?P<unit>[smh]?)$')
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, '': 60}
+
+# Longest single sleep; wall-clock deadlines are re-checked after each one,
+# so suspend/resume or clock changes can't delay a rotation by much
+_MAX_WAIT = 60.0
+
+
+def parse_interval(text: str) -> float:
+    """'90s', '15m', '2h' or plain minutes -> seconds"""
+    match = _DURATION.match(text.strip().lower())
+    if not match or float(match.group('amount')) <= 0:
+        raise ValueError(f"Invalid interval: {text}")
+    return float(match.group('amount')) * _UNITS[match.group('unit')]
+
+
+def parse_clock(text: str) -> clock_time:
+    """'HH:MM' -> time of day"""
+    return datetime.strptime(text.strip(), '%H:%M').time()
+
+
+class WallpaperSlideshow:
+    """Rotate the active theme's wallpapers on an interval or at set times.
+
+    One thread waits on a single event for the next deadline; rotations
+    draw from the theme's shuffle bag, and the wallpaper after that is
+    prefetched right away so the next switch starts immediately.
+    """
+
+    def __init__(self, theme_manager, interval: Optional[float] = None, times: Sequence[clock_time] = (),
+                 theme: Optional[str] = None, transition: Optional[str] = None,
+                 per_output: Optional[bool] = None):
+        if not interval and not times:
+            raise ValueError("Slideshow needs an interval or times of day")
+        self.theme_manager = theme_manager
+        self.interval = interval
+        self.times = sorted(times)
+        self.theme = theme
+        self.transition = transition
+        self.per_output = per_output
+        self._stop = threading.Event()
+
+    def next_deadline(self, now: datetime) -> datetime:
+        if self.interval:
+            return now + timedelta(seconds=self.interval)
+        for when in self.times:
+            candidate = datetime.combine(now.date(), when)
+            if candidate > now:
+                return candidate
+        return datetime.combine(now.date() + timedelta(days=1), self.times[0])
+
+    def rotate(self) -> bool:
+        """Switch to the next wallpaper of the current theme"""
+        # Follow theme switches made elsewhere (GUI, CLI) between rotations
+        state = self.theme_manager.load_state()
+        theme = self.theme or state.get('current_theme')
+        if not theme:
+            print("No active theme; skipping rotation")
+            return False
+
+        transition = self.transition or state.get('wallpaper_transition', 'fade')
+        per_output = self.per_output
+        if per_output is None:
+            per_output = state.get('wallpaper_per_output', False)
+        return self.theme_manager.wallpaper_manager.set_random_wallpaper(theme, transition, per_output)
+
+    def run(self):
+        state = self.theme_manager.load_state()
+        theme = self.theme or state.get('current_theme')
+        if theme:
+            self.theme_manager.wallpaper_manager.prefetch(theme)
+
+        deadline = self.next_deadline(datetime.now())
+        print(f"Next wallpaper at {deadline:%H:%M:%S}")
+        try:
+            while not self._stop.is_set():
+                remaining = (deadline - datetime.now()).total_seconds()
+                if remaining > 0:
+                    self._stop.wait(min(remaining, _MAX_WAIT))
+                    continue
+
+                self.rotate()
+                deadline = self.next_deadline(datetime.now())
+        except KeyboardInterrupt:
+            pass
+
+    def stop(self):
+        self._stop.set()